@@ -1,12 +1,17 @@
 import os
-import requests
 import json
 import tkinter as tk
 from tkinter import ttk, messagebox
 from pathlib import Path
 from datetime import datetime
 import sys
-import threading
+
+# Añade el directorio raíz al path para importar src
+sys.path.append(str(Path(__file__).parent.parent))
+from src.icon_downloader import IconDownloader
+
+# Frecuencia con la que la interfaz lee los eventos del motor de descarga
+POLL_MS = 100
 
 class ChampionDownloaderGUI:
     def __init__(self, root):
@@ -23,6 +28,8 @@ class ChampionDownloaderGUI:
         self.failed_list = []
         self.is_downloading = False
         self.stop_flag = False
+        self.icons_dir = os.path.join(Path(__file__).parent.parent, "assets", "icons")
+        self.engine = IconDownloader(self.icons_dir)
         
         # Estilo
         self.setup_ui()
@@ -88,21 +95,19 @@ class ChampionDownloaderGUI:
         self.log_text.see(tk.END)
         
     def check_connection(self):
-        """Verifica la conexión a internet"""
-        def check():
-            try:
-                requests.get("https://ddragon.leagueoflegends.com", timeout=5)
-                self.root.after(0, self.on_connection_success)
-            except Exception as e:
-                self.root.after(0, self.on_connection_error, str(e))
-        
-        threading.Thread(target=check, daemon=True).start()
-        
-    def on_connection_success(self):
+        """
+        Verifica la conexión pidiendo la última versión al motor; la respuesta
+        llega como evento y se atiende en poll_events (en el hilo de Tk)
+        """
+        self.engine.fetch_version()
+        self.root.after(POLL_MS, self.poll_events)
+        
+    def on_connection_success(self, version):
         """Callback cuando hay conexión"""
         self.status_label.config(text="✓ Conectado al servidor")
         self.log_message("Conexión a internet establecida correctamente", "success")
-        self.get_latest_version()
+        self.current_version = version
+        self.update_version_ui()
         
     def on_connection_error(self, error):
         """Callback cuando falla la conexión"""
@@ -116,34 +121,14 @@ class ChampionDownloaderGUI:
             parent=self.root
         )
         
-    def get_latest_version(self):
-        """Obtiene la última versión del juego"""
-        def fetch_version():
-            try:
-                response = requests.get("https://ddragon.leagueoflegends.com/api/versions.json", timeout=5)
-                versions = response.json()
-                self.current_version = versions[0]
-                self.root.after(0, self.update_version_ui)
-            except Exception as e:
-                self.root.after(0, self.on_version_error, str(e))
-        
-        threading.Thread(target=fetch_version, daemon=True).start()
-        
     def update_version_ui(self):
         """Actualiza la UI con la versión obtenida"""
         self.version_label.config(text=f"Versión del juego: {self.current_version}")
         self.log_message(f"Versión más reciente detectada: {self.current_version}")
         self.check_existing_icons()
         
-    def on_version_error(self, error):
-        """Maneja errores al obtener la versión"""
-        self.log_message(f"Error al obtener versión: {error}", "error")
-        self.version_label.config(text="Versión: Desconocida (usando respaldo)")
-        self.current_version = "14.14.1"  # Versión de respaldo
-        
     def check_existing_icons(self):
         """Verifica si ya existen iconos descargados"""
-        self.icons_dir = os.path.join(Path(__file__).parent.parent, "assets", "icons")
         os.makedirs(self.icons_dir, exist_ok=True)
         
         metadata_file = os.path.join(self.icons_dir, "metadata.json")
@@ -162,13 +147,14 @@ class ChampionDownloaderGUI:
         """Inicia/detiene la descarga"""
         if self.is_downloading:
             self.stop_flag = True
+            self.engine.stop()
             self.action_button.config(state=tk.DISABLED)
             self.log_message("Deteniendo descarga...", "warning")
         else:
             self.start_download()
             
     def start_download(self):
-        """Inicia el proceso de descarga en un hilo separado"""
+        """Inicia el motor de descarga compartido y empieza a leer sus eventos"""
         self.is_downloading = True
         self.stop_flag = False
         self.success_count = 0
@@ -183,68 +169,40 @@ class ChampionDownloaderGUI:
         
         self.log_message("Iniciando descarga de iconos...", "info")
         
-        # Obtener lista de campeones (simulado - reemplaza con tu implementación real)
-        from src.champion_db import ChampionDatabase
-        db = ChampionDatabase()
-        self.total_champs = len(db.champions)
-        
-        threading.Thread(target=self.download_thread, args=(db.champions,), daemon=True).start()
-        
-    def download_thread(self, champions):
-        """Hilo para descargar los iconos"""
-        icon_url = f"https://ddragon.leagueoflegends.com/cdn/{self.current_version}/img/champion/"
-        
-        for i, (champ_id, champ_name) in enumerate(champions.items()):
-            if self.stop_flag:
-                break
-                
-            normalized = self.normalize_name(champ_name)
-            file_name = champ_name.replace("'", "").replace(" ", "").lower()
-            file_path = os.path.join(self.icons_dir, f"{file_name}.png")
-            
-            # Actualizar UI
-            self.root.after(0, self.update_progress, i, champ_name)
-            
-            try:
-                response = requests.get(icon_url + f"{normalized}.png", timeout=10)
-                response.raise_for_status()
-                
-                with open(file_path, "wb") as f:
-                    f.write(response.content)
-                
-                self.success_count += 1
-                self.root.after(0, self.log_message, f"Descargado: {champ_name}", "success")
-            except Exception as e:
-                self.failed_count += 1
-                self.failed_list.append((champ_name, str(e)))
-                self.root.after(0, self.log_message, f"Error con {champ_name}: {str(e)}", "error")
-            
-            # Pequeña pausa para evitar saturar el servidor
-            if not self.stop_flag:
-                threading.Event().wait(0.1)
-        
-        self.root.after(0, self.download_complete)
-        
-    def normalize_name(self, champ_name):
-        """Normaliza nombres según la API oficial"""
-        special_cases = {
-            "AurelionSol": "AurelionSol",
-            "Wukong": "MonkeyKing",
-            # ... (todos tus casos especiales)
-        }
-        normalized = champ_name.replace("'", "").replace(" ", "").replace(".", "")
-        return special_cases.get(normalized, normalized)
-        
-    def update_progress(self, current, champ_name):
+        self.engine.start(self.current_version or None, force=True)
+        
+    def poll_events(self):
+        """Procesa los eventos del motor durante toda la sesión; el hilo de Tk nunca espera a la red"""
+        for event in self.engine.poll():
+            if event.kind == 'version' and not self.is_downloading:
+                self.on_connection_success(event.data['version'])
+            elif event.kind == 'offline':
+                self.on_connection_error(event.data['error'])
+            elif event.kind in ('progress', 'build_progress'):
+                self.update_progress(event.kind, event.data['done'], event.data['total'], event.data['name'])
+            elif event.kind == 'failed':
+                self.log_message(f"Error con {event.data['name']}: {event.data['error']}", "error")
+            elif event.kind == 'done':
+                self.success_count = len(event.data['success'])
+                self.failed_list = event.data['failed']
+                self.failed_count = len(self.failed_list)
+                self.download_complete()
+            elif event.kind == 'error':
+                self.is_downloading = False
+                self.action_button.config(text="Iniciar", state=tk.NORMAL)
+                self.status_label.config(text="✗ Error en la descarga")
+                self.log_message(f"Error: {event.data['message']}", "error")
+        self.root.after(POLL_MS, self.poll_events)
+        
+    def update_progress(self, kind, done, total, champ_name):
         """Actualiza la barra de progreso y contadores"""
-        progress = (current + 1) / self.total_champs * 100
-        self.progress.config(value=progress)
-        self.status_label.config(
-            text=f"Descargando... ({current + 1}/{self.total_champs}) | {champ_name[:12]}..."
-        )
+        self.total_champs = total
+        self.progress.config(value=done / total * 100)
+        action = "Descargando" if kind == 'progress' else "Procesando"
+        self.status_label.config(text=f"{action}... ({done}/{total}) | {champ_name[:12]}...")
         
     def download_complete(self):
-        """Limpieza post-descarga"""
+        """Limpieza post-descarga (el motor ya guardó los metadatos y los recursos derivados)"""
         self.is_downloading = False
         self.action_button.config(text="Iniciar", state=tk.NORMAL)
         
@@ -255,17 +213,6 @@ class ChampionDownloaderGUI:
             self.status_label.config(text="✓ Descarga completada")
             self.log_message("Proceso de descarga finalizado", "info")
             
-            # Guardar metadatos
-            metadata = {
-                "version": self.current_version,
-                "timestamp": datetime.now().isoformat(),
-                "downloaded": self.success_count,
-                "failed": self.failed_count
-            }
-            
-            with open(os.path.join(self.icons_dir, "metadata.json"), 'w') as f:
-                json.dump(metadata, f, indent=2)
-            
             # Mostrar resumen
             self.show_summary()
             
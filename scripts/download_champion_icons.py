@@ -1,16 +1,17 @@
 import os
-import requests
 import json
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 from pathlib import Path
 from datetime import datetime, timedelta
 import sys
-import threading
 import logging
 from ttkthemes import ThemedTk
 from PIL import Image, ImageTk
 
+sys.path.append(str(Path(__file__).parent.parent))
+from src.icon_downloader import IconDownloader
+
 # Configuración de logging
 logging.basicConfig(
     level=logging.INFO,
@@ -22,6 +23,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Frecuencia con la que la interfaz lee los eventos del motor de descarga
+POLL_MS = 100
+
 class ChampionDownloaderGUI:
     def __init__(self):
         self.root = ThemedTk(theme="arc")
@@ -47,6 +51,7 @@ class ChampionDownloaderGUI:
         # Asegurar que existen los directorios
         self.assets_dir.mkdir(exist_ok=True)
         self.config_dir.mkdir(exist_ok=True)
+        self.engine = IconDownloader(str(self.assets_dir / "icons"))
         
         # Cargar configuración
         self.settings_path = self.config_dir / "settings.json"
@@ -171,21 +176,18 @@ class ChampionDownloaderGUI:
         ).pack(side=tk.RIGHT, padx=5)
 
     def check_connection(self):
-        """Verifica la conexión a internet"""
-        def check():
-            try:
-                requests.get("https://ddragon.leagueoflegends.com", timeout=5)
-                self.root.after(0, self.on_connection_success)
-            except Exception as e:
-                self.root.after(0, self.on_connection_error, str(e))
-        
-        threading.Thread(target=check, daemon=True).start()
+        """
+        Verifica la conexión pidiendo la última versión al motor; la respuesta
+        llega como evento y se atiende en poll_events (en el hilo de Tk)
+        """
+        self.engine.fetch_version()
+        self.root.after(POLL_MS, self.poll_events)
     
-    def on_connection_success(self):
+    def on_connection_success(self, version):
         """Callback cuando hay conexión"""
         self.status_label.config(text="✓ Conectado al servidor")
         self.log_message("Conexión establecida", "success")
-        self.get_latest_version()
+        self.update_version_ui(version)
     
     def on_connection_error(self, error):
         """Callback cuando falla la conexión"""
@@ -206,25 +208,44 @@ class ChampionDownloaderGUI:
         self.details_text.see(tk.END)
     
     def start_download(self):
-        """Inicia el proceso de descarga (simulado)"""
+        """Inicia el motor de descarga compartido; el progreso llega por su cola de eventos"""
         self.log_message("Iniciando descarga...", "info")
         self.progress["value"] = 0
         self.action_button.config(state=tk.DISABLED)
-        
-        # Simular descarga
-        for i in range(1, 101):
-            if not self.root:
-                break
-            self.progress["value"] = i
-            self.root.update_idletasks()
-            self.root.after(100)
-        
-        self.log_message("Descarga completada", "success")
-        self.action_button.config(state=tk.NORMAL)
+        self.engine.start(self.current_version or None)
+
+    def poll_events(self):
+        """Lee los eventos pendientes sin bloquear el bucle de Tk (durante toda la sesión)"""
+        for event in self.engine.poll():
+            if event.kind == 'version' and not self.current_version:
+                self.on_connection_success(event.data['version'])
+            elif event.kind == 'offline':
+                self.on_connection_error(event.data['error'])
+            elif event.kind in ('progress', 'build_progress'):
+                done, total = event.data['done'], event.data['total']
+                self.progress["value"] = done / total * 100
+                action = "Descargando" if event.kind == 'progress' else "Procesando"
+                self.status_label.config(text=f"{action}... ({done}/{total}) | {event.data['name'][:12]}")
+            elif event.kind == 'up_to_date':
+                self.log_message("Los iconos ya están actualizados", "info")
+            elif event.kind == 'failed':
+                self.failed_list.append((event.data['name'], event.data['error']))
+                self.log_message(f"Error con {event.data['name']}: {event.data['error']}", "error")
+            elif event.kind == 'done':
+                self.success_count = len(event.data['success'])
+                self.failed_count = len(event.data['failed'])
+                self.status_label.config(text="✓ Iconos listos")
+                self.log_message(f"Descarga completada: {self.success_count} iconos, "
+                                 f"{self.failed_count} errores", "success")
+                self.action_button.config(state=tk.NORMAL)
+            elif event.kind == 'error':
+                logger.error(f"Error en la descarga: {event.data['message']}")
+                self.log_message(f"Error en la descarga: {event.data['message']}", "error")
+                self.action_button.config(state=tk.NORMAL)
+        self.root.after(POLL_MS, self.poll_events)
 
-    def get_latest_version(self):
-        """Simula la obtención de la versión"""
-        self.current_version = "15.12.1"
+    def update_version_ui(self, version):
+        self.current_version = version
         self.version_label.config(text=f"Versión del juego: {self.current_version}")
         self.log_message(f"Versión detectada: {self.current_version}", "info")
 
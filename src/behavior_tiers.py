@@ -0,0 +1,273 @@
+import logging
+import math
+import time
+from .entities import SimulatedEntity
+
+logger = logging.getLogger(__name__)
+
+# Niveles de estrategia, de menor a mayor coste por frame
+TIER_JITTER = 0
+TIER_TRAJECTORY = 1
+TIER_BEHAVIOR = 2
+TIER_NAMES = ["saltos entre zonas", "trayectorias", "simulación de comportamiento"]
+
+# Roles por orden en la composición (sus zonas habituales las define cada mapa)
+ROLES = ['top', 'jungle', 'mid', 'bot', 'support']
+
+def tier_for_fakeness(level):
+    """Traduce fakeness_level (1-10) al nivel de estrategia deseado"""
+    if level <= 3:
+        return TIER_JITTER
+    if level <= 7:
+        return TIER_TRAJECTORY
+    return TIER_BEHAVIOR
+
+class ZoneJitterStrategy:
+    """Nivel barato: cada frame elige una zona adyacente y un punto al azar en ella"""
+    def __init__(self, generator):
+        self.generator = generator
+
+    def reset(self):
+        pass
+
+    def generate(self, real_positions, team):
+        generator = self.generator
+        fake_positions = []
+        map_zones = generator.get_map_zones(team)
+        is_allowed = generator.is_plausible_enemy_position if team == 'enemy' else None
+
+        for real_pos in real_positions:
+            # Seleccionar una zona válida basada en la posición real
+            if generator.is_in_base(real_pos, team):
+                # Salir de la base hacia la zona propia (la jungla en la Grieta)
+                zone = generator.rng.choice(generator.map_pack.home_zones('jungle', team))
+            else:
+                # Mantener en la misma zona o mover a adyacente
+                current_zone = generator.get_position_zone(real_pos)
+                zone = generator.rng.choice(generator.get_adjacent_zones(current_zone))
+
+            # Generar posición en la zona seleccionada sin pisar otros iconos
+            position = generator.placement.place(map_zones[zone], team, generator.zone_filter(zone, is_allowed))
+            if position is None:
+                # Ningún punto permitido en la zona: mantener la posición del frame anterior
+                position = generator.last_positions.get((team, len(fake_positions)), generator.map_pack.anchors[zone])
+                generator.placement.grid.insert(position, team)
+            fake_positions.append(position)
+
+        return fake_positions
+
+class TrajectoryStrategy:
+    """
+    Nivel medio: cada icono falso recorre una trayectoria continua entre zonas adyacentes.
+    Los enemigos solo eligen destinos con visión; si no hay ninguno, esperan y vuelven a probar.
+    """
+    def __init__(self, generator, speed_ratio=0.02, target_attempts=8, retry_frames=5):
+        self.generator = generator
+        self.speed_ratio = speed_ratio
+        self.target_attempts = target_attempts
+        self.retry_frames = retry_frames
+        self.entities = {}
+
+    def reset(self):
+        self.entities = {}
+
+    def _spawn(self, real_pos, team, index):
+        """Crea una entidad simulada partiendo de una zona plausible para la posición real"""
+        generator = self.generator
+        zone = generator.get_position_zone(real_pos)
+        x, y = (generator.placement.place(generator.get_map_zones(team)[zone], team, generator.zone_filter(zone))
+                or generator.map_pack.anchors[zone])
+        entity = SimulatedEntity(x, y, zone, ROLES[index % len(ROLES)])
+        self._next_target(entity, team)
+        return entity
+
+    def _target_point(self, zone, team):
+        """Punto de destino en la zona (con visión si es un enemigo) o None si no se encuentra"""
+        generator = self.generator
+        for _ in range(self.target_attempts):
+            point = generator.random_point_in_zone(zone)
+            if team != 'enemy' or generator.is_plausible_enemy_position(point):
+                return point
+        return None
+
+    def _hold(self, entity):
+        """Sin destino posible: quedarse quieto unos frames y volver a decidir"""
+        entity.target = (entity.x, entity.y)
+        entity.wait = max(entity.wait, self.retry_frames)
+
+    def _next_target(self, entity, team):
+        """Elige el siguiente destino: un punto en una zona adyacente"""
+        generator = self.generator
+        zones = generator.get_adjacent_zones(entity.zone)
+        zone = generator.rng.choice(zones)
+        target = self._target_point(zone, team)
+        if target is None:
+            # Esa zona está en niebla: probar las demás adyacentes
+            for other in zones:
+                if other != zone:
+                    target = self._target_point(other, team)
+                    if target is not None:
+                        zone = other
+                        break
+        if target is None:
+            self._hold(entity)
+            return
+        entity.zone = zone
+        entity.target = target
+
+    def _step(self, entity, speed):
+        """Avanza hacia el destino; devuelve True al llegar"""
+        dx = entity.target[0] - entity.x
+        dy = entity.target[1] - entity.y
+        distance = math.hypot(dx, dy)
+        if distance <= speed:
+            entity.x, entity.y = entity.target
+            return True
+        entity.x += dx / distance * speed
+        entity.y += dy / distance * speed
+        return False
+
+    def _update(self, entity, team, speed):
+        if entity.wait > 0:
+            entity.wait -= 1
+        elif team == 'enemy' and not self.generator.is_plausible_enemy_position(entity.target):
+            # La niebla cubrió el destino: cambiarlo en vez de desaparecer en ella
+            self._next_target(entity, team)
+        elif self._step(entity, speed):
+            self._next_target(entity, team)
+
+    def generate(self, real_positions, team):
+        entities = self.entities.setdefault(team, [])
+        # Ajustar el número de entidades simuladas al de iconos reales detectados
+        for index in range(len(entities), len(real_positions)):
+            entities.append(self._spawn(real_positions[index], team, index))
+        del entities[len(real_positions):]
+
+        speed = max(1.0, self.generator.canonical_size * self.speed_ratio)
+        positions = []
+        for entity in entities:
+            self._update(entity, team, speed)
+            position = (int(entity.x), int(entity.y))
+            # Registrar en la rejilla para que los niveles se mezclen sin solapes
+            self.generator.placement.grid.insert(position, team)
+            positions.append(position)
+        return positions
+
+class BehaviorSimulationStrategy(TrajectoryStrategy):
+    """
+    Nivel completo: cada rol sigue una máquina de estados sencilla
+    (fase de líneas, emboscadas del jungla y vueltas a base)
+    """
+    def __init__(self, generator, speed_ratio=0.02, recall_probability=0.01,
+                 gank_probability=0.03, wait_frames=(3, 10)):
+        super().__init__(generator, speed_ratio)
+        self.recall_probability = recall_probability
+        self.gank_probability = gank_probability
+        self.wait_frames = wait_frames
+
+    def _home_zone(self, entity, team):
+        zones = self.generator.map_pack.home_zones(entity.role, team)
+        return zones[0] if len(zones) == 1 else self.generator.rng.choice(zones)
+
+    def _can_recall(self, team):
+        """Un enemigo solo vuelve a base si la base tiene visión (si no, desaparecería)"""
+        pack = self.generator.map_pack
+        return team != 'enemy' or self.generator.is_plausible_enemy_position(pack.anchors[pack.base_zone(team)])
+
+    def _go_to_zone(self, entity, team, zone, state):
+        target = self._target_point(zone, team)
+        if target is None:
+            self._hold(entity)
+            return
+        entity.zone = zone
+        entity.state = state
+        entity.target = target
+
+    def _next_target(self, entity, team):
+        rng = self.generator.rng
+        state = entity.state
+
+        if state == 'recall':
+            # En base: esperar la vuelta y regresar a su zona
+            entity.wait = rng.randint(*self.wait_frames)
+            self._go_to_zone(entity, team, self._home_zone(entity, team), 'laning')
+        elif state == 'gank':
+            entity.wait = rng.randint(*self.wait_frames)
+            self._go_to_zone(entity, team, self._home_zone(entity, team), 'laning')
+        elif rng.random() < self.recall_probability and self._can_recall(team):
+            pack = self.generator.map_pack
+            base = pack.base_zone(team)
+            entity.zone = base
+            entity.state = 'recall'
+            entity.target = pack.anchors[base]
+        elif entity.role == 'jungle' and rng.random() < self.gank_probability:
+            self._go_to_zone(entity, team, rng.choice(self.generator.map_pack.gank_zones), 'gank')
+        else:
+            # Fase de líneas / farmeo: moverse dentro de su zona habitual
+            self._go_to_zone(entity, team, self._home_zone(entity, team), 'laning')
+
+class TierController:
+    """
+    Elige la estrategia según fakeness_level y baja de nivel automáticamente
+    si el tiempo medio por frame supera el presupuesto (vuelve a subir cuando sobra margen)
+    """
+    def __init__(self, generator, upgrade_after=120, smoothing=0.1):
+        self.generator = generator
+        self.strategies = [
+            ZoneJitterStrategy(generator),
+            TrajectoryStrategy(generator),
+            BehaviorSimulationStrategy(generator)
+        ]
+        self.upgrade_after = upgrade_after
+        self.smoothing = smoothing
+        self.active_tier = None
+        self.avg_ms = None
+        self.frames_under_budget = 0
+        self._frame_start = None
+
+    def target_tier(self):
+        return tier_for_fakeness(self.generator.config['fakeness_level'])
+
+    def _switch(self, tier):
+        logger.info("Estrategia de generación: %s", TIER_NAMES[tier], extra={'tier': tier, 'avg_ms': self.avg_ms})
+        self.active_tier = tier
+        self.strategies[tier].reset()
+        self.avg_ms = None
+        self.frames_under_budget = 0
+
+    def reset(self):
+        """Vuelve a elegir la estrategia en el próximo frame (p. ej. al cambiar fakeness_level)"""
+        self.active_tier = None
+
+    def begin_frame(self):
+        """Marca el inicio de un frame y aplica cambios de fakeness_level"""
+        target = self.target_tier()
+        if self.active_tier is None or self.active_tier > target:
+            self._switch(target)
+        self._frame_start = time.perf_counter()
+
+    def end_frame(self):
+        """Mide el frame y ajusta el nivel según el presupuesto"""
+        if self._frame_start is None:
+            return
+        elapsed_ms = (time.perf_counter() - self._frame_start) * 1000
+        self._frame_start = None
+        if self.avg_ms is None:
+            self.avg_ms = elapsed_ms
+        else:
+            self.avg_ms += self.smoothing * (elapsed_ms - self.avg_ms)
+
+        budget = self.generator.config['frame_budget_ms']
+        if self.avg_ms > budget and self.active_tier > TIER_JITTER:
+            self._switch(self.active_tier - 1)
+        elif self.avg_ms < budget / 2 and self.active_tier < self.target_tier():
+            self.frames_under_budget += 1
+            if self.frames_under_budget >= self.upgrade_after:
+                self._switch(self.active_tier + 1)
+        else:
+            self.frames_under_budget = 0
+
+    def generate(self, real_positions, team):
+        if self.active_tier is None:
+            self._switch(self.target_tier())
+        return self.strategies[self.active_tier].generate(real_positions, team)
@@ -1,9 +1,17 @@
 import json
-import requests
+import re
+import unicodedata
+import difflib
+
+def icon_file_name(champ_name):
+    """Nombre del fichero de icono (sin .png): sin apóstrofos ni espacios y en minúsculas"""
+    return champ_name.replace("'", "").replace(" ", "").lower()
 
 class ChampionDatabase:
     def __init__(self):
         self.champions = self._load_champions()
+        self.name_index, self.trigram_index = self._build_name_index()
+        self._ids_by_name = None
 
     def _load_champions(self):
         """Carga lso datos de campeones desde el Data Dragon de LoL"""
@@ -11,6 +19,8 @@ class ChampionDatabase:
         url = f"https://ddragon.leagueoflegends.com/cdn/{version}/data/es_ES/champion.json"
 
         try:
+            # requests solo se importa si de verdad hay que descargar (no en cada arranque)
+            import requests
             response = requests.get(url)
             data = response.json()
             return {champ["key"]: champ["name"] for champ in data["data"].values()}
@@ -18,11 +28,69 @@ class ChampionDatabase:
             # Fallback local
             return {"266": "Aatrox", "103": "Ahri", "84": "akali"}  # Ejemplo básico
 
-        def get_champion_name(self, champion_id):
-            """Obtiene el nombre de un campeón por su ID"""
-            return self.champions.get(str(champion_id), "Desconocido")
+    def get_champion_name(self, champion_id):
+        """Obtiene el nombre de un campeón por su ID"""
+        return self.champions.get(str(champion_id), "Desconocido")
+
+    def get_champion_id(self, champion_name):
+        """Obtiene el ID numérico de un campeón por su nombre (0 si no se conoce)"""
+        if self._ids_by_name is None:
+            self._ids_by_name = {self.normalize_name(name): int(key) for key, name in self.champions.items()}
+        return self._ids_by_name.get(self.normalize_name(champion_name or ""), 0)
+
+    @staticmethod
+    def normalize_name(name):
+        """Normaliza un nombre para comparación (sin acentos, espacios ni signos)"""
+        name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+        return re.sub(r'[^a-z0-9]', '', name.lower())
+
+    @staticmethod
+    def _trigrams(normalized):
+        padded = f"  {normalized} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def _build_name_index(self):
+        """Precalcula el índice de nombres normalizados y de trigramas"""
+        name_index = {}
+        trigram_index = {}
+        for name in self.champions.values():
+            normalized = self.normalize_name(name)
+            if not normalized:
+                continue
+            name_index[normalized] = name
+            for trigram in self._trigrams(normalized):
+                trigram_index.setdefault(trigram, set()).add(normalized)
+        return name_index, trigram_index
+
+    def match_name(self, text, cutoff=0.6):
+        """
+        Busca el campeón más parecido a un texto reconocido por OCR
+        :param text: Texto reconocido (puede contener errores)
+        :param cutoff: Similitud mínima aceptada (0-1)
+        :return: Nombre canónico del campeón o None
+        """
+        normalized = self.normalize_name(text or "")
+        if not normalized:
+            return None
+        if normalized in self.name_index:
+            return self.name_index[normalized]
+
+        # Preseleccionar candidatos que comparten trigramas para no comparar contra todos
+        votes = {}
+        for trigram in self._trigrams(normalized):
+            for candidate in self.trigram_index.get(trigram, ()):
+                votes[candidate] = votes.get(candidate, 0) + 1
+        candidates = sorted(votes, key=votes.get, reverse=True)[:10]
+
+        best_name, best_ratio = None, cutoff
+        for candidate in candidates:
+            ratio = difflib.SequenceMatcher(None, normalized, candidate).ratio()
+            if ratio >= best_ratio:
+                best_name, best_ratio = candidate, ratio
+        return self.name_index[best_name] if best_name else None
 
     # Ejemplo de uso
 if __name__ == "__main__":
     db = ChampionDatabase()
-    print(db.get_champion_name(266))  # Devuelve "Aatrox"
\ No newline at end of file
+    print(db.get_champion_name(266))  # Devuelve "Aatrox"
+    print(db.match_name("Aatr0x"))  # Devuelve "Aatrox"
@@ -0,0 +1 @@
+from .icon_detection import ChampionDetector
@@ -0,0 +1,134 @@
+import json
+import logging
+import os
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Clases de color del minimapa
+CLASS_TERRAIN = 0
+CLASS_ALLY = 1
+CLASS_ENEMY = 2
+CLASS_PING = 3
+CLASS_FOG = 4
+CLASS_NAMES = ['terrain', 'ally', 'enemy', 'ping', 'fog']
+
+# Rangos HSV (OpenCV, H en 0-179) usados para construir la tabla
+ALLY_RING_HSV = ((95, 120, 120), (110, 255, 255))
+ENEMY_RING_HSV = [((0, 150, 120), (8, 255, 255)), ((170, 150, 120), (179, 255, 255))]
+PING_HSV = ((20, 150, 180), (35, 255, 255))
+FOG_MAX_BRIGHTNESS = 60
+
+# Bits por canal tras cuantizar (5 bits -> tabla de 32x32x32 = 32 KB)
+QUANT_BITS = 5
+QUANT_SHIFT = 8 - QUANT_BITS
+LUT_SIDE = 1 << QUANT_BITS
+
+def _in_range(hsv, low, high):
+    return np.all((hsv >= low) & (hsv <= high), axis=-1)
+
+class ColorLUT:
+    """
+    Tabla 3D (RGB cuantizado -> clase) para etiquetar un minimapa entero con un
+    único acceso vectorizado en lugar de convertir a HSV y umbralizar por frame
+    """
+    def __init__(self, table):
+        self.table = table
+
+    @classmethod
+    def from_rules(cls):
+        """Construye la tabla evaluando los rangos HSV sobre el centro de cada celda"""
+        levels = (np.arange(LUT_SIDE, dtype=np.uint16) << QUANT_SHIFT) + (1 << QUANT_SHIFT) // 2
+        r, g, b = np.meshgrid(levels, levels, levels, indexing='ij')
+        rgb = np.stack([r, g, b], axis=-1).astype(np.uint8).reshape(-1, 1, 3)
+        hsv = cv2.cvtColor(rgb, cv2.COLOR_RGB2HSV).reshape(-1, 3)
+
+        table = np.full(len(hsv), CLASS_TERRAIN, dtype=np.uint8)
+        table[rgb.reshape(-1, 3).max(axis=1) < FOG_MAX_BRIGHTNESS] = CLASS_FOG
+        table[_in_range(hsv, *PING_HSV)] = CLASS_PING
+        for low, high in ENEMY_RING_HSV:
+            table[_in_range(hsv, low, high)] = CLASS_ENEMY
+        table[_in_range(hsv, *ALLY_RING_HSV)] = CLASS_ALLY
+        return cls(table.reshape(LUT_SIDE, LUT_SIDE, LUT_SIDE))
+
+    def refine(self, samples, min_votes=8):
+        """
+        Ajusta la tabla con muestras etiquetadas (votación por celda)
+        :param samples: Iterable de (frame RGB, mapa de clases por píxel)
+        :param min_votes: Votos mínimos para que una celda sustituya a la regla
+        """
+        votes = np.zeros((LUT_SIDE ** 3, len(CLASS_NAMES)), dtype=np.int64)
+        for frame, class_map in samples:
+            np.add.at(votes, (self._indices(frame).ravel(), class_map.ravel()), 1)
+
+        total = votes.sum(axis=1)
+        confident = total >= min_votes
+        flat = self.table.reshape(-1)
+        flat[confident] = votes[confident].argmax(axis=1)
+        return self
+
+    @staticmethod
+    def _indices(frame):
+        q = frame >> QUANT_SHIFT
+        return (q[..., 0].astype(np.int32) << (2 * QUANT_BITS)) | (q[..., 1].astype(np.int32) << QUANT_BITS) | q[..., 2]
+
+    def classify(self, frame):
+        """Etiqueta cada píxel de un frame RGB (uint8) con su clase"""
+        q = frame >> QUANT_SHIFT
+        return self.table[q[..., 0], q[..., 1], q[..., 2]]
+
+    def mask(self, classes, class_id):
+        """Máscara uint8 (0/255) de una clase a partir del resultado de classify"""
+        return (classes == class_id).view(np.uint8) * 255
+
+    def save(self, path):
+        # Escritura atómica: varios procesos de detección pueden construir la tabla a la vez
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            np.save(f, self.table)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        return cls(np.load(path))
+
+def current_game_version(icon_path='assets/icons/'):
+    """Versión del juego de los iconos descargados (según metadata.json)"""
+    try:
+        with open(os.path.join(icon_path, 'metadata.json'), 'r') as f:
+            return json.load(f).get('version') or 'default'
+    except (OSError, ValueError):
+        return 'default'
+
+def load_or_build_lut(version=None, cache_dir='cache', samples=None):
+    """
+    Carga la tabla de la versión indicada desde disco o la construye y la guarda
+    :param samples: Muestras etiquetadas opcionales para refinar una tabla nueva
+    """
+    version = version or current_game_version()
+    path = os.path.join(cache_dir, f"color_lut_{version}.npy")
+    if os.path.exists(path):
+        try:
+            return ColorLUT.load(path)
+        except Exception as e:
+            logger.warning("Tabla de color corrupta, se reconstruye: %s", e)
+
+    lut = ColorLUT.from_rules()
+    if samples is not None:
+        lut.refine(samples)
+    try:
+        lut.save(path)
+    except OSError as e:
+        logger.warning("No se pudo guardar la tabla de color: %s", e)
+    return lut
+
+_default_lut = None
+
+def get_default_lut():
+    """Tabla compartida del proceso, cargada o construida al primer uso"""
+    global _default_lut
+    if _default_lut is None:
+        _default_lut = load_or_build_lut()
+    return _default_lut
@@ -0,0 +1,130 @@
+import logging
+import time
+import threading
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Estados de pantalla reconocidos
+STATE_UNKNOWN = 'unknown'
+STATE_CLIENT = 'client'
+STATE_LOADING = 'loading'
+STATE_INGAME = 'ingame'
+
+# Tamaño de la miniatura usada para clasificar (ancho, alto)
+THUMB_SIZE = (32, 18)
+
+def classify_screen_state(screenshot):
+    """
+    Clasifica el estado de la pantalla a partir de una miniatura
+    :param screenshot: Captura de pantalla completa (RGB) o ya reducida a THUMB_SIZE
+    :return: STATE_CLIENT, STATE_LOADING, STATE_INGAME o STATE_UNKNOWN
+    """
+    if screenshot is None or screenshot.size == 0:
+        return STATE_UNKNOWN
+
+    thumb = cv2.resize(screenshot, THUMB_SIZE, interpolation=cv2.INTER_AREA)
+    gray = cv2.cvtColor(thumb, cv2.COLOR_RGB2GRAY).astype(np.float32)
+
+    # La pantalla de carga es un fondo casi negro con dos filas de cartas
+    # (mitad superior e inferior) y una franja oscura en el centro
+    h = gray.shape[0]
+    top = gray[h // 8:h * 3 // 8].mean()
+    middle = gray[h * 7 // 16:h * 9 // 16].mean()
+    bottom = gray[h * 5 // 8:h * 7 // 8].mean()
+    if middle < 20 and top > middle + 15 and bottom > middle + 15:
+        return STATE_LOADING
+
+    # En partida el minimapa ocupa la esquina inferior derecha y el HUD la franja inferior
+    minimap = gray[-h // 4:, -THUMB_SIZE[0] // 6:]
+    hud = gray[-2:, THUMB_SIZE[0] // 4:THUMB_SIZE[0] * 3 // 4]
+    if minimap.std() > 12 and hud.mean() < 70:
+        return STATE_INGAME
+
+    # El cliente tiene una barra superior y mucho contenido plano
+    if gray.std() > 5:
+        return STATE_CLIENT
+    return STATE_UNKNOWN
+
+class CompositionWatcher:
+    """
+    Vigila la pantalla en segundo plano con bajo ciclo de trabajo y lanza la detección
+    completa de composición solo al entrar en la pantalla de carga
+    """
+    def __init__(self, capture, detector, generator, interval=1.0):
+        """
+        :param detector: ChampionDetector; si es None se crea en el hilo de vigilancia
+            la primera vez que hace falta (evita cargar OCR y base de datos al arrancar)
+        """
+        self.capture = capture
+        self.detector = detector
+        self.generator = generator
+        self.interval = interval
+        self.state = STATE_UNKNOWN
+        self.composition_detected = False
+        self.running = False
+        self.thread = None
+        self.on_composition = None  # Callback opcional(composition)
+
+    def start(self):
+        """Inicia el hilo de vigilancia"""
+        self.running = True
+        self.thread = threading.Thread(target=self._watch_loop, name="CompositionWatcher")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """Detiene el hilo de vigilancia y libera el detector"""
+        self.running = False
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=2.0)
+        # Si el hilo sigue en un OCR largo no se le cierra el detector que está usando
+        if self.detector is not None and not (self.thread and self.thread.is_alive()):
+            self.detector.close()
+            self.detector = None
+
+    def _watch_loop(self):
+        """Bucle de vigilancia del estado de pantalla"""
+        while self.running:
+            try:
+                # Miniatura de la última captura del pipeline: sin captura completa en cada ciclo
+                state = classify_screen_state(self.capture.screen_thumbnail(THUMB_SIZE, max_age=self.interval))
+
+                # Volver al cliente significa que la próxima carga es otra partida
+                if state == STATE_CLIENT:
+                    self.composition_detected = False
+
+                # Solo se hace OCR durante la pantalla de carga y hasta obtener resultado
+                if state == STATE_LOADING and not self.composition_detected:
+                    if self.state != STATE_LOADING:
+                        # Dar tiempo a que se dibujen los nombres en las cartas
+                        time.sleep(self.interval)
+                    self.composition_detected = self._detect_composition()
+                self.state = state
+            except Exception:
+                logger.exception("Error vigilando la pantalla")
+
+            time.sleep(self.interval)
+
+    def _detect_composition(self):
+        """
+        Ejecuta la detección completa y la publica en el generador
+        :return: True si se detectó al menos un campeón
+        """
+        screenshot = self.capture.capture_full_screen()
+        if screenshot is None:
+            return False
+
+        if self.detector is None:
+            from .champion_detector import ChampionDetector
+            self.detector = ChampionDetector()
+
+        composition = self.detector.detect_champions_loading_screen(screenshot)
+        if not composition or not (composition['aliados'] or composition['enemigos']):
+            return False
+
+        self.generator.set_team_composition(composition)
+        if self.on_composition:
+            self.on_composition(composition)
+        return True
@@ -0,0 +1,96 @@
+import configparser
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+def read_config(path):
+    """Lee un .ini: devuelve (ConfigParser, {sección: {clave: valor}})"""
+    parser = configparser.ConfigParser()
+    with open(path, 'r', encoding='utf-8') as f:
+        parser.read_file(f)
+    return parser, {section: dict(parser.items(section)) for section in parser.sections()}
+
+class ConfigWatcher:
+    """
+    Vigila config.ini comprobando su fecha de modificación (funciona igual en
+    Windows y Linux) y avisa a los suscriptores con las secciones que cambiaron.
+    Los suscriptores solo deben programar los cambios: cada componente los aplica
+    entre dos frames para no dejar el pipeline a medio configurar.
+    """
+    def __init__(self, path='config/config.ini', interval=1.0):
+        self.path = path
+        self.interval = interval
+        self.running = False
+        self.thread = None
+        self.listeners = []
+        self.mtime = self._mtime()
+        try:
+            _, self.snapshot = read_config(path)
+        except (OSError, configparser.Error):
+            self.snapshot = {}
+
+    def _mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def subscribe(self, callback, sections=None):
+        """
+        Registra una función callback(config, secciones_cambiadas)
+        :param sections: Secciones que interesan (None = cualquiera)
+        """
+        self.listeners.append((callback, set(sections) if sections else None))
+
+    def check(self):
+        """
+        Relee el fichero si cambió y notifica las secciones modificadas
+        :return: Conjunto de secciones cambiadas (vacío si no hubo cambios)
+        """
+        mtime = self._mtime()
+        if mtime is None or mtime == self.mtime:
+            return set()
+        try:
+            config, snapshot = read_config(self.path)
+        except (OSError, configparser.Error) as e:
+            # Probablemente el editor está guardando: se reintenta en la siguiente comprobación
+            logger.warning("Configuración no válida, se mantiene la anterior: %s", e)
+            return set()
+        self.mtime = mtime
+
+        changed = {
+            section for section in set(snapshot) | set(self.snapshot)
+            if snapshot.get(section) != self.snapshot.get(section)
+        }
+        self.snapshot = snapshot
+        if not changed:
+            return changed
+
+        logger.info("Configuración modificada: %s", ', '.join(sorted(changed)), extra={'sections': sorted(changed)})
+        for callback, sections in self.listeners:
+            if sections is None or sections & changed:
+                try:
+                    callback(config, changed)
+                except Exception:
+                    logger.exception("Error aplicando la configuración")
+        return changed
+
+    def start(self):
+        """Inicia la vigilancia en segundo plano"""
+        self.running = True
+        self.thread = threading.Thread(target=self._watch_loop, name="ConfigWatcher")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=2.0)
+
+    def _watch_loop(self):
+        while self.running:
+            self.check()
+            time.sleep(self.interval)
@@ -0,0 +1,220 @@
+import logging
+import threading
+import time
+import cv2
+import numpy as np
+from .behavior_tiers import TIER_NAMES
+from .motion_gate import MotionGate
+
+logger = logging.getLogger(__name__)
+
+HUD_HEIGHT = 64
+STAGES = ('captura', 'deteccion', 'generacion', 'total')
+ALLY_COLOR_BGR = (255, 120, 0)
+ENEMY_COLOR_BGR = (30, 30, 230)
+
+class StageTimer:
+    """Media móvil exponencial del tiempo (ms) de cada etapa del pipeline"""
+    def __init__(self, smoothing=0.1):
+        self.smoothing = smoothing
+        self.ms = dict.fromkeys(STAGES, 0.0)
+
+    def record(self, stage, seconds):
+        value = seconds * 1000
+        previous = self.ms[stage]
+        self.ms[stage] = value if previous == 0.0 else previous + self.smoothing * (value - previous)
+
+class DebugView:
+    """
+    Modo depuración: el pipeline (captura, detección y generación) corre en su
+    propio hilo a su ritmo y la vista se compone a display_fps en búferes
+    reservados una sola vez, así dibujar no altera los tiempos que se miden.
+    Muestra una única ventana lado a lado (minimapa real con las detecciones |
+    minimapa con el overlay falso) con un HUD de tiempos. En modo headless no
+    abre ventanas y puede grabar un vídeo anotado a menor resolución.
+    """
+    def __init__(self, capture, generator, panel_size=(320, 320), pipeline_fps=30, display_fps=15,
+                 headless=False, video_path=None, video_scale=0.5, video_fps=10):
+        self.capture = capture
+        self.generator = generator
+        self.pipeline_interval = 1.0 / max(1, pipeline_fps)
+        self.display_interval = 1.0 / max(1, display_fps)
+        self.headless = headless
+        self.timer = StageTimer()
+        self.motion_gate = MotionGate()
+        self.running = False
+        self.thread = None
+        self.lock = threading.Lock()
+        self.latest = None
+        self.pipeline_frames = 0
+        self.skipped_frames = 0
+
+        # Búferes de la vista (BGR, contiguos): se reutilizan en cada frame
+        width, height = panel_size
+        self.panel_size = panel_size
+        self.canvas = np.zeros((HUD_HEIGHT + height, 2 * width, 3), dtype=np.uint8)
+        self._real = np.zeros((height, width, 3), dtype=np.uint8)
+        self._resized = np.zeros((height, width, 3), dtype=np.uint8)
+        self._overlay_rgba = np.zeros((height, width, 4), dtype=np.uint8)
+        self._overlay_bgr = np.zeros((height, width, 3), dtype=np.uint8)
+        self._alpha = np.zeros((height, width, 1), dtype=np.float32)
+        self._blend = np.zeros((height, width, 3), dtype=np.float32)
+        self._shown_frame = None
+        self._shown_overlay = None
+
+        self.video = None
+        self.video_interval = 1.0 / max(1, video_fps)
+        if video_path:
+            video_size = (int(self.canvas.shape[1] * video_scale) // 2 * 2,
+                          int(self.canvas.shape[0] * video_scale) // 2 * 2)
+            self._video_frame = np.zeros((video_size[1], video_size[0], 3), dtype=np.uint8)
+            self.video = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*'mp4v'), video_fps, video_size)
+            if not self.video.isOpened():
+                logger.error("No se pudo abrir el vídeo de depuración %s", video_path)
+                self.video = None
+
+    def start(self):
+        """Inicia el hilo del pipeline"""
+        self.running = True
+        self.thread = threading.Thread(target=self._pipeline_loop, name="DebugPipeline")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=2.0)
+        if self.video is not None:
+            self.video.release()
+            self.video = None
+        if not self.headless:
+            cv2.destroyAllWindows()
+
+    def _pipeline_loop(self):
+        """Captura, detecta y genera sin esperar a la vista"""
+        overlay, real_allies, real_enemies = None, [], []
+        while self.running:
+            started = time.perf_counter()
+            try:
+                minimap_frame = self.capture.capture_minimap()
+                captured = time.perf_counter()
+                self.timer.record('captura', captured - started)
+                if minimap_frame is None:
+                    time.sleep(1)
+                    continue
+
+                # Reutilizar el último overlay si el minimapa no cambió
+                if overlay is None or self.motion_gate.should_process(minimap_frame):
+                    real_allies, real_enemies = self.capture.detect_icons(minimap_frame)
+                    detected = time.perf_counter()
+                    overlay = self.generator.generate_fake_map(minimap_frame, real_allies, real_enemies)
+                    generated = time.perf_counter()
+                    self.timer.record('deteccion', detected - captured)
+                    self.timer.record('generacion', generated - detected)
+                    self.timer.record('total', generated - started)
+                else:
+                    self.skipped_frames += 1
+
+                with self.lock:
+                    self.latest = (minimap_frame, overlay, real_allies, real_enemies)
+                self.pipeline_frames += 1
+            except Exception:
+                logger.exception("Error en el pipeline de depuración")
+
+            time.sleep(max(0.0, self.pipeline_interval - (time.perf_counter() - started)))
+
+    def _compose(self, minimap_frame, overlay, real_allies, real_enemies):
+        """Compone la vista en self.canvas; solo recalcula lo que cambió"""
+        width, height = self.panel_size
+        if minimap_frame is not self._shown_frame:
+            cv2.resize(minimap_frame, (width, height), dst=self._resized, interpolation=cv2.INTER_AREA)
+            cv2.cvtColor(self._resized, cv2.COLOR_RGB2BGR, dst=self._real)
+            self._shown_frame = minimap_frame
+            self._shown_overlay = None  # El fondo del panel derecho cambió
+
+        if overlay is not self._shown_overlay:
+            rgba = np.asarray(overlay)
+            cv2.resize(rgba, (width, height), dst=self._overlay_rgba, interpolation=cv2.INTER_AREA)
+            cv2.cvtColor(self._overlay_rgba, cv2.COLOR_RGBA2BGR, dst=self._overlay_bgr)
+            np.multiply(self._overlay_rgba[..., 3:4], 1.0 / 255, out=self._alpha)
+            # real + (overlay - real) * alfa
+            np.subtract(self._overlay_bgr, self._real, out=self._blend, dtype=np.float32)
+            np.multiply(self._blend, self._alpha, out=self._blend)
+            np.add(self._blend, self._real, out=self._blend)
+            np.copyto(self.canvas[HUD_HEIGHT:, width:], self._blend, casting='unsafe')
+            self._shown_overlay = overlay
+
+        left = self.canvas[HUD_HEIGHT:, :width]
+        np.copyto(left, self._real)
+        scale_x = width / minimap_frame.shape[1]
+        scale_y = height / minimap_frame.shape[0]
+        radius = max(3, width // 40)
+        for positions, color in ((real_allies, ALLY_COLOR_BGR), (real_enemies, ENEMY_COLOR_BGR)):
+            for x, y in positions:
+                cv2.circle(self.canvas, (int(x * scale_x), HUD_HEIGHT + int(y * scale_y)), radius, color, 1)
+
+    def _draw_hud(self, display_fps, pipeline_fps):
+        self.canvas[:HUD_HEIGHT] = 0
+        ms = self.timer.ms
+        tiers = self.generator.tiers
+        tier = TIER_NAMES[tiers.active_tier] if tiers.active_tier is not None else '-'
+        lines = [
+            f"captura {ms['captura']:5.1f} ms  deteccion {ms['deteccion']:5.1f} ms  "
+            f"generacion {ms['generacion']:5.1f} ms  total {ms['total']:5.1f} ms",
+            f"pipeline {pipeline_fps:4.1f} fps  vista {display_fps:4.1f} fps  "
+            f"estaticos {self.skipped_frames}",
+            f"mapa {self.generator.map_pack.name}  estrategia {tier}"
+        ]
+        for i, line in enumerate(lines):
+            cv2.putText(self.canvas, line, (6, 18 + i * 18), cv2.FONT_HERSHEY_SIMPLEX, 0.42,
+                        (220, 220, 220), 1, cv2.LINE_AA)
+
+    def run(self):
+        """
+        Bucle de la vista (en el hilo principal, como requiere HighGUI).
+        Termina con 'q' o Ctrl+C.
+        """
+        self.start()
+        last_video = last_log = 0.0
+        last_tick, last_frames = time.perf_counter(), 0
+        display_fps = pipeline_fps = 0.0
+        frames_shown = 0
+        try:
+            while self.running:
+                tick = time.perf_counter()
+                with self.lock:
+                    latest = self.latest
+
+                if latest is not None:
+                    self._compose(*latest)
+                    frames_shown += 1
+                    if tick - last_tick >= 1.0:
+                        display_fps = frames_shown / (tick - last_tick)
+                        pipeline_fps = (self.pipeline_frames - last_frames) / (tick - last_tick)
+                        last_tick, last_frames, frames_shown = tick, self.pipeline_frames, 0
+                    self._draw_hud(display_fps, pipeline_fps)
+
+                    # Sin ventana, los tiempos también quedan en el registro
+                    if self.headless and tick - last_log >= 5.0:
+                        logger.info("Tiempos del pipeline (ms): %s", {k: round(v, 2) for k, v in self.timer.ms.items()},
+                                    extra={'timings_ms': dict(self.timer.ms), 'pipeline_fps': round(pipeline_fps, 1)})
+                        last_log = tick
+
+                    if self.video is not None and tick - last_video >= self.video_interval:
+                        cv2.resize(self.canvas, self._video_frame.shape[1::-1], dst=self._video_frame,
+                                   interpolation=cv2.INTER_AREA)
+                        self.video.write(self._video_frame)
+                        last_video = tick
+
+                if self.headless:
+                    time.sleep(max(0.0, self.display_interval - (time.perf_counter() - tick)))
+                else:
+                    if latest is not None:
+                        cv2.imshow('Minimapa Fantasmal - depuracion', self.canvas)
+                    wait_ms = int(max(0.0, self.display_interval - (time.perf_counter() - tick)) * 1000)
+                    if cv2.waitKey(max(1, wait_ms)) & 0xFF == ord('q'):
+                        break
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
@@ -0,0 +1,121 @@
+import json
+import logging
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Recursos derivados de los iconos descargados, precalculados por versión del juego
+# en <directorio de iconos>/../derived/<versión>:
+#   sprites_<n>.npy      (campeones, n, n, 4) RGBA escalados para el overlay
+#   index.json           versión, nombres (orden de las filas) y tamaños
+SPRITE_SIZES = (10, 12, 14, 16, 20, 24, 32)
+
+def _process_icon(path):
+    """Escala un icono a todos los tamaños de sprite (se ejecuta en un proceso del pool)"""
+    with Image.open(path) as icon:
+        rgba = icon.convert('RGBA')
+        return {size: np.asarray(rgba.resize((size, size), Image.LANCZOS)) for size in SPRITE_SIZES}
+
+def derived_root(icon_path):
+    """Directorio de derivados junto al de iconos (assets/icons -> assets/derived)"""
+    return os.path.join(os.path.dirname(os.path.normpath(icon_path)), 'derived')
+
+def derived_dir(version, root):
+    return os.path.join(root, version)
+
+def build_derived_assets(icon_path, version, root=None, workers=None, progress=None, force=False):
+    """
+    Genera todos los derivados de los iconos en paralelo (un proceso por núcleo)
+    :param icon_path: Directorio con los PNG descargados
+    :param version: Versión del juego (los derivados se guardan por versión)
+    :param root: Directorio de derivados (por defecto derived_root(icon_path))
+    :param progress: Función opcional progress(hechos, total, nombre)
+    :param force: Regenerar aunque ya existan para esta versión
+    :return: Directorio con los derivados
+    """
+    names = sorted(os.path.splitext(f)[0] for f in os.listdir(icon_path) if f.endswith('.png'))
+    output_dir = derived_dir(version, root or derived_root(icon_path))
+    if not force:
+        existing = _read_index(output_dir)
+        if existing and existing['names'] == names:
+            return output_dir
+
+    paths = [os.path.join(icon_path, f"{name}.png") for name in names]
+    workers = workers or os.cpu_count() or 1
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunksize = max(1, len(paths) // (4 * workers))
+        for done, result in enumerate(pool.map(_process_icon, paths, chunksize=chunksize), 1):
+            results.append(result)
+            if progress:
+                progress(done, len(paths), names[done - 1])
+
+    # Se escribe en un directorio temporal y se renombra: nunca queda un conjunto a medias
+    temp_dir = f"{output_dir}.{os.getpid()}.tmp"
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    os.makedirs(temp_dir)
+    count = len(results)
+    for size in SPRITE_SIZES:
+        stacked = np.stack([r[size] for r in results]) if count else np.zeros((0, size, size, 4), np.uint8)
+        np.save(os.path.join(temp_dir, f"sprites_{size}.npy"), stacked)
+    with open(os.path.join(temp_dir, "index.json"), 'w') as f:
+        json.dump({
+            'version': version,
+            'names': names,
+            'sprite_sizes': list(SPRITE_SIZES)
+        }, f, indent=2)
+
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.replace(temp_dir, output_dir)
+    return output_dir
+
+def _read_index(directory):
+    try:
+        with open(os.path.join(directory, "index.json"), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+class DerivedAssets:
+    """
+    Derivados precalculados de una versión. Los arrays se abren con mmap:
+    solo se lee de disco lo que se usa.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        index = _read_index(directory)
+        if index is None:
+            raise FileNotFoundError(f"No hay derivados en {directory}")
+        self.version = index['version']
+        self.names = index['names']
+        self.name_index = {name: i for i, name in enumerate(self.names)}
+        self.sprite_sizes = tuple(index['sprite_sizes'])
+        self._arrays = {}
+
+    def _array(self, name):
+        array = self._arrays.get(name)
+        if array is None:
+            array = np.load(os.path.join(self.directory, f"{name}.npy"), mmap_mode='r')
+            self._arrays[name] = array
+        return array
+
+    def __contains__(self, name):
+        return name in self.name_index
+
+    def sprite(self, name, size):
+        """Icono RGBA ya escalado (PIL) o None si no hay derivado para ese nombre o tamaño"""
+        index = self.name_index.get(name)
+        if index is None or size not in self.sprite_sizes:
+            return None
+        return Image.fromarray(np.array(self._array(f"sprites_{size}")[index]), 'RGBA')
+
+def load_derived_assets(version, root):
+    """Derivados de una versión, o None si no se generaron (se usará el PNG original)"""
+    try:
+        return DerivedAssets(derived_dir(version, root))
+    except FileNotFoundError:
+        return None
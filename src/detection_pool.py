@@ -0,0 +1,125 @@
+import logging
+import os
+import queue
+import struct
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context, shared_memory
+import numpy as np
+from .minimap_capture import detect_icons
+
+logger = logging.getLogger(__name__)
+
+# Tamaño máximo de frame que cabe en una ranura del anillo (alto, ancho, canales)
+MAX_FRAME_SHAPE = (512, 512, 3)
+
+# Memoria compartida abierta en cada proceso worker
+_worker_shm = None
+
+def _attach_shared_memory(name):
+    """Abre un bloque de memoria compartida existente (el proceso principal lo crea y lo borra)"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: los workers comparten el resource_tracker del proceso
+        # principal, que solo libera el bloque con su unlink(); no hay que tocarlo
+        return shared_memory.SharedMemory(name=name)
+
+def _init_worker(shm_name):
+    global _worker_shm
+    _worker_shm = _attach_shared_memory(shm_name)
+
+def _pack_positions(allies, enemies):
+    """Empaqueta las posiciones como int16: [n_aliados, n_enemigos, x0, y0, ...]"""
+    coords = [c for pos in allies for c in pos] + [c for pos in enemies for c in pos]
+    return struct.pack(f"<HH{len(coords)}h", len(allies), len(enemies), *coords)
+
+def _unpack_positions(data):
+    """Inverso de _pack_positions"""
+    n_allies, n_enemies = struct.unpack_from("<HH", data)
+    coords = struct.unpack_from(f"<{2 * (n_allies + n_enemies)}h", data, 4)
+    positions = list(zip(coords[0::2], coords[1::2]))
+    return positions[:n_allies], positions[n_allies:]
+
+def _detect_in_slot(slot, offset, shape):
+    """Ejecuta detect_icons sobre el frame de una ranura (en el proceso worker)"""
+    frame = np.ndarray(shape, dtype=np.uint8, buffer=_worker_shm.buf, offset=offset)
+    allies, enemies = detect_icons(frame)
+    return slot, _pack_positions(allies, enemies)
+
+class DetectionPool:
+    """
+    Pool de procesos para detect_icons.
+    Los frames se copian a ranuras de un anillo en memoria compartida, de modo que
+    solo viajan entre procesos el índice de ranura y el resultado empaquetado.
+    Si un worker muere su tarea se pierde: detect espera como mucho timeout
+    segundos y entonces detecta en este proceso.
+    """
+    def __init__(self, workers=None, slots=None, max_frame_shape=MAX_FRAME_SHAPE, timeout=2.0):
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.timeout = timeout
+        self.slot_count = slots or self.workers * 2
+        self.slot_bytes = int(np.prod(max_frame_shape))
+        self.shm = shared_memory.SharedMemory(create=True, size=self.slot_bytes * self.slot_count)
+
+        self.free_slots = queue.Queue()
+        for slot in range(self.slot_count):
+            self.free_slots.put(slot)
+
+        # 'spawn' para que funcione igual en Windows y Linux
+        self.pool = get_context('spawn').Pool(
+            self.workers, initializer=_init_worker, initargs=(self.shm.name,)
+        )
+
+    def submit(self, minimap_frame):
+        """
+        Envía un frame a detectar sin bloquear (salvo si todas las ranuras están ocupadas)
+        :return: Future con (aliados, enemigos)
+        """
+        future = Future()
+        frame = np.ascontiguousarray(minimap_frame, dtype=np.uint8)
+
+        # Frames más grandes que una ranura se procesan en este proceso
+        if frame.nbytes > self.slot_bytes:
+            future.set_result(detect_icons(frame))
+            return future
+
+        # Las ranuras de tareas perdidas no vuelven: sin ninguna libre se detecta aquí
+        try:
+            slot = self.free_slots.get(timeout=self.timeout)
+        except queue.Empty:
+            logger.warning("Sin ranuras libres en el pool de detección; se detecta en este proceso")
+            future.set_result(detect_icons(frame))
+            return future
+        offset = slot * self.slot_bytes
+        np.ndarray(frame.shape, dtype=np.uint8, buffer=self.shm.buf, offset=offset)[...] = frame
+
+        def on_done(result):
+            self.free_slots.put(result[0])
+            future.set_result(_unpack_positions(result[1]))
+
+        def on_error(error):
+            self.free_slots.put(slot)
+            future.set_exception(error)
+
+        self.pool.apply_async(
+            _detect_in_slot, (slot, offset, frame.shape),
+            callback=on_done, error_callback=on_error
+        )
+        return future
+
+    def detect(self, minimap_frame):
+        """Versión bloqueante de submit: devuelve (aliados, enemigos)"""
+        try:
+            return self.submit(minimap_frame).result(timeout=self.timeout)
+        except (FutureTimeoutError, BrokenProcessPool) as e:
+            logger.warning("El pool de detección no respondió (%s); se detecta en este proceso", type(e).__name__)
+            return detect_icons(minimap_frame)
+
+    def close(self):
+        """Detiene los workers y libera la memoria compartida"""
+        # terminate y no close: join esperaría para siempre a las tareas de un worker muerto
+        self.pool.terminate()
+        self.pool.join()
+        self.shm.close()
+        self.shm.unlink()
@@ -0,0 +1,41 @@
+class Entity:
+    """
+    Icono falso de un frame (coordenadas canónicas).
+    Con __slots__ cada registro ocupa una fracción de un dict y no crece con el tiempo.
+    """
+    __slots__ = ('team', 'slot', 'name', 'champion_id', 'x', 'y', 'vx', 'vy')
+
+    def __init__(self, team, slot, name, x, y, vx=0, vy=0, champion_id=0):
+        self.team = team
+        self.slot = slot
+        self.name = name
+        self.champion_id = champion_id
+        self.x = x
+        self.y = y
+        self.vx = vx
+        self.vy = vy
+
+    @property
+    def id(self):
+        """Identificador estable entre frames ('ally0', 'enemy3'...)"""
+        return f"{self.team}{self.slot}"
+
+    @property
+    def position(self):
+        return (self.x, self.y)
+
+    def __repr__(self):
+        return f"Entity({self.id}, {self.name!r}, x={self.x}, y={self.y}, v=({self.vx}, {self.vy}))"
+
+class SimulatedEntity:
+    """Estado interno de un icono que sigue una trayectoria (ver behavior_tiers)"""
+    __slots__ = ('x', 'y', 'zone', 'target', 'role', 'state', 'wait')
+
+    def __init__(self, x, y, zone, role, state='laning'):
+        self.x = float(x)
+        self.y = float(y)
+        self.zone = zone
+        self.target = (x, y)
+        self.role = role
+        self.state = state
+        self.wait = 0
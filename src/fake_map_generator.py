@@ -1,32 +1,149 @@
-import cv2
 import numpy as np
-from PIL import Image, ImageDraw
+import configparser
 import json
+import logging
 import os
 import random
+import threading
 from .champion_db import ChampionDatabase
+from .entities import Entity
+from .icon_cache import IconCache
+from .map_packs import DEFAULT_MAP, MapSelector, available_maps, load_map_pack
+from .spatial_hash import PlacementEngine
+from .behavior_tiers import TierController
+from .vision_mask import VisionMask
+from .overlay_renderer import CANONICAL_SIZE, OverlayRenderer
+from .overlay_protocol import encode_frame
+
+logger = logging.getLogger(__name__)
+
+# Ajustes del generador que se leen de config.ini:
+# clave -> (sección, método de lectura[, opción si no coincide con la clave])
+CONFIG_SETTINGS = {
+    'fakeness_level': ('Behavior', 'getint'),
+    'frame_budget_ms': ('Behavior', 'getfloat'),
+    'fog_aware': ('Behavior', 'getboolean'),
+    'icon_size': ('Icons', 'getint'),
+    'icon_path': ('Icons', 'get'),
+    'map': ('Map', 'get', 'name')
+}
+
+def settings_from_config(config):
+    """
+    Extrae los ajustes del generador presentes en un ConfigParser
+    :return: Diccionario con solo las claves definidas en el fichero
+    """
+    settings = {}
+    for key, (section, getter, *option) in CONFIG_SETTINGS.items():
+        option = option[0] if option else key
+        if config.has_option(section, option):
+            settings[key] = getattr(config, getter)(section, option)
+    return settings
 
 class FakeMapGenerator:
-    def __init__(self, config_path='config/config.ini'):
-        self.champion_db = ChampionDatabase()
+    def __init__(self, config_path='config/config.ini', champion_db=None, icon_cache=None, seed=None,
+                 load_in_background=False):
+        """
+        :param champion_db: ChampionDatabase compartida (se crea al primer uso si es None)
+        :param icon_cache: IconCache compartida entre generadores (se crea una si es None)
+        :param seed: Semilla del generador aleatorio para sesiones reproducibles
+        :param load_in_background: Cargar los iconos en un hilo sin bloquear el arranque
+        """
+        self._champion_db = champion_db
         self.minimap_size = (320, 320)  # Tamaño por defecto
         self.team_composition = {"aliados": [], "enemigos": []}
-        self.icon_cache = {}
+        self.rosters = {'ally': (), 'enemy': ()}
+        self.champion_ids = {}
+        self.seed = seed
+        self.rng = random.Random(seed)
         self.config = {
             'fakeness_level': 7,
             'icon_size': 12,
-            'icon_path': 'assets/icons/'
+            'icon_path': 'assets/icons/',
+            'frame_budget_ms': 8.0,
+            'fog_aware': True,
+            'map': 'auto'  # Nombre de un paquete de assets/maps/ o 'auto'
         }
-        self.load_icons()
+        if config_path and os.path.exists(config_path):
+            config = configparser.ConfigParser()
+            config.read(config_path)
+            self.config.update(settings_from_config(config))
+        # Cambios de configuración pendientes (ver update_config)
+        self.pending_config = {}
+        self.config_lock = threading.Lock()
+        self.icon_cache = icon_cache if icon_cache is not None else IconCache(
+            self.config['icon_path'], self.config['icon_size']
+        )
+        # Última posición de cada icono (equipo, ranura) para calcular su velocidad
+        self.last_positions = {}
+        # Separación mínima entre iconos falsos = tamaño de icono (sin solapes)
+        self.placement = PlacementEngine(self.config['icon_size'], rng=self.rng)
+        self.tiers = TierController(self)
+        self.canonical_size = CANONICAL_SIZE
+        self.renderer = OverlayRenderer(self.icon_cache, self.config['icon_size'])
+        self.vision = VisionMask()
+        # Zonas y adyacencias del mapa actual (paquete compilado, ver map_packs)
+        self.map_pack = load_map_pack(DEFAULT_MAP if self.config['map'] == 'auto' else self.config['map'])
+        self.map_selector = None
+        self.icons_thread = None
+        if icon_cache is None:
+            if load_in_background:
+                self.icons_thread = threading.Thread(target=self.load_icons, name="IconLoader")
+                self.icons_thread.daemon = True
+                self.icons_thread.start()
+            else:
+                self.load_icons()
+    
+    @property
+    def champion_db(self):
+        """Base de datos de campeones, cargada al primer acceso (requiere red)"""
+        if self._champion_db is None:
+            self._champion_db = ChampionDatabase()
+        return self._champion_db
     
     def load_icons(self):
-        """Carga los iconos de campeones desde el directorio"""
-        icon_path = self.config['icon_path']
-        if os.path.exists(icon_path):
-            for champ_file in os.listdir(icon_path):
-                if champ_file.endswith('.png'):
-                    champ_name = os.path.splitext(champ_file)[0]
-                    self.icon_cache[champ_name] = Image.open(os.path.join(icon_path, champ_file))
+        """Carga por adelantado los iconos de campeones (hasta el límite de la caché)"""
+        self.icon_cache.preload()
+    
+    def update_config(self, settings):
+        """
+        Programa cambios de configuración (p. ej. desde ConfigWatcher en otro hilo).
+        Se aplican todos juntos al inicio del siguiente frame.
+        """
+        with self.config_lock:
+            self.pending_config.update(settings)
+    
+    def apply_pending_config(self):
+        """Aplica los cambios pendientes reconstruyendo solo las cachés afectadas"""
+        with self.config_lock:
+            settings, self.pending_config = self.pending_config, {}
+        changes = {key: value for key, value in settings.items() if self.config.get(key) != value}
+        if not changes:
+            return
+        self.config.update(changes)
+        
+        if 'icon_path' in changes:
+            self.icon_cache.set_icon_path(changes['icon_path'])
+        if 'icon_size' in changes:
+            size = changes['icon_size']
+            self.icon_cache.set_icon_size(size)
+            self.renderer.set_icon_size(size)
+            self.placement.set_min_separation(size)
+        if 'map' in changes:
+            self.map_selector = None
+            if changes['map'] != 'auto':
+                self.set_map(changes['map'])
+        if 'fakeness_level' in changes:
+            # Entrar directamente en la estrategia del nuevo nivel
+            self.tiers.reset()
+        if 'fog_aware' in changes:
+            self.vision.reset()
+        logger.info("Configuración del generador actualizada: %s", changes, extra={'changes': changes})
+    
+    def set_seed(self, seed):
+        """Reinicia el generador aleatorio con una semilla (para reproducir sesiones)"""
+        self.seed = seed
+        self.rng.seed(seed)
     
     def set_minimap_size(self, width, height):
         """Actualiza el tamaño del minimapa"""
@@ -35,7 +152,16 @@ class FakeMapGenerator:
     def set_team_composition(self, composition):
         """Establece la composición de equipos"""
         self.team_composition = composition
-        print(f"Composición de equipos actualizada: {composition}")
+        rosters = {
+            'ally': tuple(composition.get('aliados', ())),
+            'enemy': tuple(composition.get('enemigos', ()))
+        }
+        # Los ids se resuelven aquí, fuera del bucle de frames (ver generate_fake_frame),
+        # y antes de publicar la plantilla para que nunca vaya sin sus ids
+        self.champion_ids = {name: self.champion_db.get_champion_id(name)
+                             for name in rosters['ally'] + rosters['enemy']}
+        self.rosters = rosters
+        logger.info("Composición de equipos actualizada: %s", composition, extra={'composition': composition})
     
     def generate_fake_positions(self, real_positions, team):
         """
@@ -43,97 +169,99 @@ class FakeMapGenerator:
         :param real_positions: Lista de posiciones reales (x, y)
         :param team: 'ally' o 'enemy'
         :return: Lista de posiciones falsas (x, y)
+        Las posiciones respetan la separación mínima con todo lo colocado desde
+        el último placement.begin_frame() (generate_fake_map lo llama en cada frame).
+        La estrategia (saltos entre zonas, trayectorias o simulación completa) depende
+        de fakeness_level y del presupuesto por frame (ver behavior_tiers.TierController).
         """
-        fake_positions = []
-        map_zones = self.get_map_zones(team)
-        
-        for real_pos in real_positions:
-            # Seleccionar una zona válida basada en la posición real
-            if team == 'ally' and self.is_in_base(real_pos, 'ally'):
-                zone = 'jungle'  # Mover aliados de base a jungla
-            elif team == 'enemy' and self.is_in_base(real_pos, 'enemy'):
-                zone = 'jungle'  # Mover enemigos de base a jungla
-            else:
-                # Mantener en la misma zona o mover a adyacente
-                current_zone = self.get_position_zone(real_pos)
-                adjacent_zones = self.get_adjacent_zones(current_zone)
-                zone = random.choice(adjacent_zones)
-            
-            # Generar posición aleatoria en la zona seleccionada
-            x_min, y_min, x_max, y_max = map_zones[zone]
-            new_x = random.randint(x_min, x_max)
-            new_y = random.randint(y_min, y_max)
-            
-            fake_positions.append((new_x, new_y))
-        
-        return fake_positions
+        return self.tiers.generate(real_positions, team)
+    
+    def set_map(self, name):
+        """Cambia de mapa cargando su paquete; las trayectorias en curso se descartan"""
+        if name == self.map_pack.name:
+            return
+        self.map_pack = load_map_pack(name)
+        self.tiers.reset()
+        logger.info("Mapa seleccionado: %s", self.map_pack.display_name, extra={'map': name})
+    
+    def select_map(self, minimap_frame):
+        """Con map = 'auto', reconoce el mapa a partir del minimapa capturado"""
+        if self.map_selector is None:
+            self.map_selector = MapSelector([load_map_pack(name) for name in available_maps()])
+        name = self.map_selector.update(minimap_frame)
+        if name:
+            self.set_map(name)
     
     def get_map_zones(self, team):
-        """Define las zonas del mapa con coordenadas relativas"""
-        # Coordenadas basadas en un minimapa de 320x320
-        scale_x = self.minimap_size[0] / 320
-        scale_y = self.minimap_size[1] / 320
-        
-        zones = {
-            'ally_base': (10, 10, 80, 80),
-            'enemy_base': (240, 240, 310, 310),
-            'top_lane': (100, 30, 220, 80),
-            'mid_lane': (130, 130, 190, 190),
-            'bot_lane': (100, 240, 220, 290),
-            'river': (110, 110, 210, 210),
-            'ally_jungle_top': (50, 80, 110, 140),
-            'ally_jungle_bot': (50, 180, 110, 240),
-            'enemy_jungle_top': (210, 80, 270, 140),
-            'enemy_jungle_bot': (210, 180, 270, 240)
-        }
-        
-        # Escalar zonas según el tamaño real del minimapa
-        scaled_zones = {}
-        for zone, coords in zones.items():
-            scaled_zones[zone] = (
-                int(coords[0] * scale_x),
-                int(coords[1] * scale_y),
-                int(coords[2] * scale_x),
-                int(coords[3] * scale_y)
-            )
-        
-        return scaled_zones
+        """Rectángulos envolventes de las zonas del mapa en el espacio canónico"""
+        return self.map_pack.bounds
     
     def is_in_base(self, position, team):
         """Determina si una posición está en la base del equipo"""
-        x, y = position
-        base_zones = self.get_map_zones(team)
-        base = base_zones['ally_base'] if team == 'ally' else base_zones['enemy_base']
-        return base[0] <= x <= base[2] and base[1] <= y <= base[3]
+        return self.map_pack.contains(self.map_pack.base_zone(team), position)
     
     def get_position_zone(self, position):
-        """Determina en qué zona está una posición"""
-        x, y = position
-        zones = self.get_map_zones('ally')  # Las zonas son las mismas para ambos equipos
-        
-        for zone, coords in zones.items():
-            if coords[0] <= x <= coords[2] and coords[1] <= y <= coords[3]:
-                return zone
-        
-        return 'river'  # Zona por defecto
+        """Determina en qué zona está una posición (consulta al ráster de etiquetas)"""
+        return self.map_pack.zone_at(position)
     
     def get_adjacent_zones(self, current_zone):
         """Devuelve zonas adyacentes válidas"""
-        adjacency_map = {
-            'ally_base': ['ally_jungle_top', 'ally_jungle_bot', 'top_lane', 'bot_lane'],
-            'enemy_base': ['enemy_jungle_top', 'enemy_jungle_bot', 'top_lane', 'bot_lane'],
-            'top_lane': ['ally_base', 'enemy_base', 'ally_jungle_top', 'enemy_jungle_top', 'river'],
-            'mid_lane': ['river', 'ally_jungle_top', 'ally_jungle_bot', 'enemy_jungle_top', 'enemy_jungle_bot'],
-            'bot_lane': ['ally_base', 'enemy_base', 'ally_jungle_bot', 'enemy_jungle_bot', 'river'],
-            'river': ['top_lane', 'mid_lane', 'bot_lane', 'ally_jungle_top', 'ally_jungle_bot', 
-                     'enemy_jungle_top', 'enemy_jungle_bot'],
-            'ally_jungle_top': ['ally_base', 'top_lane', 'mid_lane', 'river'],
-            'ally_jungle_bot': ['ally_base', 'bot_lane', 'mid_lane', 'river'],
-            'enemy_jungle_top': ['enemy_base', 'top_lane', 'mid_lane', 'river'],
-            'enemy_jungle_bot': ['enemy_base', 'bot_lane', 'mid_lane', 'river']
-        }
+        return self.map_pack.adjacency.get(current_zone, (self.map_pack.default_zone,))
+    
+    def random_point_in_zone(self, zone):
+        """Punto al azar dentro del polígono de una zona"""
+        return self.map_pack.random_point(zone, self.rng)
+    
+    def zone_filter(self, zone, is_allowed=None):
+        """Filtro para PlacementEngine.place: dentro del polígono de la zona (y de is_allowed)"""
+        pack = self.map_pack
+        if is_allowed is None:
+            return lambda position: pack.contains(zone, position)
+        return lambda position: pack.contains(zone, position) and is_allowed(position)
+    
+    def _begin_frame(self):
+        """Aplica la configuración pendiente y empieza a medir el frame (presupuesto de frame_budget_ms)"""
+        self.apply_pending_config()
+        self.tiers.begin_frame()
+    
+    def generate_fake_entities(self, minimap_frame, real_ally_positions, real_enemy_positions):
+        """
+        Genera las posiciones falsas de un frame sin dibujarlas
+        :param minimap_frame: Frame del minimapa real
+        :param real_ally_positions: Lista de posiciones de aliados [(x,y), ...]
+        :param real_enemy_positions: Lista de posiciones de enemigos [(x,y), ...]
+        :return: Lista de entities.Entity en coordenadas canónicas
+        """
+        self._begin_frame()
+        entities = self._fake_entities(minimap_frame, real_ally_positions, real_enemy_positions)
+        self.tiers.end_frame()
+        return entities
+    
+    def _fake_entities(self, minimap_frame, real_ally_positions, real_enemy_positions):
+        if self.config['map'] == 'auto':
+            self.select_map(minimap_frame)
+        self.set_minimap_size(minimap_frame.shape[1], minimap_frame.shape[0])
+        if self.config['fog_aware']:
+            self.vision.update(minimap_frame)
+        
+        # Generar posiciones falsas
+        self.placement.begin_frame()
+        fake_ally_positions = self.generate_fake_positions(self.to_canonical(real_ally_positions), 'ally')
+        fake_enemy_positions = self.generate_fake_positions(self.to_canonical(real_enemy_positions), 'enemy')
         
-        return adjacency_map.get(current_zone, ['river'])
+        entities = []
+        for team, positions in (('ally', fake_ally_positions), ('enemy', fake_enemy_positions)):
+            roster = self.rosters[team]
+            for slot, (x, y) in enumerate(positions):
+                # Un enemigo en niebla no se vería en el minimapa real
+                if team == 'enemy' and not self.is_plausible_enemy_position((x, y)):
+                    continue
+                last = self.last_positions.get((team, slot))
+                vx, vy = (x - last[0], y - last[1]) if last else (0, 0)
+                self.last_positions[(team, slot)] = (x, y)
+                champ_name = roster[slot] if slot < len(roster) else 'default'
+                entities.append(Entity(team, slot, champ_name, x, y, vx, vy))
+        return entities
     
     def generate_fake_map(self, minimap_frame, real_ally_positions, real_enemy_positions):
         """
@@ -142,48 +270,40 @@ class FakeMapGenerator:
         :param real_ally_positions: Lista de posiciones de aliados [(x,y), ...]
         :param real_enemy_positions: Lista de posiciones de enemigos [(x,y), ...]
         :return: Imagen RGBA (PNG) con el overlay falso
+        Todo se calcula y dibuja en el espacio canónico (CANONICAL_SIZE) y se
+        remuestrea una sola vez al tamaño del minimapa real.
         """
-        # Crear imagen transparente del mismo tamaño que el minimapa
-        overlay = Image.new('RGBA', (minimap_frame.shape[1], minimap_frame.shape[0]), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(overlay)
-        
-        # Generar posiciones falsas
-        fake_ally_positions = self.generate_fake_positions(real_ally_positions, 'ally')
-        fake_enemy_positions = self.generate_fake_positions(real_enemy_positions, 'enemy')
-        
-        # Dibujar aliados
-        for i, pos in enumerate(fake_ally_positions):
-            champ_name = self.team_composition['aliados'][i] if i < len(self.team_composition['aliados']) else 'default'
-            self.draw_champion_icon(overlay, pos, champ_name, 'ally')
-        
-        # Dibujar enemigos
-        for i, pos in enumerate(fake_enemy_positions):
-            champ_name = self.team_composition['enemigos'][i] if i < len(self.team_composition['enemigos']) else 'default'
-            self.draw_champion_icon(overlay, pos, champ_name, 'enemy')
-        
+        # El presupuesto cubre el frame entero, dibujo y remuestreo incluidos
+        self._begin_frame()
+        entities = self._fake_entities(minimap_frame, real_ally_positions, real_enemy_positions)
+        overlay = self.renderer.render(entities, self.minimap_size)
+        self.tiers.end_frame()
         return overlay
     
-    def draw_champion_icon(self, overlay, position, champion_name, team):
-        """Dibuja el icono de un campeón en la posición especificada"""
-        x, y = position
-        icon_size = self.config['icon_size']
-        
-        # Obtener icono del campeón
-        icon = self.icon_cache.get(champion_name.lower(), None)
-        
-        if icon:
-            # Redimensionar icono
-            icon = icon.resize((icon_size, icon_size))
-            # Calcular posición para centrar
-            pos_x = x - icon_size // 2
-            pos_y = y - icon_size // 2
-            # Pegar icono en el overlay
-            overlay.paste(icon, (pos_x, pos_y), icon)
-        else:
-            # Dibujar círculo de color si no hay icono
-            color = (0, 0, 255, 180) if team == 'ally' else (255, 0, 0, 180)
-            draw = ImageDraw.Draw(overlay)
-            draw.ellipse([(x-5, y-5), (x+5, y+5)], fill=color)
+    def generate_fake_frame(self, minimap_frame, real_ally_positions, real_enemy_positions, timestamp=None):
+        """
+        Genera un frame vectorial (ver overlay_protocol) en lugar de una imagen
+        :return: bytes con marca de tiempo, id de campeón, equipo y posición de cada icono
+        """
+        self._begin_frame()
+        entities = self._fake_entities(minimap_frame, real_ally_positions, real_enemy_positions)
+        frame = encode_frame(entities, self._champion_id, CANONICAL_SIZE, timestamp)
+        self.tiers.end_frame()
+        return frame
+    
+    def _champion_id(self, champion_name):
+        """Id de un campeón de la composición actual (0 si no se conoce)"""
+        return self.champion_ids.get(champion_name, 0)
+    
+    def is_plausible_enemy_position(self, position):
+        """Un enemigo solo puede aparecer donde el minimapa real tiene visión"""
+        return not self.config['fog_aware'] or self.vision.is_visible(position, CANONICAL_SIZE)
+    
+    def to_canonical(self, positions):
+        """Convierte posiciones del minimapa real al espacio canónico"""
+        scale_x = CANONICAL_SIZE / self.minimap_size[0]
+        scale_y = CANONICAL_SIZE / self.minimap_size[1]
+        return [(int(x * scale_x), int(y * scale_y)) for x, y in positions]
 
 if __name__ == "__main__":
     # Prueba básica
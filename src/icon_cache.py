@@ -0,0 +1,155 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from PIL import Image
+from .color_lut import current_game_version
+from .derived_assets import derived_root, load_derived_assets
+
+logger = logging.getLogger(__name__)
+
+class IconCache:
+    """
+    Caché LRU de iconos decodificados y escalados con límite de memoria.
+    Los iconos se leen de disco al primer uso y se descartan los menos usados
+    cuando se supera max_bytes, así la memoria no crece en sesiones largas.
+    Es segura entre hilos: varias sesiones pueden compartir la misma instancia.
+    """
+    def __init__(self, icon_path='assets/icons/', icon_size=12, max_bytes=2 * 1024 * 1024):
+        self.icon_path = icon_path
+        self.icon_size = icon_size
+        self.max_bytes = max_bytes
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._icons = OrderedDict()
+        self._missing = set()
+        self._derived = None
+        self._derived_checked = False
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _image_bytes(image):
+        return image.width * image.height * len(image.getbands())
+
+    def _derived_assets(self):
+        """Derivados precalculados de la versión descargada (ver derived_assets), si existen"""
+        if not self._derived_checked:
+            self._derived = load_derived_assets(current_game_version(self.icon_path), derived_root(self.icon_path))
+            self._derived_checked = True
+        return self._derived
+
+    def _load(self, name, icon_size):
+        # Con los derivados generados al descargar no hace falta decodificar ni escalar
+        derived = self._derived_assets()
+        if derived is not None:
+            sprite = derived.sprite(name, icon_size)
+            if sprite is not None:
+                return sprite
+        path = os.path.join(self.icon_path, f"{name}.png")
+        if not os.path.isfile(path):
+            return None
+        with Image.open(path) as icon:
+            return icon.convert('RGBA').resize((icon_size, icon_size))
+
+    def get(self, name, default=None):
+        """
+        Devuelve el icono escalado de un campeón
+        :param name: Nombre en minúsculas (nombre del fichero sin .png)
+        :return: Image RGBA o default si no existe
+        """
+        with self.lock:
+            icon = self._icons.get(name)
+            if icon is not None:
+                self._icons.move_to_end(name)
+                self.hits += 1
+                return icon
+            if name in self._missing:
+                return default
+            self.misses += 1
+            icon_size = self.icon_size
+
+        # Leer de disco fuera del bloqueo para no frenar a las demás sesiones
+        try:
+            icon = self._load(name, icon_size)
+        except OSError as e:
+            logger.warning("No se pudo cargar el icono %s: %s", name, e)
+            icon = None
+
+        with self.lock:
+            if icon_size != self.icon_size:
+                # El tamaño cambió mientras se cargaba: no guardar un icono obsoleto
+                return icon if icon is not None else default
+            if icon is None:
+                self._missing.add(name)
+                return default
+            if name not in self._icons:
+                self._icons[name] = icon
+                self.bytes_used += self._image_bytes(icon)
+                self._evict()
+            return icon
+
+    def _evict(self):
+        while self.bytes_used > self.max_bytes and len(self._icons) > 1:
+            _, icon = self._icons.popitem(last=False)
+            self.bytes_used -= self._image_bytes(icon)
+            self.evictions += 1
+
+    def __contains__(self, name):
+        with self.lock:
+            return name in self._icons
+
+    def __len__(self):
+        with self.lock:
+            return len(self._icons)
+
+    def preload(self, names=None):
+        """
+        Carga iconos por adelantado hasta llenar el presupuesto
+        :param names: Nombres a cargar (todos los del directorio si es None)
+        """
+        if names is None:
+            if not os.path.isdir(self.icon_path):
+                return
+            names = sorted(os.path.splitext(f)[0] for f in os.listdir(self.icon_path) if f.endswith('.png'))
+        for name in names:
+            if self.bytes_used >= self.max_bytes:
+                break
+            self.get(name.lower())
+
+    def set_icon_size(self, icon_size):
+        """Cambia el tamaño de los iconos; los ya cargados se descartan"""
+        with self.lock:
+            if icon_size == self.icon_size:
+                return
+            self.icon_size = icon_size
+            self._clear()
+
+    def set_icon_path(self, icon_path):
+        """Cambia el directorio de iconos (p. ej. tras descargar un parche nuevo)"""
+        with self.lock:
+            self.icon_path = icon_path
+            self._derived_checked = False
+            self._clear()
+
+    def clear(self):
+        with self.lock:
+            self._clear()
+
+    def _clear(self):
+        self._icons.clear()
+        self._missing.clear()
+        self.bytes_used = 0
+
+    def stats(self):
+        """Contadores de uso y memoria para diagnóstico"""
+        with self.lock:
+            return {
+                'icons': len(self._icons),
+                'bytes_used': self.bytes_used,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
@@ -1,35 +1,49 @@
 import cv2
-import numpy as numpy
-import pytesseract
-from PIL import Image
+from .champion_db import ChampionDatabase
+from .ocr_backend import OCRBackend
+
+# Áreas de nombres en la pantalla de carga (x1, y1, x2, y2)
+# (coordenadas aproximadas, necesita calibración)
+TEAM_AREAS = {
+    "aliados": (300, 800, 600, 900),
+    "enemigos": (1200, 800, 1500, 900)
+}
+SLOTS_PER_TEAM = 5
 
 class ChampionDetector:
-    def __init__(self):
-        sel.champion_db = ChampionDatabase()
+    def __init__(self, ocr_backend=None):
+        self.champion_db = ChampionDatabase()
+        self.ocr = ocr_backend or OCRBackend()
+
+    @staticmethod
+    def preprocess_for_ocr(img):
+        """Procesa un recorte para OCR"""
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        _, thresh = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY)
+        return thresh
 
     def detect_champions_loading_screen(self, screenshot):
         """Detecta campeones en la pantalla de carga usando OCR"""
-        # 1. Recortar área de nombres de campeones
-            # (coordenadas aproximadas, necesita calibración)
-        team1_area = (300, 800, 600, 900)
-        tream2_area = (1200,800, 1500, 900)
+        # 1. Recortar un área de nombre por campeón (5 por equipo)
+        crops = []
+        for area in TEAM_AREAS.values():
+            x1, y1, x2, y2 = area
+            slot_height = (y2 - y1) // SLOTS_PER_TEAM
+            for slot in range(SLOTS_PER_TEAM):
+                top = y1 + slot * slot_height
+                crops.append(self.preprocess_for_ocr(screenshot[top:top + slot_height, x1:x2]))
+
+        # 2. Reconocer los diez nombres en una sola llamada
+        texts = self.ocr.recognize_batch(crops)
 
-        # 2. Procesar imagen para OCR
-        def preprocess_for_ocr(img):
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            _, thresh = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY)
-            return thresh
+        # 3. Asociar cada texto al campeón más parecido
+        composition = {}
+        for i, team in enumerate(TEAM_AREAS):
+            team_texts = texts[i * SLOTS_PER_TEAM:(i + 1) * SLOTS_PER_TEAM]
+            names = [self.champion_db.match_name(text) for text in team_texts]
+            composition[team] = [name for name in names if name]
+        return composition
 
-        # 3. Ejecutar OCR
-        team1_names = pytesseract.image_to_string(
-            preprocess_for_ocr(screenshot[team1_area[1]:team1_area[3], team1_area[0]:team1_area[2]])
-        ).split('\n')
-        
-        team2_names = pytesseract.image_to_string(
-            preprocess_for_ocr(screenshot[team2_area[1]:team2_area[3], team2_area[0]:team2_area[2]])
-        ).split('\n')
-        
-        return {
-            "aliados": [name.strip() for name in team1_names if name.strip()],
-            "enemigos": [name.strip() for name in team2_names if name.strip()]
-        }
\ No newline at end of file
+    def close(self):
+        """Libera el backend OCR (instancias de Tesseract cargadas)"""
+        self.ocr.close()
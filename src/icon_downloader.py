@@ -0,0 +1,238 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+import requests
+from .champion_db import ChampionDatabase, icon_file_name
+from .derived_assets import build_derived_assets
+
+logger = logging.getLogger(__name__)
+
+VERSIONS_URL = "https://ddragon.leagueoflegends.com/api/versions.json"
+ICON_BASE_URL = "https://ddragon.leagueoflegends.com/cdn/{}/img/champion/"
+FALLBACK_VERSION = "14.14.1"
+
+# Nombres cuyo fichero en Data Dragon no coincide con el nombre mostrado
+SPECIAL_CASES = {
+    "Wukong": "MonkeyKing",
+    "MaestroYi": "MasterYi"
+}
+
+def normalize_name(champ_name):
+    """Nombre del icono según la API oficial"""
+    normalized = champ_name.replace("'", "").replace(" ", "").replace(".", "")
+    return SPECIAL_CASES.get(normalized, normalized)
+
+class DownloadEvent:
+    """
+    Evento del motor de descarga. kind es uno de:
+    'version', 'offline', 'up_to_date', 'progress', 'failed', 'build_progress', 'done', 'error'
+    """
+    __slots__ = ('kind', 'data')
+
+    def __init__(self, kind, **data):
+        self.kind = kind
+        self.data = data
+
+    def __repr__(self):
+        return f"DownloadEvent({self.kind!r}, {self.data!r})"
+
+class IconDownloader:
+    """
+    Motor de descarga de iconos compartido por las interfaces gráfica y de terminal.
+    Descarga en un hilo propio (con varias peticiones en paralelo), guarda los
+    metadatos, genera los recursos derivados y publica su estado en una cola de
+    eventos segura entre hilos. El progreso se agrupa: como mucho un evento cada
+    progress_interval segundos, así la interfaz nunca se satura.
+    """
+    def __init__(self, icons_dir='assets/icons', workers=4, progress_interval=0.1, timeout=10, build_derived=True):
+        self.icons_dir = icons_dir
+        self.metadata_file = os.path.join(icons_dir, "metadata.json")
+        self.workers = workers
+        self.progress_interval = progress_interval
+        self.timeout = timeout
+        self.build_derived = build_derived
+        self.events = queue.Queue()
+        self.version = None
+        self.running = False
+        self.thread = None
+        self.stop_flag = False
+        self._last_progress = {}
+
+    def start(self, version=None, force=False):
+        """
+        Inicia la descarga en segundo plano
+        :param version: Versión del juego (la más reciente si es None)
+        :param force: Descargar aunque los iconos estén al día
+        """
+        if self.running:
+            return
+        self.running = True
+        self.stop_flag = False
+        self.thread = threading.Thread(target=self._run, args=(version, force), name="IconDownloader")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """Pide detener la descarga; termina tras las peticiones en curso"""
+        self.stop_flag = True
+
+    def join(self, timeout=None):
+        if self.thread:
+            self.thread.join(timeout)
+
+    def poll(self, max_events=100):
+        """
+        Eventos pendientes sin bloquear (para llamarlo desde el bucle de Tk)
+        :return: Lista de DownloadEvent
+        """
+        events = []
+        while len(events) < max_events:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+    def iter_events(self, timeout=0.5):
+        """Generador bloqueante de eventos hasta que termina la descarga (para la terminal)"""
+        while True:
+            try:
+                event = self.events.get(timeout=timeout)
+            except queue.Empty:
+                if not self.running and self.events.empty():
+                    return
+                continue
+            yield event
+            if event.kind in ('done', 'error'):
+                return
+
+    def _emit(self, kind, **data):
+        self.events.put(DownloadEvent(kind, **data))
+
+    def _emit_progress(self, kind, done, total, name):
+        """Publica el progreso como mucho una vez por progress_interval (siempre el último)"""
+        now = time.monotonic()
+        if done < total and now - self._last_progress.get(kind, 0.0) < self.progress_interval:
+            return
+        self._last_progress[kind] = now
+        self._emit(kind, done=done, total=total, name=name)
+
+    def fetch_version(self):
+        """
+        Consulta la última versión en un hilo propio; llega por la cola de eventos
+        como 'version' o como 'offline' si no hay conexión
+        """
+        thread = threading.Thread(target=self._fetch_version, name="IconDownloaderVersion")
+        thread.daemon = True
+        thread.start()
+
+    def _fetch_version(self):
+        try:
+            self._emit('version', version=self._request_latest_version())
+        except Exception as e:
+            self._emit('offline', error=str(e))
+
+    def _request_latest_version(self):
+        response = requests.get(VERSIONS_URL, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()[0]  # La primera es siempre la más reciente
+
+    def get_latest_version(self):
+        """Última versión del juego o la de respaldo si no hay conexión"""
+        try:
+            return self._request_latest_version()
+        except Exception as e:
+            logger.warning("Error al obtener versión: %s. Usando %s", e, FALLBACK_VERSION)
+            return FALLBACK_VERSION
+
+    def load_metadata(self):
+        """Metadatos de descargas previas"""
+        try:
+            with open(self.metadata_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"version": "", "downloaded": {}}
+
+    def save_metadata(self, data):
+        with open(self.metadata_file, 'w') as f:
+            json.dump(data, f, indent=2)
+
+    def missing_icons(self, champions):
+        """Campeones sin icono en disco"""
+        existing = {os.path.splitext(f)[0] for f in os.listdir(self.icons_dir) if f.endswith('.png')}
+        return {champ_id: name for champ_id, name in champions.items() if icon_file_name(name) not in existing}
+
+    def _download_icon(self, session, icon_url, champ_name):
+        response = session.get(icon_url + f"{normalize_name(champ_name)}.png", timeout=self.timeout)
+        response.raise_for_status()
+        file_path = os.path.join(self.icons_dir, f"{icon_file_name(champ_name)}.png")
+        # Escritura atómica: un icono a medias nunca llega a la caché
+        temp_path = f"{file_path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(response.content)
+        os.replace(temp_path, file_path)
+
+    def _run(self, version, force):
+        try:
+            os.makedirs(self.icons_dir, exist_ok=True)
+            self.version = version or self.get_latest_version()
+            self._emit('version', version=self.version)
+
+            champions = ChampionDatabase().champions
+            metadata = self.load_metadata()
+            if metadata.get("version") == self.version and not force:
+                pending = self.missing_icons(champions)
+            else:
+                pending = dict(champions)
+            if not pending:
+                self._emit('up_to_date', version=self.version)
+                success, failed = [], []
+            else:
+                success, failed = self._download(pending, metadata)
+                if self.stop_flag:
+                    self._emit('done', version=self.version, success=success, failed=failed, stopped=True)
+                    return
+                metadata["version"] = self.version
+                metadata["timestamp"] = datetime.now().isoformat()
+                self.save_metadata(metadata)
+
+            if self.build_derived:
+                build_derived_assets(self.icons_dir, self.version,
+                                     progress=lambda done, total, name: self._emit_progress('build_progress', done, total, name))
+            self._emit('done', version=self.version, success=success, failed=failed, stopped=False)
+        except Exception as e:
+            logger.exception("Error en la descarga de iconos")
+            self._emit('error', message=str(e))
+        finally:
+            self.running = False
+
+    def _download(self, champions, metadata):
+        """Descarga los iconos con varias peticiones en paralelo"""
+        icon_url = ICON_BASE_URL.format(self.version)
+        downloaded = metadata.setdefault("downloaded", {})
+        success, failed = [], []
+        total = len(champions)
+        with requests.Session() as session, ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {}
+            for champ_id, champ_name in champions.items():
+                futures[pool.submit(self._download_icon, session, icon_url, champ_name)] = (champ_id, champ_name)
+            for done, future in enumerate(as_completed(futures), 1):
+                champ_id, champ_name = futures[future]
+                try:
+                    future.result()
+                    success.append(champ_name)
+                    downloaded[str(champ_id)] = icon_file_name(champ_name)
+                except Exception as e:
+                    failed.append((champ_name, str(e)))
+                    self._emit('failed', name=champ_name, error=str(e))
+                self._emit_progress('progress', done, total, champ_name)
+                if self.stop_flag:
+                    for pending in futures:
+                        pending.cancel()
+                    break
+        return success, failed
@@ -0,0 +1,124 @@
+import atexit
+import copy
+import json
+import logging
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+# Atributos propios de LogRecord; el resto (pasados con extra=) son campos del evento
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'suppressed'}
+
+class JsonFormatter(logging.Formatter):
+    """Un evento JSON por línea: hora, nivel, logger, mensaje y los campos de extra="""
+    def format(self, record):
+        event = {
+            'time': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                event[key] = value
+        if getattr(record, 'suppressed', 0):
+            event['suppressed'] = record.suppressed
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            event['exception'] = record.exc_text
+        return json.dumps(event, ensure_ascii=False, default=str)
+
+class ConsoleFormatter(logging.Formatter):
+    """Formato legible de siempre, indicando cuántos mensajes repetidos se omitieron"""
+    def formatMessage(self, record):
+        text = super().formatMessage(record)
+        suppressed = getattr(record, 'suppressed', 0)
+        if suppressed:
+            text += f" (+{suppressed} repeticiones omitidas)"
+        return text
+
+class RateLimitFilter(logging.Filter):
+    """
+    Deja pasar como mucho `burst` mensajes iguales (mismo logger, nivel y plantilla)
+    por ventana de `interval` segundos. Al reabrirse la ventana, el primer mensaje
+    indica cuántos se omitieron. Solo limita a partir de min_level (por defecto WARNING).
+    """
+    def __init__(self, burst=5, interval=60.0, min_level=logging.WARNING):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.min_level = min_level
+        self.windows = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno < self.min_level:
+            return True
+        key = (record.name, record.levelno, str(record.msg))
+        now = time.monotonic()
+        with self.lock:
+            start, count, suppressed = self.windows.get(key, (now, 0, 0))
+            if now - start >= self.interval:
+                start, count = now, 0
+            if count >= self.burst:
+                self.windows[key] = (start, count, suppressed + 1)
+                return False
+            self.windows[key] = (start, count + 1, 0)
+            # Las plantillas son finitas, pero se vacía por si alguna incluye datos variables
+            if len(self.windows) > 1024:
+                self.windows = {key: self.windows[key]}
+        record.suppressed = suppressed
+        return True
+
+class _EventQueueHandler(QueueHandler):
+    """
+    Prepara el registro con lo mínimo (mensaje y traza ya formateados) y lo deja
+    en la cola; el formato final y la escritura los hace el hilo del QueueListener
+    """
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+_listener = None
+
+def setup_logging(log_file="minimapa_fantasmal.log", level=logging.INFO, burst=5, interval=60.0):
+    """
+    Configura el logging raíz sin bloquear a quien registra: los mensajes van a
+    una cola y un hilo aparte los escribe en consola (texto) y en log_file (JSON por línea)
+    :param burst: Mensajes iguales de nivel WARNING o superior permitidos por ventana
+    :param interval: Duración de la ventana de limitación en segundos
+    :return: QueueListener en marcha (se detiene solo al salir)
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    console = logging.StreamHandler()
+    console.setFormatter(ConsoleFormatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    handlers = [console]
+    if log_file:
+        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = _EventQueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter(burst, interval))
+
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return _listener
@@ -3,123 +3,282 @@ import configparser
 import sys
 import time
 import logging
-from src.minimap_capture import MinimapCapture
-from src.fake_map_generator import FakeMapGenerator
-from src.obs_integration import OBSIntegration
-from src.champion_detector import ChampionDetector
+import random
+
+# Los módulos pesados (cv2, NumPy, PIL, pytesseract, obswebsocket, requests) se
+# importan dentro de cada modo para que el arranque solo pague lo que usa
+
+from src.log_config import setup_logging
 
-# Configurar logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("minimapa_fantasmal.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger("Main")
 
+CONFIG_PATH = 'config/config.ini'
+
+class StartupProfiler:
+    """Registra el tiempo transcurrido desde el arranque en cada fase (--profile-startup)"""
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.start = time.perf_counter()
+        self.marks = []
+    
+    def mark(self, label):
+        if self.enabled:
+            self.marks.append((label, time.perf_counter() - self.start))
+    
+    def report(self):
+        if not self.enabled:
+            return
+        lines = ["Perfil de arranque:"]
+        previous = 0.0
+        for label, elapsed in self.marks:
+            lines.append(f"  {label:<32} {elapsed * 1000:8.1f} ms  (+{(elapsed - previous) * 1000:.1f} ms)")
+            previous = elapsed
+        logger.info("\n".join(lines))
+
+def create_detection_pool(config):
+    """Crea el pool de procesos de detección si está activado en la configuración"""
+    workers = config.getint('Detection', 'workers', fallback=0)
+    if workers <= 0:
+        return None
+    from src.detection_pool import DetectionPool
+    logger.info(f"Iniciando pool de detección con {workers} procesos")
+    return DetectionPool(workers=workers)
+
+def apply_minimap_config(capture, config):
+    """Aplica la sección [Minimap] al capturador"""
+    if not config.getboolean('Minimap', 'auto_detect', fallback=True):
+        # Primero el tamaño: así nunca se captura con auto_detect desactivado y el tamaño viejo
+        width = config.getint('Minimap', 'custom_width', fallback=320)
+        height = config.getint('Minimap', 'custom_height', fallback=320)
+        capture.set_custom_size(width, height)
+        capture.set_auto_detect(False)
+    else:
+        capture.set_auto_detect(True)
+
+def start_config_watcher(capture, generator, obs_integration=None, overlay_server=None):
+    """
+    Vigila config.ini y aplica los cambios sin reiniciar. Cada componente
+    aplica lo suyo entre dos frames; lo que no admite cambios en caliente
+    (pool de detección, servidor, host/puerto del overlay) requiere reiniciar.
+    """
+    from src.config_watcher import ConfigWatcher
+    from src.fake_map_generator import settings_from_config
+    
+    watcher = ConfigWatcher(CONFIG_PATH)
+    watcher.subscribe(
+        lambda config, changed: generator.update_config(settings_from_config(config)),
+        sections=['Behavior', 'Icons', 'Map']
+    )
+    watcher.subscribe(lambda config, changed: apply_minimap_config(capture, config), sections=['Minimap'])
+    if obs_integration:
+        watcher.subscribe(lambda config, changed: obs_integration.update_connection(
+            config.get('OBS', 'host', fallback='localhost'),
+            config.getint('OBS', 'port', fallback=4444),
+            config.get('OBS', 'password', fallback='')
+        ), sections=['OBS'])
+    if overlay_server:
+        watcher.subscribe(
+            lambda config, changed: overlay_server.set_fps(config.getint('Overwolf', 'fps', fallback=30)),
+            sections=['Overwolf']
+        )
+    watcher.subscribe(
+        lambda config, changed: logger.warning(f"Cambios en {', '.join(sorted(changed))} requieren reiniciar"),
+        sections=['Detection', 'Server']
+    )
+    watcher.start()
+    return watcher
+
+def run_server(sessions_path, config):
+    """Modo servidor: varias sesiones de minimapa falso compartiendo iconos y base de datos"""
+    from src.minimap_capture import MinimapCapture
+    from src.session_server import SessionServer, load_sessions_config
+    
+    sessions = load_sessions_config(sessions_path)
+    workers = config.getint('Server', 'workers', fallback=0) or None
+    server = SessionServer(max_workers=workers)
+    detection_pool = create_detection_pool(config)
+    
+    for session_config in sessions:
+        capture = MinimapCapture()
+        capture.set_detection_pool(detection_pool)
+        capture.set_auto_detect(session_config.get('auto_detect', True))
+        if not capture.auto_detect:
+            capture.set_custom_size(session_config['width'], session_config['height'])
+        
+        server.add_session(
+            session_config['name'],
+            capture,
+            session_config.get('output', f"overlay_{session_config['name']}.png"),
+            composition=session_config.get('composition'),
+            seed=session_config.get('seed'),
+            update_interval=session_config.get('update_interval', 2)
+        )
+        logger.info(f"Sesión '{session_config['name']}' registrada")
+    
+    server.start()
+    logger.info(f"Servidor iniciado con {len(sessions)} sesiones")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        logger.info("Deteniendo por interrupción de usuario")
+    finally:
+        server.stop()
+        if detection_pool:
+            detection_pool.close()
+        logger.info("Servidor finalizado")
+
 def main():
     parser = argparse.ArgumentParser(description='Minimapa Fantasmal - Protección contra stream snipers')
     parser.add_argument('--obs', action='store_true', help='Usar integración con OBS')
-    parser.add_argument('--overwolf', action='store_true', help='Usar integración con Overwolf (próximamente)')
+    parser.add_argument('--overwolf', action='store_true', help='Servir el overlay a Overwolf o a una fuente de navegador de OBS')
     parser.add_argument('--debug', action='store_true', help='Modo depuración con visualización')
+    parser.add_argument('--headless', action='store_true', help='Depuración sin ventanas (p. ej. en un servidor Linux)')
+    parser.add_argument('--debug-video', metavar='MP4', help='Grabar la vista de depuración anotada en un vídeo')
+    parser.add_argument('--record', metavar='DIR', help='Grabar la sesión (frames, posiciones y semilla) en DIR')
+    parser.add_argument('--replay', metavar='DIR', help='Reproducir una sesión grabada en lugar de capturar la pantalla')
+    parser.add_argument('--replay-speed', type=float, default=1.0, help='Velocidad de reproducción (0 = máxima)')
+    parser.add_argument('--server', metavar='SESIONES_JSON', help='Modo servidor con varias sesiones (ver config/sessions.example.json)')
+    parser.add_argument('--profile-startup', action='store_true', help='Mostrar el tiempo de cada fase del arranque hasta el primer overlay')
     args = parser.parse_args()
+    # Configurar logging: un hilo aparte escribe en consola y en el fichero (JSON por línea),
+    # así la E/S nunca frena la producción de frames
+    setup_logging("minimapa_fantasmal.log")
+    profiler = StartupProfiler(args.profile_startup)
     
     # Cargar configuración
     config = configparser.ConfigParser()
-    config.read('config/config.ini')
+    config.read(CONFIG_PATH)
+    
+    if args.server:
+        run_server(args.server, config)
+        return
+    
+    profiler.mark("configuración")
     
     # Inicializar componentes
     logger.info("Inicializando componentes...")
-    capture = MinimapCapture()
-    generator = FakeMapGenerator()
-    detector = ChampionDetector()
+    if args.replay:
+        from src.session_replay import ReplayCapture
+        capture = ReplayCapture(args.replay, speed=args.replay_speed)
+    else:
+        from src.minimap_capture import MinimapCapture
+        capture = MinimapCapture()
+    profiler.mark("capturador")
     
-    # Configurar capturador
-    capture.set_auto_detect(config.getboolean('Minimap', 'auto_detect', fallback=True))
-    if not capture.auto_detect:
-        width = config.getint('Minimap', 'custom_width', fallback=320)
-        height = config.getint('Minimap', 'custom_height', fallback=320)
-        capture.set_custom_size(width, height)
+    # Los iconos se cargan en segundo plano; hasta entonces se dibujan círculos de color
+    from src.fake_map_generator import FakeMapGenerator
+    generator = FakeMapGenerator(CONFIG_PATH, load_in_background=True)
+    profiler.mark("generador")
     
-    # Configurar generador
-    fakeness = config.getint('Behavior', 'fakeness_level', fallback=7)
-    generator.config['fakeness_level'] = fakeness
+    detection_pool = create_detection_pool(config)
+    capture.set_detection_pool(detection_pool)
     
-    # Intentar detectar composición de equipos
-    try:
-        logger.info("Detectando composición de equipos...")
-        screenshot = capture.capture_full_screen()
-        if screenshot is not None:
-            composition = detector.detect_champions_loading_screen(screenshot)
-            if composition:
-                generator.set_team_composition(composition)
-                logger.info(f"Composición detectada: Aliados={composition['aliados']}, Enemigos={composition['enemigos']}")
-    except Exception as e:
-        logger.error(f"Error detectando composición: {e}")
+    # Configurar capturador (el generador lee [Behavior] e [Icons] por su cuenta)
+    apply_minimap_config(capture, config)
+    
+    # Grabación / reproducción de sesiones
+    recorder = None
+    if args.replay and capture.seed is not None:
+        generator.set_seed(capture.seed)
+    elif args.record:
+        from src.session_replay import SessionRecorder, RecordingCapture
+        seed = random.randrange(2**32)
+        generator.set_seed(seed)
+        recorder = SessionRecorder(args.record, seed=seed)
+        capture = RecordingCapture(capture, recorder)
+        logger.info(f"Grabando sesión en {args.record} (semilla {seed})")
+    
+    # Detectar composición de equipos en segundo plano (el detector OCR se crea en el hilo)
+    from src.composition_watcher import CompositionWatcher
+    watcher = CompositionWatcher(capture, None, generator)
+    watcher.on_composition = lambda composition: logger.info(
+        f"Composición detectada: Aliados={composition['aliados']}, Enemigos={composition['enemigos']}"
+    )
+    watcher.start()
+    profiler.mark("vigilancia de composición")
+    
+    # Primer frame completo en el propio arranque para medir cada fase hasta el primer overlay
+    if profiler.enabled:
+        minimap_frame = capture.capture_minimap()
+        profiler.mark("primera captura")
+        if minimap_frame is not None:
+            real_allies, real_enemies = capture.detect_icons(minimap_frame)
+            profiler.mark("primera detección")
+            generator.generate_fake_map(minimap_frame, real_allies, real_enemies)
+            profiler.mark("primer overlay")
+        profiler.report()
+    
+    obs_integration = None
+    overlay_server = None
     
     # Modo OBS
     if args.obs:
+        from src.obs_integration import OBSIntegration
         obs_host = config.get('OBS', 'host', fallback='localhost')
         obs_port = config.getint('OBS', 'port', fallback=4444)
         obs_password = config.get('OBS', 'password', fallback='')
+        obs_protocol = config.getint('OBS', 'protocol', fallback=4)
         
-        obs_integration = OBSIntegration(obs_host, obs_port, obs_password)
+        obs_integration = OBSIntegration(obs_host, obs_port, obs_password, protocol=obs_protocol)
         if not obs_integration.start_streaming_fake_minimap(capture, generator):
             logger.error("No se pudo iniciar la transmisión a OBS")
             sys.exit(1)
         
         logger.info("Transmisión a OBS iniciada correctamente")
     
-    # Modo Overwolf (próximamente)
+    # Modo Overwolf / fuente de navegador
     elif args.overwolf:
-        logger.info("Soporte para Overwolf en desarrollo")
-        # Implementación futura
+        from src.overlay_server import OverlayServer
+        overlay_server = OverlayServer(
+            config.get('Overwolf', 'host', fallback='127.0.0.1'),
+            config.getint('Overwolf', 'port', fallback=8765),
+            icon_path=generator.config['icon_path'],
+            canonical_size=generator.canonical_size
+        )
+        overlay_server.start_streaming_fake_minimap(
+            capture, generator, fps=config.getint('Overwolf', 'fps', fallback=30)
+        )
+        logger.info(f"Overlay para navegador en http://{overlay_server.host}:{overlay_server.port}/")
+    
+    # Aplicar cambios de config.ini sin reiniciar
+    config_watcher = start_config_watcher(capture, generator, obs_integration, overlay_server)
     
     # Modo depuración
     if args.debug:
-        import cv2
+        from src.debug_view import DebugView
         logger.info("Iniciando modo depuración...")
-        
-        try:
-            while True:
-                # Capturar minimapa
-                minimap_frame = capture.capture_minimap()
-                if minimap_frame is None:
-                    time.sleep(1)
-                    continue
-                
-                # Detectar posiciones (simulado)
-                real_allies, real_enemies = capture.detect_icons(minimap_frame)
-                
-                # Generar overlay falso
-                fake_overlay = generator.generate_fake_map(minimap_frame, real_allies, real_enemies)
-                
-                # Convertir para visualización
-                minimap_display = cv2.cvtColor(minimap_frame, cv2.COLOR_RGB2BGR)
-                overlay_display = cv2.cvtColor(np.array(fake_overlay.convert('RGB')), cv2.COLOR_RGB2BGR)
-                
-                # Mostrar resultados
-                cv2.imshow('Minimapa Real', minimap_display)
-                cv2.imshow('Overlay Falso', overlay_display)
-                
-                # Salir con 'q'
-                if cv2.waitKey(500) & 0xFF == ord('q'):
-                    break
-        finally:
-            cv2.destroyAllWindows()
+        debug_view = DebugView(
+            capture,
+            generator,
+            pipeline_fps=config.getint('Debug', 'pipeline_fps', fallback=30),
+            display_fps=config.getint('Debug', 'display_fps', fallback=15),
+            headless=args.headless,
+            video_path=args.debug_video,
+            video_scale=config.getfloat('Debug', 'video_scale', fallback=0.5),
+            video_fps=config.getint('Debug', 'video_fps', fallback=10)
+        )
+        # Bloquea hasta pulsar 'q' (o Ctrl+C); el pipeline corre en su propio hilo
+        debug_view.run()
     
     # Mantener el programa en ejecución
     try:
-        if args.obs:
+        if args.obs or args.overwolf:
             while True:
                 time.sleep(1)
     except KeyboardInterrupt:
         logger.info("Deteniendo por interrupción de usuario")
     finally:
-        if args.obs:
+        watcher.stop()
+        config_watcher.stop()
+        if obs_integration:
             obs_integration.stop()
+        elif overlay_server:
+            overlay_server.stop()
+        if detection_pool:
+            detection_pool.close()
+        if recorder:
+            recorder.close()
         logger.info("Aplicación finalizada")
 
 if __name__ == "__main__":
@@ -0,0 +1,283 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Resoluciones de los rásteres de zonas: la menor sirve para reconocer el mapa,
+# la canónica para consultar la zona de una posición con un solo acceso
+RASTER_RESOLUTIONS = (32, 80, 160, 320)
+SELECTION_RESOLUTION = 32
+MAX_ZONES = 32
+
+DEFAULT_MAP = 'summoners_rift'
+MAPS_PATH = 'assets/maps/'
+PACK_CACHE_DIR = os.path.join('cache', 'maps')
+
+def _source_hash(data):
+    return hashlib.sha1(data).hexdigest()
+
+def _team_zones(value, team):
+    """Expande role_zones: lista con '{team}' o diccionario por equipo"""
+    if isinstance(value, dict):
+        return tuple(value[team])
+    return tuple(zone.format(team=team) for zone in value)
+
+def compile_map_pack(source_path):
+    """
+    Compila la definición JSON de un mapa: rásteres de etiquetas (zona prioritaria
+    por píxel) y de pertenencia (bit por zona) a varias resoluciones, rectángulos
+    envolventes y un punto de anclaje dentro de cada zona
+    :return: MapPack
+    """
+    with open(source_path, 'rb') as f:
+        raw = f.read()
+    definition = json.loads(raw.decode('utf-8'))
+
+    size = definition.get('canonical_size', 320)
+    zones = [zone['name'] for zone in definition['zones']]
+    if len(set(zones)) != len(zones) or len(zones) > MAX_ZONES:
+        raise ValueError(f"{source_path}: zonas repetidas o más de {MAX_ZONES}")
+    for required in ('ally_base', 'enemy_base', definition['default_zone']):
+        if required not in zones:
+            raise ValueError(f"{source_path}: falta la zona '{required}'")
+    for zone, neighbors in definition['adjacency'].items():
+        unknown = [name for name in [zone] + neighbors if name not in zones]
+        if unknown:
+            raise ValueError(f"{source_path}: adyacencia con zonas desconocidas {unknown}")
+
+    polygons = [np.array(zone['polygon'], dtype=np.float64) for zone in definition['zones']]
+    rasters = {}
+    for resolution in sorted(set(RASTER_RESOLUTIONS) | {size}):
+        scale = resolution / size
+        labels = np.zeros((resolution, resolution), dtype=np.uint8)
+        membership = np.zeros((resolution, resolution), dtype=np.uint32)
+        zone_mask = np.zeros((resolution, resolution), dtype=np.uint8)
+        # En orden inverso: si dos zonas se solapan gana la que aparece antes en el fichero
+        for index in reversed(range(len(zones))):
+            zone_mask[:] = 0
+            cv2.fillPoly(zone_mask, [np.round(polygons[index] * scale).astype(np.int32)], 1)
+            labels[zone_mask > 0] = index + 1
+            membership |= zone_mask.astype(np.uint32) << np.uint32(index)
+        rasters[f'labels_{resolution}'] = labels
+        rasters[f'membership_{resolution}'] = membership
+
+    canonical = rasters[f'membership_{size}']
+    bounds, anchors = {}, {}
+    for index, (zone, polygon) in enumerate(zip(zones, polygons)):
+        x_min, y_min = np.clip(polygon.min(axis=0), 0, size - 1).astype(int)
+        x_max, y_max = np.clip(polygon.max(axis=0), 0, size - 1).astype(int)
+        bounds[zone] = (int(x_min), int(y_min), int(x_max), int(y_max))
+        # Anclaje: el píxel de la zona más cercano a su centroide (centro exacto en rectángulos)
+        ys, xs = np.nonzero((canonical >> np.uint32(index)) & 1)
+        if len(xs) == 0:
+            raise ValueError(f"{source_path}: la zona '{zone}' está vacía")
+        cx, cy = xs.mean(), ys.mean()
+        nearest = np.argmin((xs - cx) ** 2 + (ys - cy) ** 2)
+        anchors[zone] = (int(xs[nearest]), int(ys[nearest]))
+
+    meta = {
+        'name': definition['name'],
+        'display_name': definition.get('display_name', definition['name']),
+        'canonical_size': size,
+        'zones': zones,
+        'default_zone': definition['default_zone'],
+        'adjacency': definition['adjacency'],
+        'role_zones': definition.get('role_zones', {}),
+        'gank_zones': definition.get('gank_zones', []),
+        'bounds': bounds,
+        'anchors': anchors,
+        'source_hash': _source_hash(raw)
+    }
+    return MapPack(meta, rasters)
+
+class MapPack:
+    """Datos compilados de un mapa (solo lectura; se comparte entre generadores)"""
+    def __init__(self, meta, rasters):
+        self.meta = meta
+        self.rasters = rasters
+        self.name = meta['name']
+        self.display_name = meta['display_name']
+        self.canonical_size = meta['canonical_size']
+        self.zones = tuple(meta['zones'])
+        self.zone_index = {zone: index for index, zone in enumerate(self.zones)}
+        self.default_zone = meta['default_zone']
+        self.bounds = {zone: tuple(rect) for zone, rect in meta['bounds'].items()}
+        self.anchors = {zone: tuple(point) for zone, point in meta['anchors'].items()}
+        self.adjacency = {zone: tuple(neighbors) for zone, neighbors in meta['adjacency'].items()}
+        self.gank_zones = tuple(meta['gank_zones']) or self.zones
+        # Zonas por rol y equipo resueltas una sola vez
+        self.role_zones = {
+            (role, team): _team_zones(value, team)
+            for role, value in meta['role_zones'].items() for team in ('ally', 'enemy')
+        }
+        self.labels = rasters[f'labels_{self.canonical_size}']
+        self.membership = rasters[f'membership_{self.canonical_size}']
+
+    def save(self, path):
+        # Escritura atómica, igual que la tabla de color
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            np.savez(f, meta=np.array(json.dumps(self.meta)), **self.rasters)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            meta = json.loads(str(data['meta']))
+            rasters = {key: data[key] for key in data.files if key != 'meta'}
+        return cls(meta, rasters)
+
+    def _pixel(self, position, space_size=None):
+        scale = self.canonical_size / (space_size or self.canonical_size)
+        last = self.canonical_size - 1
+        x = min(max(int(position[0] * scale), 0), last)
+        y = min(max(int(position[1] * scale), 0), last)
+        return y, x
+
+    def zone_at(self, position, space_size=None):
+        """Zona de una posición (la zona por defecto si no cae en ninguna)"""
+        label = self.labels[self._pixel(position, space_size)]
+        return self.zones[label - 1] if label else self.default_zone
+
+    def contains(self, zone, position, space_size=None):
+        """Indica si la posición está dentro del polígono de la zona"""
+        return bool((int(self.membership[self._pixel(position, space_size)]) >> self.zone_index[zone]) & 1)
+
+    def random_point(self, zone, rng, attempts=16):
+        """Punto al azar dentro del polígono de la zona (muestreo por rechazo en su rectángulo)"""
+        x_min, y_min, x_max, y_max = self.bounds[zone]
+        for _ in range(attempts):
+            point = (rng.randint(x_min, x_max), rng.randint(y_min, y_max))
+            if self.contains(zone, point):
+                return point
+        return self.anchors[zone]
+
+    def home_zones(self, role, team):
+        """Zonas habituales de un rol; sin definición, las adyacentes a la base"""
+        return self.role_zones.get((role, team)) or self.adjacency[self.base_zone(team)]
+
+    def base_zone(self, team):
+        return f'{team}_base'
+
+    def label_raster(self, resolution):
+        """Ráster de etiquetas a la resolución compilada más cercana por arriba"""
+        available = sorted(int(key.split('_')[1]) for key in self.rasters if key.startswith('labels_'))
+        chosen = next((r for r in available if r >= resolution), available[-1])
+        return self.rasters[f'labels_{chosen}']
+
+    def playable_mask(self, resolution=SELECTION_RESOLUTION):
+        """Máscara booleana del área jugable (cualquier zona)"""
+        return self.label_raster(resolution) > 0
+
+def available_maps(maps_path=MAPS_PATH):
+    """Nombres de los mapas con definición en maps_path"""
+    if not os.path.isdir(maps_path):
+        return []
+    return sorted(os.path.splitext(f)[0] for f in os.listdir(maps_path) if f.endswith('.json'))
+
+_packs = {}
+_packs_lock = threading.Lock()
+
+def load_map_pack(name, maps_path=MAPS_PATH, cache_dir=PACK_CACHE_DIR):
+    """
+    Carga el paquete compilado de un mapa (compilándolo si falta o si la definición
+    cambió). Cada mapa se carga una sola vez por proceso.
+    """
+    with _packs_lock:
+        pack = _packs.get(name)
+        if pack is not None:
+            return pack
+
+        source_path = os.path.join(maps_path, f"{name}.json")
+        pack_path = os.path.join(cache_dir, f"{name}.npz")
+        with open(source_path, 'rb') as f:
+            source_hash = _source_hash(f.read())
+
+        if os.path.exists(pack_path):
+            try:
+                pack = MapPack.load(pack_path)
+                if pack.meta.get('source_hash') != source_hash:
+                    pack = None
+            except Exception as e:
+                logger.warning("Paquete de mapa corrupto, se recompila: %s", e)
+                pack = None
+
+        if pack is None:
+            pack = compile_map_pack(source_path)
+            try:
+                pack.save(pack_path)
+            except OSError as e:
+                logger.warning("No se pudo guardar el paquete de mapa: %s", e)
+
+        _packs[name] = pack
+        return pack
+
+class MapSelector:
+    """
+    Reconoce el mapa comparando la zona iluminada del minimapa con el área
+    jugable de cada paquete (IoU a 32x32). Solo cambia de mapa tras varias
+    comprobaciones seguidas con el mismo resultado.
+    """
+    def __init__(self, packs, check_every=30, confirmations=3, brightness_threshold=20, min_score=0.2):
+        self.packs = list(packs)
+        self.masks = [pack.playable_mask(SELECTION_RESOLUTION) for pack in self.packs]
+        self.check_every = check_every
+        self.confirmations = confirmations
+        self.brightness_threshold = brightness_threshold
+        self.min_score = min_score
+        self.frame_count = 0
+        self.candidate = None
+        self.votes = 0
+        self.selected = None
+
+    def score(self, minimap_frame):
+        """IoU del minimapa con cada mapa, en el orden de self.packs"""
+        small = cv2.resize(minimap_frame, (SELECTION_RESOLUTION, SELECTION_RESOLUTION),
+                           interpolation=cv2.INTER_AREA)
+        visible = small.max(axis=2) > self.brightness_threshold
+        scores = []
+        for mask in self.masks:
+            union = np.count_nonzero(mask | visible)
+            scores.append(np.count_nonzero(mask & visible) / union if union else 0.0)
+        return scores
+
+    def update(self, minimap_frame):
+        """
+        Procesa un frame (solo calcula cada check_every frames)
+        :return: Nombre del mapa seleccionado o None si aún no hay decisión
+        """
+        self.frame_count += 1
+        if self.selected is not None and self.frame_count % self.check_every:
+            return self.selected
+
+        scores = self.score(minimap_frame)
+        if max(scores) < self.min_score:
+            # Pantalla de carga, minimapa oculto...: no decide nada
+            return self.selected
+        best = self.packs[int(np.argmax(scores))].name
+        if best == self.candidate:
+            self.votes += 1
+        else:
+            self.candidate, self.votes = best, 1
+        if best != self.selected and (self.selected is None or self.votes >= self.confirmations):
+            self.selected = best
+        return self.selected
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compila los paquetes de mapas (zonas, adyacencia y rásteres)')
+    parser.add_argument('maps', nargs='*', help='Mapas a compilar (todos por defecto)')
+    parser.add_argument('--maps-path', default=MAPS_PATH)
+    parser.add_argument('--cache-dir', default=PACK_CACHE_DIR)
+    args = parser.parse_args()
+
+    for map_name in args.maps or available_maps(args.maps_path):
+        compiled = compile_map_pack(os.path.join(args.maps_path, f"{map_name}.json"))
+        compiled.save(os.path.join(args.cache_dir, f"{map_name}.npz"))
+        print(f"{map_name}: {len(compiled.zones)} zonas, rásteres {sorted(compiled.rasters)}")
@@ -0,0 +1,120 @@
+import logging
+import time
+import cv2
+import numpy as np
+from PIL import Image, ImageGrab
+from .color_lut import CLASS_ALLY, CLASS_ENEMY, get_default_lut
+
+logger = logging.getLogger(__name__)
+
+# Tamaño del minimapa respecto al alto de pantalla con la escala de HUD por defecto
+MINIMAP_SCREEN_RATIO = 0.26
+
+# Tamaño aceptado de un anillo de campeón relativo al lado del minimapa
+MIN_ICON_RATIO = 0.03
+MAX_ICON_RATIO = 0.12
+
+def _ring_centers(mask, min_size, max_size):
+    """Devuelve los centros de las componentes con forma de icono de una máscara"""
+    count, _, stats, centroids = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    centers = []
+    for i in range(1, count):
+        w = stats[i, cv2.CC_STAT_WIDTH]
+        h = stats[i, cv2.CC_STAT_HEIGHT]
+        if min_size <= w <= max_size and min_size <= h <= max_size and 0.7 <= w / h <= 1.4:
+            centers.append((int(centroids[i][0]), int(centroids[i][1])))
+    return centers
+
+def detect_icons(minimap_frame, lut=None):
+    """
+    Detecta las posiciones de los campeones por el color de su anillo
+    :param minimap_frame: Frame del minimapa (RGB)
+    :param lut: ColorLUT a usar (por defecto la tabla cacheada de la versión actual)
+    :return: (aliados, enemigos) como listas de posiciones (x, y)
+    """
+    lut = lut or get_default_lut()
+    classes = lut.classify(minimap_frame)
+    side = min(minimap_frame.shape[:2])
+    min_size = max(4, int(side * MIN_ICON_RATIO))
+    max_size = int(side * MAX_ICON_RATIO)
+
+    return (
+        _ring_centers(lut.mask(classes, CLASS_ALLY), min_size, max_size),
+        _ring_centers(lut.mask(classes, CLASS_ENEMY), min_size, max_size)
+    )
+
+class MinimapCapture:
+    def __init__(self):
+        self.auto_detect = True
+        self.custom_size = (320, 320)
+        self.screen_size = None  # Se obtiene en la primera captura
+        self.detection_pool = None
+        self._last_screen = None  # (instante, captura completa) de la última captura del minimapa
+
+    def set_auto_detect(self, enabled):
+        """Activa o desactiva la detección automática del tamaño del minimapa"""
+        self.auto_detect = enabled
+
+    def set_custom_size(self, width, height):
+        """Fija manualmente el tamaño del minimapa"""
+        self.custom_size = (width, height)
+
+    def set_detection_pool(self, pool):
+        """Usa un DetectionPool para ejecutar detect_icons en otros procesos"""
+        self.detection_pool = pool
+
+    def capture_full_screen(self):
+        """Captura la pantalla completa como array RGB"""
+        try:
+            return np.array(ImageGrab.grab().convert('RGB'))
+        except Exception as e:
+            logger.error("Error capturando pantalla: %s", e)
+            return None
+
+    def screen_thumbnail(self, size, max_age=1.0):
+        """
+        Miniatura RGB (ancho, alto) de la pantalla completa. Reutiliza la captura
+        del último capture_minimap si tiene menos de max_age segundos, así el
+        vigilante de composición no paga una captura de pantalla propia
+        """
+        last_screen = self._last_screen
+        if last_screen is not None and time.monotonic() - last_screen[0] <= max_age:
+            screen = last_screen[1]
+        else:
+            try:
+                screen = ImageGrab.grab()
+            except Exception as e:
+                logger.error("Error capturando pantalla: %s", e)
+                return None
+        return np.asarray(screen.resize(size, Image.BOX).convert('RGB'))
+
+    def get_minimap_region(self, screen_width, screen_height):
+        """Calcula la región (x1, y1, x2, y2) del minimapa, anclado abajo a la derecha"""
+        if self.auto_detect:
+            side = int(screen_height * MINIMAP_SCREEN_RATIO)
+            width, height = side, side
+        else:
+            width, height = self.custom_size
+        return (screen_width - width, screen_height - height, screen_width, screen_height)
+
+    def capture_minimap(self):
+        """
+        Captura solo el minimapa como array RGB. En Windows y macOS ImageGrab
+        captura siempre la pantalla entera y recorta, así que se captura una vez,
+        se recorta aquí y la captura completa se guarda para screen_thumbnail
+        """
+        try:
+            screen = ImageGrab.grab()
+            self._last_screen = (time.monotonic(), screen)
+            self.screen_size = screen.size
+            region = self.get_minimap_region(*self.screen_size)
+            return np.array(screen.crop(region).convert('RGB'))
+        except Exception as e:
+            logger.error("Error capturando minimapa: %s", e)
+            return None
+
+    def detect_icons(self, minimap_frame):
+        """Detecta posiciones reales de aliados y enemigos"""
+        if self.detection_pool is not None:
+            return self.detection_pool.detect(minimap_frame)
+        return detect_icons(minimap_frame)
@@ -0,0 +1,49 @@
+import cv2
+
+class MotionGate:
+    """
+    Compara una miniatura del minimapa con la del último frame procesado y decide
+    si merece la pena volver a detectar y componer, o reutilizar el último overlay
+    """
+    def __init__(self, size=24, pixel_threshold=25, min_changed_pixels=2, max_skipped=30):
+        """
+        :param size: Lado de la miniatura en escala de grises
+        :param pixel_threshold: Diferencia de brillo para considerar que un píxel cambió
+        :param min_changed_pixels: Píxeles cambiados necesarios para procesar el frame
+        :param max_skipped: Frames seguidos que se pueden saltar antes de forzar uno
+        """
+        self.size = size
+        self.pixel_threshold = pixel_threshold
+        self.min_changed_pixels = min_changed_pixels
+        self.max_skipped = max_skipped
+        self.reference = None
+        self.skipped = 0
+        self.processed_frames = 0
+        self.skipped_frames = 0
+
+    def reset(self):
+        self.reference = None
+        self.skipped = 0
+
+    def should_process(self, minimap_frame):
+        """
+        :param minimap_frame: Frame del minimapa (RGB)
+        :return: True si el frame cambió lo suficiente (o toca un refresco forzado)
+        """
+        thumb = cv2.resize(minimap_frame, (self.size, self.size), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(thumb, cv2.COLOR_RGB2GRAY)
+
+        # Se compara contra el último frame procesado para no perder cambios lentos
+        if self.reference is not None and gray.shape == self.reference.shape and self.skipped < self.max_skipped:
+            changed = cv2.countNonZero(cv2.threshold(
+                cv2.absdiff(gray, self.reference), self.pixel_threshold, 255, cv2.THRESH_BINARY
+            )[1])
+            if changed < self.min_changed_pixels:
+                self.skipped += 1
+                self.skipped_frames += 1
+                return False
+
+        self.reference = gray
+        self.skipped = 0
+        self.processed_frames += 1
+        return True
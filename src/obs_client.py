@@ -0,0 +1,127 @@
+import base64
+import hashlib
+import itertools
+import json
+import os
+import socket
+import threading
+from . import ws_protocol
+
+# Cliente mínimo del protocolo 5 de obs-websocket (OBS 28 o superior), sobre el
+# WebSocket de la biblioteca estándar. obs-websocket-py solo habla el protocolo 4.
+
+OP_HELLO = 0
+OP_IDENTIFY = 1
+OP_IDENTIFIED = 2
+OP_EVENT = 5
+OP_REQUEST = 6
+OP_REQUEST_RESPONSE = 7
+
+RPC_VERSION = 1
+SUBPROTOCOL = "obswebsocket.json"
+
+class OBSRequestError(Exception):
+    """OBS respondió a la petición con un error (la conexión sigue abierta)"""
+
+def auth_response(password, salt, challenge):
+    """Respuesta de autenticación de obs-websocket (igual en los protocolos 4 y 5)"""
+    secret = base64.b64encode(hashlib.sha256((password + salt).encode('utf-8')).digest())
+    return base64.b64encode(hashlib.sha256(secret + challenge.encode('utf-8')).digest()).decode('ascii')
+
+class OBSv5Client:
+    """
+    Conexión síncrona con obs-websocket 5: cada llamada envía la petición y
+    espera su respuesta. Los errores de red se propagan como OSError o
+    ws_protocol.ConnectionClosed para que quien llama pueda reconectar.
+    """
+    def __init__(self, host="localhost", port=4455, password="", timeout=5.0):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.timeout = timeout
+        self.sock = None
+        self.rfile = None
+        self.lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def connect(self):
+        """Abre la conexión, hace el saludo e identifica al cliente (con contraseña si OBS la pide)"""
+        self.sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.rfile = self.sock.makefile('rb')
+
+        key = base64.b64encode(os.urandom(16)).decode('ascii')
+        self.sock.sendall((
+            f"GET / HTTP/1.1\r\nHost: {self.host}:{self.port}\r\nUpgrade: websocket\r\n"
+            f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n"
+            f"Sec-WebSocket-Protocol: {SUBPROTOCOL}\r\n\r\n"
+        ).encode('ascii'))
+        status = self.rfile.readline().decode('latin-1')
+        headers = {}
+        while True:
+            line = self.rfile.readline().decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        if ' 101 ' not in status or headers.get('sec-websocket-accept') != ws_protocol.accept_key(key):
+            self.disconnect()
+            raise ConnectionError(f"Respuesta inesperada de obs-websocket: {status.strip()}")
+
+        hello = self._receive()
+        if hello.get('op') != OP_HELLO:
+            raise ConnectionError("obs-websocket no envió Hello")
+        identify = {'rpcVersion': RPC_VERSION, 'eventSubscriptions': 0}
+        authentication = hello['d'].get('authentication')
+        if authentication:
+            identify['authentication'] = auth_response(self.password, authentication['salt'],
+                                                       authentication['challenge'])
+        self._send({'op': OP_IDENTIFY, 'd': identify})
+        if self._receive().get('op') != OP_IDENTIFIED:
+            raise ConnectionError("obs-websocket rechazó la identificación")
+
+    def disconnect(self):
+        sock, self.sock = self.sock, None
+        if sock is None:
+            return
+        try:
+            sock.sendall(ws_protocol.encode_frame(b"", ws_protocol.OPCODE_CLOSE, mask=os.urandom(4)))
+        except OSError:
+            pass
+        sock.close()
+
+    def _send(self, message):
+        if self.sock is None:
+            raise ws_protocol.ConnectionClosed()
+        self.sock.sendall(ws_protocol.encode_frame(json.dumps(message), mask=os.urandom(4)))
+
+    def _receive(self):
+        # Se llama con self.lock tomado (o durante connect), así el PONG no se mezcla con otra petición
+        _, payload = ws_protocol.read_message(
+            self.rfile, lambda data: self.sock.sendall(ws_protocol.encode_frame(data, ws_protocol.OPCODE_PONG,
+                                                                                 mask=os.urandom(4)))
+        )
+        return json.loads(payload)
+
+    def call(self, request_type, request_data=None):
+        """
+        Envía una petición y espera su respuesta
+        :return: responseData (diccionario, vacío si OBS no devuelve datos)
+        """
+        with self.lock:
+            request_id = str(next(self._ids))
+            request = {'requestType': request_type, 'requestId': request_id}
+            if request_data:
+                request['requestData'] = request_data
+            self._send({'op': OP_REQUEST, 'd': request})
+            while True:
+                message = self._receive()
+                # Sin suscripciones no deberían llegar eventos, pero se ignoran por si acaso
+                if message.get('op') == OP_REQUEST_RESPONSE and message['d'].get('requestId') == request_id:
+                    break
+
+        response = message['d']
+        status = response.get('requestStatus', {})
+        if not status.get('result'):
+            raise OBSRequestError(f"{request_type}: {status.get('code')} {status.get('comment', '')}".strip())
+        return response.get('responseData') or {}
@@ -1,116 +1,324 @@
+import logging
 import time
 import threading
-from obswebsocket import obsws, requests
+from collections import deque
 import os
 from PIL import Image
+from .motion_gate import MotionGate
+from .obs_client import OBSv5Client, OBSRequestError
+
+logger = logging.getLogger(__name__)
+
+class OutputStats:
+    """
+    Métricas de la salida a OBS: actualizaciones enviadas, descartadas
+    (sustituidas por una más reciente antes de enviarse) y fallidas, tiempo
+    de ida y vuelta de cada petición, espera en cola y reconexiones
+    """
+    def __init__(self, samples=1000):
+        self.lock = threading.Lock()
+        self.samples = samples
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.queued = 0
+            self.sent = 0
+            self.dropped = 0
+            self.failed = 0
+            self.disconnects = 0
+            self.reconnects = 0
+            self.rtt_ms = deque(maxlen=self.samples)
+            self.queue_ms = deque(maxlen=self.samples)
+
+    def add(self, counter, amount=1):
+        with self.lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def record(self, queue_seconds, rtt_seconds, ok):
+        with self.lock:
+            self.queue_ms.append(queue_seconds * 1000)
+            if ok:
+                self.sent += 1
+                self.rtt_ms.append(rtt_seconds * 1000)
+            else:
+                self.failed += 1
+
+    @staticmethod
+    def _summary(values):
+        if not values:
+            return {'avg': 0.0, 'p50': 0.0, 'p95': 0.0, 'max': 0.0}
+        ordered = sorted(values)
+        return {
+            'avg': round(sum(ordered) / len(ordered), 2),
+            'p50': round(ordered[len(ordered) // 2], 2),
+            'p95': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+            'max': round(ordered[-1], 2)
+        }
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'queued': self.queued,
+                'sent': self.sent,
+                'dropped': self.dropped,
+                'failed': self.failed,
+                'disconnects': self.disconnects,
+                'reconnects': self.reconnects,
+                'rtt_ms': self._summary(self.rtt_ms),
+                'queue_ms': self._summary(self.queue_ms)
+            }
 
 class OBSIntegration:
-    def __init__(self, host="localhost", port=4444, password=""):
-        self.ws = obsws(host, port, password)
+    """
+    Envía el overlay falso a una fuente de imagen de OBS. La generación y el
+    envío van en hilos separados unidos por una cola de un solo elemento: si OBS
+    tarda, el siguiente envío lleva siempre el overlay más reciente (los
+    intermedios se descartan y se cuentan) y la captura no se frena. Si se
+    pierde la conexión se reintenta con espera exponencial.
+    :param protocol: 4 (obs-websocket 4.x, obs-websocket-py) o 5 (OBS 28 o superior)
+    :param reconnect_delay: Espera tras el primer intento de reconexión fallido (s)
+    :param max_reconnect_delay: Espera máxima entre intentos (s)
+    """
+    def __init__(self, host="localhost", port=4444, password="", protocol=4, timeout=5.0,
+                 source_name="MinimapaFalso", scene_name="Escena", reconnect_delay=1.0, max_reconnect_delay=30.0):
+        self.connection = (host, port, password)
+        self.protocol = protocol
+        self.timeout = timeout
+        self.source_name = source_name
+        self.scene_name = scene_name
+        self.ws = self._create_client(*self.connection)
+        self.connected = False
+        self.pending_connection = None
+        self.update_interval = 2
         self.running = False
         self.thread = None
+        self.sender_thread = None
         self.overlay_path = os.path.abspath("temp_overlay.png")
+        self.motion_gate = MotionGate()
+        self.stats = OutputStats()
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self._retry_delay = self.reconnect_delay
+        self._next_retry = 0.0
+        self._pending = None
+        self._pending_ready = threading.Condition()
+    
+    def _create_client(self, host, port, password):
+        if self.protocol == 5:
+            return OBSv5Client(host, port, password, timeout=self.timeout)
+        # obs-websocket-py solo hace falta con el protocolo 4
+        from obswebsocket import obsws, requests
+        self._v4_requests = requests
+        return obsws(host, port, password)
         
     def connect(self):
         try:
             self.ws.connect()
-            print("Conexión a OBS establecida")
+            self.connected = True
+            logger.info("Conexión a OBS establecida", extra={'host': self.connection[0], 'port': self.connection[1],
+                                                            'protocol': self.protocol})
             return True
         except Exception as e:
-            print(f"Error conectando a OBS: {e}")
+            logger.error("Error conectando a OBS: %s", e)
             return False
     
     def disconnect(self):
+        self.connected = False
         self.ws.disconnect()
-        print("Desconectado de OBS")
+        logger.info("Desconectado de OBS")
+    
+    def update_connection(self, host, port, password):
+        """Programa una reconexión con otros datos; se hace entre dos actualizaciones"""
+        if (host, port, password) != self.connection:
+            self.pending_connection = (host, port, password)
+    
+    def _apply_pending_connection(self):
+        connection, self.pending_connection = self.pending_connection, None
+        if connection is None:
+            return
+        self.connection = connection
+        self._reconnect(force=True)
+    
+    def _reconnect(self, force=False):
+        """
+        Crea una conexión nueva; entre intentos fallidos espera cada vez el doble
+        (hasta max_reconnect_delay) para no saturar a OBS mientras se reinicia
+        :return: True si quedó conectado
+        """
+        now = time.monotonic()
+        if not force and now < self._next_retry:
+            return False
+        try:
+            self.disconnect()
+        except Exception as e:
+            logger.warning("Error desconectando de OBS: %s", e)
+        self.ws = self._create_client(*self.connection)
+        if self.connect():
+            self.stats.add('reconnects')
+            self._retry_delay = self.reconnect_delay
+            self.create_image_source()
+            return True
+        self._next_retry = now + self._retry_delay
+        self._retry_delay = min(self._retry_delay * 2, self.max_reconnect_delay)
+        return False
+    
+    def _list_sources(self):
+        if self.protocol == 5:
+            return [item['inputName'] for item in self.ws.call('GetInputList').get('inputs', [])]
+        return [source['name'] for source in self.ws.call(self._v4_requests.GetSourcesList()).getSources()]
     
-    def create_image_source(self, source_name="MinimapaFalso"):
+    def create_image_source(self, source_name=None):
         """Crea una fuente de imagen en OBS si no existe"""
+        source_name = source_name or self.source_name
         try:
             # Verificar si la fuente ya existe
-            sources = self.ws.call(requests.GetSourcesList())
-            for source in sources.getSources():
-                if source['name'] == source_name:
-                    print(f"Fuente '{source_name}' ya existe")
-                    return
+            if source_name in self._list_sources():
+                logger.info("Fuente '%s' ya existe", source_name)
+                return
             
             # Crear nueva fuente
-            self.ws.call(requests.CreateSource(
-                sourceName=source_name,
-                sourceKind="image_source",
-                sceneName="Escena"  # Nombre de tu escena principal
-            ))
-            print(f"Fuente '{source_name}' creada")
+            if self.protocol == 5:
+                self.ws.call('CreateInput', {
+                    'sceneName': self.scene_name,
+                    'inputName': source_name,
+                    'inputKind': 'image_source',
+                    'inputSettings': {'file': self.overlay_path}
+                })
+            else:
+                self.ws.call(self._v4_requests.CreateSource(
+                    sourceName=source_name,
+                    sourceKind="image_source",
+                    sceneName=self.scene_name
+                ))
+            logger.info("Fuente '%s' creada", source_name)
             
             # Configurar la ruta de la imagen
             self.update_image(source_name, self.overlay_path)
         except Exception as e:
-            print(f"Error creando fuente: {e}")
+            logger.error("Error creando fuente: %s", e)
     
     def update_image(self, source_name, image_path):
-        """Actualiza la imagen de una fuente existente"""
+        """
+        Actualiza la imagen de una fuente existente
+        :return: True si OBS confirmó el cambio
+        """
         try:
-            self.ws.call(requests.SetSourceSettings(
-                sourceName=source_name,
-                sourceSettings={"file": image_path}
-            ))
-            # print(f"Imagen actualizada: {image_path}")
+            if self.protocol == 5:
+                self.ws.call('SetInputSettings', {'inputName': source_name, 'inputSettings': {'file': image_path}})
+            else:
+                self.ws.call(self._v4_requests.SetSourceSettings(
+                    sourceName=source_name,
+                    sourceSettings={"file": image_path}
+                ))
+            return True
+        except OBSRequestError as e:
+            logger.error("Error actualizando imagen: %s", e)
+            return False
         except Exception as e:
-            print(f"Error actualizando imagen: {e}")
+            # Fallo de red: la conexión ya no sirve
+            logger.error("Conexión con OBS perdida (%s): %s", type(e).__name__, e)
+            if self.connected:
+                self.connected = False
+                self.stats.add('disconnects')
+            return False
     
     def start_streaming_fake_minimap(self, capture, generator, update_interval=2):
-        """Inicia el hilo para transmitir el minimapa falso a OBS"""
+        """Inicia los hilos que generan y transmiten el minimapa falso a OBS"""
         if not self.connect():
             return False
         
         self.create_image_source()
+        self.update_interval = update_interval
         self.running = True
+        self.sender_thread = threading.Thread(target=self._send_loop, name="OBSSender")
+        self.sender_thread.daemon = True
+        self.sender_thread.start()
         self.thread = threading.Thread(
             target=self._update_loop,
-            args=(capture, generator, update_interval)
+            args=(capture, generator)
         )
         self.thread.daemon = True
         self.thread.start()
         return True
     
-    def _update_loop(self, capture, generator, update_interval):
+    def _enqueue(self, overlay):
+        """Deja el overlay para el hilo de envío, sustituyendo al anterior si aún no salió"""
+        with self._pending_ready:
+            if self._pending is not None:
+                self.stats.add('dropped')
+            self._pending = (overlay, time.perf_counter())
+            self.stats.add('queued')
+            self._pending_ready.notify()
+    
+    def _update_loop(self, capture, generator):
         """Bucle principal de actualización para OBS"""
         while self.running:
+            started = time.monotonic()
+            # Se lee una vez por vuelta: los cambios de configuración valen desde la siguiente
+            update_interval = self.update_interval
             try:
                 # 1. Capturar minimapa
                 minimap_frame = capture.capture_minimap()
-                if minimap_frame is None:
-                    time.sleep(update_interval)
-                    continue
                 
-                # 2. Detectar posiciones reales (simulado)
-                # En una implementación real, usaríamos nuestro detector de iconos
-                real_allies, real_enemies = capture.detect_icons(minimap_frame)
-                
-                # 3. Generar overlay falso
-                fake_overlay = generator.generate_fake_map(
-                    minimap_frame, 
-                    real_allies, 
-                    real_enemies
-                )
+                # Minimapa estático (muerto, en tienda, en base): OBS ya muestra el último overlay
+                if minimap_frame is not None and self.motion_gate.should_process(minimap_frame):
+                    # 2. Detectar posiciones reales
+                    real_allies, real_enemies = capture.detect_icons(minimap_frame)
+                    
+                    # 3. Generar overlay falso y pasarlo al hilo de envío
+                    self._enqueue(generator.generate_fake_map(
+                        minimap_frame, 
+                        real_allies, 
+                        real_enemies
+                    ))
                 
+            except Exception:
+                logger.exception("Error en bucle de actualización")
+            
+            time.sleep(max(0.0, update_interval - (time.monotonic() - started)))
+    
+    def _send_loop(self):
+        """Guarda y envía a OBS el overlay más reciente; también gestiona las reconexiones"""
+        while self.running:
+            with self._pending_ready:
+                if self._pending is None:
+                    self._pending_ready.wait(0.5)
+                pending, self._pending = self._pending, None
+            
+            self._apply_pending_connection()
+            if pending is None:
+                continue
+            overlay, queued_at = pending
+            dequeued = time.perf_counter()
+            if not self.connected and not self._reconnect():
+                self.stats.record(dequeued - queued_at, 0.0, False)
+                continue
+            
+            try:
                 # 4. Guardar imagen temporal
-                fake_overlay.save(self.overlay_path)
-                
-                # 5. Actualizar OBS
-                self.update_image("MinimapaFalso", self.overlay_path)
-                
+                overlay.save(self.overlay_path)
             except Exception as e:
-                print(f"Error en bucle de actualización: {e}")
+                logger.error("Error guardando el overlay: %s", e)
+                continue
             
-            time.sleep(update_interval)
+            # 5. Actualizar OBS
+            sent = time.perf_counter()
+            ok = self.update_image(self.source_name, self.overlay_path)
+            self.stats.record(dequeued - queued_at, time.perf_counter() - sent, ok)
     
     def stop(self):
         """Detiene la transmisión"""
         self.running = False
-        if self.thread and self.thread.is_alive():
-            self.thread.join(timeout=2.0)
-        self.disconnect()
+        with self._pending_ready:
+            self._pending_ready.notify_all()
+        for thread in (self.thread, self.sender_thread):
+            if thread and thread.is_alive():
+                thread.join(timeout=2.0)
+        try:
+            self.disconnect()
+        except Exception as e:
+            logger.warning("Error desconectando de OBS: %s", e)
 
 # Ejemplo de uso
 if __name__ == "__main__":
@@ -0,0 +1,108 @@
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+from .fake_map_generator import FakeMapGenerator
+from .obs_integration import OBSIntegration
+from .obs_mock import MockOBSServer
+from .synthetic_minimap import SyntheticMinimapRenderer, PLAYERS_PER_TEAM
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RATES = (1, 2, 5, 10, 20, 40)
+COMPOSITION = {
+    "aliados": ["Ashe", "Janna", "Garen", "LeeSin", "Zed"],
+    "enemigos": ["Caitlyn", "Lux", "Darius", "Khazix", "Yasuo"]
+}
+
+class SyntheticCapture:
+    """
+    Captura de pruebas: recorre en bucle un lote de minimapas sintéticos
+    generado con semilla y devuelve sus posiciones exactas como detecciones
+    """
+    def __init__(self, frames=64, size=256, seed=0):
+        self.frames, labels = SyntheticMinimapRenderer(size=size, seed=seed).render_batch(frames)
+        self.positions = []
+        for frame_labels in labels:
+            allies = [(int(x), int(y)) for _, team, x, y in frame_labels[:PLAYERS_PER_TEAM] if team >= 0]
+            enemies = [(int(x), int(y)) for _, team, x, y in frame_labels[PLAYERS_PER_TEAM:] if team >= 0]
+            self.positions.append((allies, enemies))
+        self.index = 0
+        self._current = 0
+
+    def capture_minimap(self):
+        self._current = self.index % len(self.frames)
+        self.index += 1
+        return self.frames[self._current]
+
+    def detect_icons(self, minimap_frame):
+        return self.positions[self._current]
+
+def run_load_test(rates=DEFAULT_RATES, duration=5.0, protocol=5, latency=0.0, jitter=0.0,
+                  disconnect_every=0, password="", seed=0, timeout=2.0):
+    """
+    Mide la salida a OBS contra el simulador a frecuencias crecientes
+    :param rates: Actualizaciones por segundo pedidas a start_streaming_fake_minimap
+    :param duration: Segundos por frecuencia
+    :return: Lista de resultados por frecuencia (métricas de OBSIntegration y del simulador)
+    """
+    server = MockOBSServer(protocol=protocol, password=password, latency=latency, jitter=jitter,
+                           disconnect_every=disconnect_every, seed=seed)
+    server.start()
+    capture = SyntheticCapture(seed=seed)
+    generator = FakeMapGenerator(seed=seed)
+    generator.set_team_composition(COMPOSITION)
+    overlay_dir = tempfile.mkdtemp(prefix="obs_load_test_")
+    results = []
+    try:
+        for rate in rates:
+            before = server.snapshot()
+            # Reintentos rápidos: en la prueba interesa cuánto tarda en recuperarse, no proteger a OBS
+            obs = OBSIntegration("127.0.0.1", server.port, password, protocol=protocol, timeout=timeout,
+                                 reconnect_delay=0.1, max_reconnect_delay=1.0)
+            obs.overlay_path = os.path.join(overlay_dir, f"overlay_{rate}.png")
+            if not obs.start_streaming_fake_minimap(capture, generator, update_interval=1.0 / rate):
+                raise ConnectionError("No se pudo conectar con el simulador de obs-websocket")
+            time.sleep(duration)
+            obs.stop()
+
+            after = server.snapshot()
+            result = obs.stats.snapshot()
+            result.update({
+                'rate': rate,
+                'achieved_rate': round(result['sent'] / duration, 2),
+                'server_requests': after.get('requests', 0) - before.get('requests', 0),
+                'injected_disconnects': after.get('injected_disconnects', 0) - before.get('injected_disconnects', 0)
+            })
+            results.append(result)
+            logger.info("Carga a %s/s: %s enviadas, %s descartadas, ida y vuelta p95 %s ms",
+                        rate, result['sent'], result['dropped'], result['rtt_ms']['p95'], extra={'load_test': result})
+    finally:
+        server.stop()
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Prueba de carga de la salida a OBS con un obs-websocket simulado')
+    parser.add_argument('--protocol', type=int, choices=(4, 5), default=5, help='Versión del protocolo obs-websocket')
+    parser.add_argument('--rates', type=float, nargs='+', default=list(DEFAULT_RATES), help='Actualizaciones por segundo')
+    parser.add_argument('--duration', type=float, default=5.0, help='Segundos por frecuencia')
+    parser.add_argument('--latency', type=float, default=0.0, help='Latencia añadida por respuesta (s)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Variación máxima de la latencia (s)')
+    parser.add_argument('--disconnect-every', type=int, default=0, help='Cortar la conexión cada N peticiones')
+    parser.add_argument('--password', default='', help='Contraseña del simulador')
+    parser.add_argument('--seed', type=int, default=0, help='Semilla de minimapas, generador y latencias')
+    parser.add_argument('--out', help='Guardar los resultados en un JSON')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    load_results = run_load_test(args.rates, args.duration, args.protocol, args.latency, args.jitter,
+                                 args.disconnect_every, args.password, args.seed)
+    print(f"{'frec':>6} {'logr':>6} {'env':>6} {'desc':>6} {'fall':>5} {'recon':>5} {'rtt p50':>8} {'rtt p95':>8} {'cola p95':>9}")
+    for r in load_results:
+        print(f"{r['rate']:>6g} {r['achieved_rate']:>6.1f} {r['sent']:>6} {r['dropped']:>6} {r['failed']:>5} "
+              f"{r['reconnects']:>5} {r['rtt_ms']['p50']:>8.1f} {r['rtt_ms']['p95']:>8.1f} {r['queue_ms']['p95']:>9.1f}")
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(load_results, f, indent=2)
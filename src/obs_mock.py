@@ -0,0 +1,250 @@
+import json
+import logging
+import random
+import secrets
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from . import ws_protocol
+from .obs_client import (OP_HELLO, OP_IDENTIFY, OP_IDENTIFIED, OP_REQUEST, OP_REQUEST_RESPONSE,
+                         RPC_VERSION, SUBPROTOCOL, auth_response)
+
+logger = logging.getLogger(__name__)
+
+class _InjectedDisconnect(Exception):
+    """Corte de conexión provocado por el simulador"""
+
+class _MockOBSHandler(BaseHTTPRequestHandler):
+    server_version = "MockOBS"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        key = self.headers.get('Sec-WebSocket-Key')
+        if self.headers.get('Upgrade', '').lower() != 'websocket' or not key:
+            self.send_error(400)
+            return
+        mock = self.server.mock
+        protocols = [p.strip() for p in self.headers.get('Sec-WebSocket-Protocol', '').split(',')]
+        self.wfile.write(ws_protocol.handshake_response(key, SUBPROTOCOL if SUBPROTOCOL in protocols else None))
+        self.wfile.flush()
+        self.close_connection = True
+
+        mock.add_connection(self.connection)
+        try:
+            if mock.protocol == 5:
+                self._serve_v5(mock)
+            else:
+                self._serve_v4(mock)
+        except (ws_protocol.ConnectionClosed, _InjectedDisconnect, OSError, ValueError):
+            pass
+        finally:
+            mock.remove_connection(self.connection)
+
+    def _write(self, payload, opcode=ws_protocol.OPCODE_TEXT):
+        # Solo escribe el hilo de esta conexión: no hace falta bloqueo
+        self.wfile.write(ws_protocol.encode_frame(payload, opcode))
+        self.wfile.flush()
+
+    def _send(self, message):
+        self._write(json.dumps(message))
+
+    def _receive(self):
+        _, payload = ws_protocol.read_message(self.rfile, lambda data: self._write(data, ws_protocol.OPCODE_PONG))
+        return json.loads(payload)
+
+    def _serve_v4(self, mock):
+        challenge, salt = secrets.token_hex(16), secrets.token_hex(16)
+        authenticated = not mock.password
+        while mock.running:
+            request = self._receive()
+            request_type = request.get('request-type')
+            response = {'message-id': request.get('message-id'), 'status': 'ok'}
+            if request_type == 'GetAuthRequired':
+                response['authRequired'] = bool(mock.password)
+                if mock.password:
+                    response.update(challenge=challenge, salt=salt)
+            elif request_type == 'Authenticate':
+                authenticated = request.get('auth') == auth_response(mock.password, salt, challenge)
+                if not authenticated:
+                    mock.count('auth_failures')
+                    response.update(status='error', error='Authentication Failed.')
+            elif not authenticated:
+                response.update(status='error', error='Not Authenticated')
+            else:
+                mock.before_response(request_type)
+                data, error = mock.handle(request_type, request, protocol=4)
+                if error:
+                    response.update(status='error', error=error)
+                else:
+                    response.update(data)
+            self._send(response)
+
+    def _serve_v5(self, mock):
+        challenge, salt = secrets.token_hex(16), secrets.token_hex(16)
+        hello = {'obsWebSocketVersion': '5.1.0', 'rpcVersion': RPC_VERSION}
+        if mock.password:
+            hello['authentication'] = {'challenge': challenge, 'salt': salt}
+        self._send({'op': OP_HELLO, 'd': hello})
+
+        identify = self._receive()
+        if identify.get('op') != OP_IDENTIFY:
+            return
+        if mock.password and identify['d'].get('authentication') != auth_response(mock.password, salt, challenge):
+            mock.count('auth_failures')
+            self._write(b"\x0f\xa9", ws_protocol.OPCODE_CLOSE)  # 4009
+            return
+        self._send({'op': OP_IDENTIFIED, 'd': {'negotiatedRpcVersion': RPC_VERSION}})
+
+        while mock.running:
+            message = self._receive()
+            if message.get('op') != OP_REQUEST:
+                continue
+            request = message['d']
+            request_type = request.get('requestType')
+            mock.before_response(request_type)
+            data, error = mock.handle(request_type, request.get('requestData') or {}, protocol=5)
+            response = {
+                'requestType': request_type,
+                'requestId': request.get('requestId'),
+                'requestStatus': {'result': error is None, 'code': 100 if error is None else 600}
+            }
+            if error:
+                response['requestStatus']['comment'] = error
+            elif data:
+                response['responseData'] = data
+            self._send({'op': OP_REQUEST_RESPONSE, 'd': response})
+
+class MockOBSServer:
+    """
+    Simulador local de obs-websocket (protocolos 4 y 5) para medir la salida a
+    OBS sin OBS: atiende las peticiones de fuentes de imagen que usa
+    OBSIntegration, con latencia (y variación) añadida y cortes de conexión
+    cada N peticiones. La variación usa una semilla: dos ejecuciones con los
+    mismos parámetros inyectan exactamente los mismos retardos y cortes.
+    """
+    def __init__(self, host="127.0.0.1", port=0, protocol=5, password="", latency=0.0, jitter=0.0,
+                 disconnect_every=0, seed=0):
+        """
+        :param port: 0 = puerto libre elegido por el sistema (ver self.port tras start)
+        :param latency: Segundos de espera antes de cada respuesta
+        :param jitter: Variación máxima añadida a la latencia (uniforme, en segundos)
+        :param disconnect_every: Cortar la conexión en lugar de responder cada N peticiones (0 = nunca)
+        """
+        self.host = host
+        self.port = port
+        self.protocol = protocol
+        self.password = password
+        self.latency = latency
+        self.jitter = jitter
+        self.disconnect_every = disconnect_every
+        self.rng = random.Random(seed)
+        self.sources = {}
+        self.stats = Counter()
+        self.lock = threading.Lock()
+        self.connections = set()
+        self.running = False
+        self.httpd = None
+        self.thread = None
+
+    def start(self):
+        self.httpd = ThreadingHTTPServer((self.host, self.port), _MockOBSHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.mock = self
+        self.port = self.httpd.server_address[1]
+        self.running = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="MockOBS")
+        self.thread.daemon = True
+        self.thread.start()
+        logger.info("Simulador de obs-websocket v%s en ws://%s:%s", self.protocol, self.host, self.port)
+
+    def stop(self):
+        self.running = False
+        self.drop_connections()
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+
+    def add_connection(self, connection):
+        with self.lock:
+            self.connections.add(connection)
+            self.stats['connections'] += 1
+
+    def remove_connection(self, connection):
+        with self.lock:
+            self.connections.discard(connection)
+
+    def drop_connections(self):
+        """Cierra todas las conexiones abiertas (como si OBS se cerrara)"""
+        with self.lock:
+            connections = list(self.connections)
+        for connection in connections:
+            try:
+                connection.shutdown(2)
+            except OSError:
+                pass
+
+    def count(self, key, amount=1):
+        with self.lock:
+            self.stats[key] += amount
+
+    def set_latency(self, latency, jitter=0.0):
+        self.latency = latency
+        self.jitter = jitter
+
+    def before_response(self, request_type):
+        """Aplica los fallos inyectados: corte cada disconnect_every peticiones y latencia"""
+        with self.lock:
+            self.stats['requests'] += 1
+            self.stats[f'requests.{request_type}'] += 1
+            if self.disconnect_every and self.stats['requests'] % self.disconnect_every == 0:
+                self.stats['injected_disconnects'] += 1
+                raise _InjectedDisconnect()
+            delay = self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def handle(self, request_type, data, protocol):
+        """
+        Ejecuta una petición sobre el estado simulado
+        :return: (datos de respuesta, mensaje de error o None)
+        """
+        with self.lock:
+            if protocol == 4:
+                if request_type == 'GetVersion':
+                    return {'obs-websocket-version': '4.9.1', 'obs-studio-version': '27.2.4'}, None
+                if request_type == 'GetSourcesList':
+                    return {'sources': [{'name': name, 'typeId': 'image_source', 'type': 'input'}
+                                        for name in self.sources]}, None
+                if request_type == 'CreateSource':
+                    self.sources[data['sourceName']] = dict(data.get('sourceSettings') or {})
+                    return {'itemId': len(self.sources)}, None
+                if request_type == 'SetSourceSettings':
+                    if data.get('sourceName') not in self.sources:
+                        return None, 'specified source doesn\'t exist'
+                    self.sources[data['sourceName']].update(data.get('sourceSettings') or {})
+                    return {'sourceName': data['sourceName'], 'sourceType': 'image_source',
+                            'sourceSettings': self.sources[data['sourceName']]}, None
+            else:
+                if request_type == 'GetVersion':
+                    return {'obsWebSocketVersion': '5.1.0', 'rpcVersion': RPC_VERSION}, None
+                if request_type == 'GetInputList':
+                    return {'inputs': [{'inputName': name, 'inputKind': 'image_source'}
+                                       for name in self.sources]}, None
+                if request_type == 'CreateInput':
+                    if data.get('inputName') in self.sources:
+                        return None, 'An input with that name already exists'
+                    self.sources[data['inputName']] = dict(data.get('inputSettings') or {})
+                    return {'sceneItemId': len(self.sources)}, None
+                if request_type == 'SetInputSettings':
+                    if data.get('inputName') not in self.sources:
+                        return None, 'No source was found'
+                    self.sources[data['inputName']].update(data.get('inputSettings') or {})
+                    return {}, None
+        return None, f'Unknown request type: {request_type}'
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.stats)
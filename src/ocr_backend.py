@@ -0,0 +1,87 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pytesseract
+from PIL import Image
+
+try:
+    import tesserocr
+except ImportError:  # tesserocr es opcional; sin él se usa pytesseract en lote
+    tesserocr = None
+
+class OCRBackend:
+    """
+    Backend OCR para los nombres de la pantalla de carga.
+    Con tesserocr mantiene varias instancias de Tesseract cargadas en memoria
+    (el modelo de idioma se carga una sola vez) y reconoce los recortes en paralelo.
+    Sin tesserocr junta todos los recortes en una sola imagen y hace una única
+    llamada a pytesseract en lugar de lanzar un proceso por recorte.
+    """
+    def __init__(self, workers=4, lang='eng'):
+        self.workers = workers
+        self.lang = lang
+        self._apis = queue.Queue()
+        self._executor = None
+
+        if tesserocr is not None:
+            for _ in range(workers):
+                self._apis.put(tesserocr.PyTessBaseAPI(lang=lang, psm=tesserocr.PSM.SINGLE_LINE))
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr")
+
+    def recognize_batch(self, crops):
+        """
+        Reconoce el texto de varios recortes en una sola llamada
+        :param crops: Lista de imágenes en escala de grises (arrays 2D)
+        :return: Lista de textos, uno por recorte y en el mismo orden
+        """
+        if not crops:
+            return []
+        if self._executor is not None:
+            return list(self._executor.map(self._recognize_one, crops))
+        return self._recognize_stacked(crops)
+
+    def _recognize_one(self, crop):
+        """Reconoce un recorte con una instancia persistente de tesserocr"""
+        api = self._apis.get()
+        try:
+            api.SetImage(Image.fromarray(crop))
+            return api.GetUTF8Text().strip()
+        finally:
+            self._apis.put(api)
+
+    def _recognize_stacked(self, crops, gap=10):
+        """Apila los recortes verticalmente y los reconoce con un único proceso tesseract"""
+        width = max(crop.shape[1] for crop in crops)
+        height = sum(crop.shape[0] + gap for crop in crops)
+        # Fondo negro: los recortes llegan binarizados con texto claro sobre oscuro
+        sheet = np.zeros((height, width), dtype=np.uint8)
+        slot_ranges = []
+        y = 0
+        for crop in crops:
+            sheet[y:y + crop.shape[0], :crop.shape[1]] = crop
+            slot_ranges.append((y, y + crop.shape[0]))
+            y += crop.shape[0] + gap
+
+        data = pytesseract.image_to_data(
+            sheet, lang=self.lang, config='--psm 6', output_type=pytesseract.Output.DICT
+        )
+
+        # Asignar cada palabra al recorte que contiene su centro vertical
+        words = [[] for _ in crops]
+        for text, top, h in zip(data['text'], data['top'], data['height']):
+            if not text.strip():
+                continue
+            center = top + h // 2
+            for i, (start, end) in enumerate(slot_ranges):
+                if start <= center < end + gap:
+                    words[i].append(text.strip())
+                    break
+        return [" ".join(slot_words) for slot_words in words]
+
+    def close(self):
+        """Libera las instancias de Tesseract"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        while not self._apis.empty():
+            self._apis.get().End()
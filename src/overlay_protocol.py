@@ -0,0 +1,70 @@
+import struct
+import time
+from .entities import Entity
+
+# Formato binario de un frame del overlay (little-endian):
+#   cabecera: magic "PMOV", versión u8, reservado u8, tamaño canónico u16,
+#             marca de tiempo f64 (segundos), número de entidades u16
+#   entidad:  id de campeón u16 (0 = desconocido), equipo u8, ranura u8, x i16, y i16
+MAGIC = b"PMOV"
+VERSION = 1
+HEADER = struct.Struct("<4sBBHdH")
+ENTITY = struct.Struct("<HBBhh")
+# Prefijo de longitud para guardar o enviar varios frames seguidos
+LENGTH_PREFIX = struct.Struct("<I")
+
+TEAMS = ('ally', 'enemy')
+
+class ProtocolError(ValueError):
+    """Los datos no son un frame válido"""
+
+def encode_frame(entities, champion_ids, canonical_size, timestamp=None):
+    """
+    Codifica un frame de entidades
+    :param entities: Lista de entities.Entity (FakeMapGenerator.generate_fake_entities)
+    :param champion_ids: Función nombre -> id numérico, para entidades sin champion_id
+    :return: bytes
+    """
+    timestamp = time.time() if timestamp is None else timestamp
+    parts = [HEADER.pack(MAGIC, VERSION, 0, canonical_size, timestamp, len(entities))]
+    for entity in entities:
+        champion_id = entity.champion_id or champion_ids(entity.name)
+        parts.append(ENTITY.pack(champion_id, TEAMS.index(entity.team), entity.slot, entity.x, entity.y))
+    return b"".join(parts)
+
+def decode_frame(data, champion_names=None):
+    """
+    Decodifica un frame
+    :param champion_names: Función id -> nombre; sin ella 'name' es el id en texto
+    :return: (marca de tiempo, tamaño canónico, lista de entities.Entity)
+    """
+    if len(data) < HEADER.size:
+        raise ProtocolError("Frame demasiado corto")
+    magic, version, _, canonical_size, timestamp, count = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ProtocolError(f"Cabecera desconocida: {magic!r} v{version}")
+    if len(data) < HEADER.size + count * ENTITY.size:
+        raise ProtocolError("Frame truncado")
+
+    entities = []
+    for champion_id, team, slot, x, y in ENTITY.iter_unpack(data[HEADER.size:HEADER.size + count * ENTITY.size]):
+        name = champion_names(champion_id) if champion_names else str(champion_id)
+        entities.append(Entity(TEAMS[team], slot, name, x, y, champion_id=champion_id))
+    return timestamp, canonical_size, entities
+
+def write_frame(stream, data):
+    """Escribe un frame con prefijo de longitud en un fichero o socket (makefile)"""
+    stream.write(LENGTH_PREFIX.pack(len(data)))
+    stream.write(data)
+
+def read_frames(stream):
+    """Itera los frames de un flujo escrito con write_frame"""
+    while True:
+        prefix = stream.read(LENGTH_PREFIX.size)
+        if len(prefix) < LENGTH_PREFIX.size:
+            return
+        (length,) = LENGTH_PREFIX.unpack(prefix)
+        data = stream.read(length)
+        if len(data) < length:
+            return
+        yield data
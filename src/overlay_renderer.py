@@ -0,0 +1,117 @@
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw
+from .champion_db import icon_file_name
+from .overlay_protocol import decode_frame
+
+# Resolución canónica: el generador trabaja y dibuja siempre a este tamaño
+CANONICAL_SIZE = 320
+
+class OverlayRenderer:
+    """
+    Convierte entidades (nombre, equipo, x, y en coordenadas canónicas) en una imagen RGBA.
+    Los sprites de cada icono y los mapas de remuestreo se calculan una vez y se
+    reutilizan; si el frame es idéntico al anterior se devuelve la misma imagen.
+    """
+    def __init__(self, icon_cache, icon_size=12, canonical_size=CANONICAL_SIZE):
+        """
+        :param icon_cache: IconCache (o cualquier objeto con get(nombre)) con los iconos escalados
+        """
+        self.icon_cache = icon_cache
+        self.icon_size = icon_size
+        self.canonical_size = canonical_size
+        self._dots = {}
+        self._resample_maps = {}
+        self._last_key = None
+        self._last_image = None
+
+    def set_icon_size(self, icon_size):
+        """Cambia el tamaño de icono e invalida los sprites cacheados"""
+        self.icon_size = icon_size
+        self._dots = {}
+        self._last_key = None
+
+    def _sprite(self, champion_name, team):
+        """Sprite listo para pegar: el icono escalado o un círculo del color del equipo"""
+        # La caché de iconos (con límite de memoria) ya guarda los iconos escalados
+        icon = self.icon_cache.get(icon_file_name(champion_name))
+        if icon is not None:
+            if icon.size != (self.icon_size, self.icon_size):
+                icon = icon.resize((self.icon_size, self.icon_size))
+            return icon
+
+        dot = self._dots.get(team)
+        if dot is None:
+            size = self.icon_size
+            radius = max(2, size // 2 - 1)
+            dot = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+            color = (0, 0, 255, 180) if team == 'ally' else (255, 0, 0, 180)
+            center = size // 2
+            ImageDraw.Draw(dot).ellipse(
+                [(center - radius, center - radius), (center + radius, center + radius)], fill=color
+            )
+            self._dots[team] = dot
+        return dot
+
+    def render(self, entities, output_size):
+        """
+        Dibuja las entidades y escala el resultado a output_size (ancho, alto)
+        :param entities: Iterable de entities.Entity
+        :return: Imagen RGBA
+        """
+        output_size = tuple(output_size)
+        key = (tuple((e.name, e.team, e.x, e.y) for e in entities), output_size, self.icon_size)
+        if key == self._last_key:
+            return self._last_image
+
+        half = self.icon_size // 2
+        overlay = Image.new('RGBA', (self.canonical_size, self.canonical_size), (0, 0, 0, 0))
+        for name, team, x, y in key[0]:
+            sprite = self._sprite(name, team)
+            overlay.paste(sprite, (x - half, y - half), sprite)
+
+        image = self.resample_to_output(overlay, output_size)
+        self._last_key, self._last_image = key, image
+        return image
+
+    def render_frame(self, data, output_size, champion_names=None):
+        """
+        Dibuja un frame vectorial (bytes de overlay_protocol)
+        :param champion_names: Función id -> nombre (p. ej. ChampionDatabase.get_champion_name)
+        """
+        _, canonical_size, entities = decode_frame(data, champion_names)
+        if canonical_size != self.canonical_size:
+            scale = self.canonical_size / canonical_size
+            for entity in entities:
+                entity.x = int(entity.x * scale)
+                entity.y = int(entity.y * scale)
+        return self.render(entities, output_size)
+
+    def _get_resample_maps(self, output_size):
+        """Mapas de remuestreo (punto fijo) del buffer canónico a output_size, cacheados"""
+        maps = self._resample_maps.get(output_size)
+        if maps is None:
+            # Si el tamaño del minimapa cambia a menudo no se acumulan mapas viejos
+            if len(self._resample_maps) >= 4:
+                self._resample_maps.clear()
+            width, height = output_size
+            map_x = (np.arange(width, dtype=np.float32) + 0.5) * (self.canonical_size / width) - 0.5
+            map_y = (np.arange(height, dtype=np.float32) + 0.5) * (self.canonical_size / height) - 0.5
+            map_x, map_y = np.meshgrid(map_x, map_y)
+            maps = cv2.convertMaps(map_x, map_y, cv2.CV_16SC2)
+            self._resample_maps[output_size] = maps
+        return maps
+
+    def resample_to_output(self, overlay, output_size):
+        """Escala el overlay canónico al tamaño de salida en un solo paso"""
+        if output_size == (self.canonical_size, self.canonical_size):
+            return overlay
+
+        # Alfa premultiplicado para que los bordes no se oscurezcan al interpolar
+        rgba = np.asarray(overlay, dtype=np.float32)
+        rgba[..., :3] *= rgba[..., 3:4] / 255.0
+        resized = cv2.remap(rgba, *self._get_resample_maps(output_size), interpolation=cv2.INTER_LINEAR,
+                            borderMode=cv2.BORDER_CONSTANT, borderValue=0)
+        alpha = resized[..., 3:4]
+        resized[..., :3] *= np.divide(255.0, alpha, out=np.zeros_like(alpha), where=alpha > 0)
+        return Image.fromarray(np.clip(resized, 0, 255).astype(np.uint8), 'RGBA')
@@ -0,0 +1,295 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+from .champion_db import icon_file_name
+from .motion_gate import MotionGate
+from . import ws_protocol
+
+logger = logging.getLogger(__name__)
+
+# Página del cliente (fuente de navegador de OBS / ventana de Overwolf).
+# Recibe solo posiciones y dibuja los iconos por su cuenta en un canvas.
+CLIENT_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Minimapa Fantasmal</title>
+<style>html, body { margin: 0; background: transparent; overflow: hidden; } canvas { width: 100vw; height: 100vh; }</style>
+</head>
+<body>
+<canvas id="overlay"></canvas>
+<script>
+const canvas = document.getElementById('overlay');
+const ctx = canvas.getContext('2d');
+const entities = new Map();
+const icons = new Map();
+let canonicalSize = 320;
+let dirty = true;
+
+function icon(name) {
+  if (!icons.has(name)) {
+    const img = new Image();
+    img.onload = () => { dirty = true; };
+    // Igual que icon_file_name en Python: sin apóstrofos ni espacios y en minúsculas
+    img.src = '/icons/' + encodeURIComponent(name.replace(/[' ]/g, '').toLowerCase()) + '.png';
+    icons.set(name, img);
+  }
+  return icons.get(name);
+}
+
+function draw() {
+  if (dirty) {
+    dirty = false;
+    canvas.width = canvas.clientWidth;
+    canvas.height = canvas.clientHeight;
+    const sx = canvas.width / canonicalSize, sy = canvas.height / canonicalSize;
+    const r = Math.max(3, 6 * Math.min(sx, sy));
+    ctx.clearRect(0, 0, canvas.width, canvas.height);
+    for (const e of entities.values()) {
+      const x = e.x * sx, y = e.y * sy, img = icon(e.name);
+      ctx.save();
+      ctx.beginPath();
+      ctx.arc(x, y, r, 0, 2 * Math.PI);
+      if (img.complete && img.naturalWidth) {
+        ctx.clip();
+        ctx.drawImage(img, x - r, y - r, 2 * r, 2 * r);
+      } else {
+        ctx.fillStyle = e.team === 'ally' ? 'rgba(0,0,255,0.7)' : 'rgba(255,0,0,0.7)';
+        ctx.fill();
+      }
+      ctx.restore();
+      ctx.beginPath();
+      ctx.arc(x, y, r, 0, 2 * Math.PI);
+      ctx.strokeStyle = e.team === 'ally' ? '#0078ff' : '#e61e1e';
+      ctx.lineWidth = Math.max(1, r / 5);
+      ctx.stroke();
+    }
+  }
+  requestAnimationFrame(draw);
+}
+
+function connect() {
+  const ws = new WebSocket('ws://' + location.host + '/ws');
+  ws.onmessage = (event) => {
+    const msg = JSON.parse(event.data);
+    if (msg.type === 'full') {
+      entities.clear();
+      canonicalSize = msg.size;
+    }
+    for (const [id, name, team, x, y] of msg.set || []) entities.set(id, {name, team, x, y});
+    for (const [id, x, y] of msg.move || []) { const e = entities.get(id); if (e) { e.x = x; e.y = y; } }
+    for (const id of msg.remove || []) entities.delete(id);
+    dirty = true;
+  };
+  ws.onclose = () => setTimeout(connect, 1000);
+}
+
+window.onresize = () => { dirty = true; };
+connect();
+requestAnimationFrame(draw);
+</script>
+</body>
+</html>
+"""
+
+class _OverlayRequestHandler(BaseHTTPRequestHandler):
+    server_version = "MinimapaFantasmal"
+
+    def log_message(self, format, *args):
+        pass  # Sin registro por petición
+
+    def do_GET(self):
+        if self.path in ('/', '/index.html'):
+            self._send(200, 'text/html; charset=utf-8', CLIENT_PAGE.encode('utf-8'))
+        elif self.path.startswith('/icons/'):
+            self._send_icon(self.path[len('/icons/'):])
+        elif self.path == '/ws' and self.headers.get('Upgrade', '').lower() == 'websocket':
+            self._serve_websocket()
+        else:
+            self._send(404, 'text/plain', b'No encontrado')
+
+    def _send(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'max-age=3600' if status == 200 else 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_icon(self, file_name):
+        # Misma normalización que el cliente; solo nombres simples, nada de rutas fuera del directorio
+        file_name = icon_file_name(unquote(file_name))
+        if not re.fullmatch(r'[\w.\-]+\.png', file_name) or file_name.startswith('.') or '..' in file_name:
+            self._send(404, 'text/plain', b'No encontrado')
+            return
+        path = os.path.join(self.server.overlay.icon_path, file_name)
+        if not os.path.isfile(path):
+            self._send(404, 'text/plain', b'No encontrado')
+            return
+        with open(path, 'rb') as f:
+            self._send(200, 'image/png', f.read())
+
+    def _serve_websocket(self):
+        key = self.headers.get('Sec-WebSocket-Key')
+        if not key:
+            self._send(400, 'text/plain', b'Falta Sec-WebSocket-Key')
+            return
+        self.wfile.write(ws_protocol.handshake_response(key))
+        self.wfile.flush()
+        self.close_connection = True
+
+        overlay = self.server.overlay
+        client = overlay.add_client(self.wfile)
+        try:
+            # El cliente no envía nada útil; solo se lee para detectar el cierre
+            while overlay.running:
+                ws_protocol.read_message(
+                    self.rfile, lambda payload: overlay._send(client, payload, ws_protocol.OPCODE_PONG)
+                )
+        except (ws_protocol.ConnectionClosed, OSError):
+            pass
+        finally:
+            overlay.remove_client(client)
+
+class OverlayServer:
+    """
+    Servidor HTTP/WebSocket local para el overlay en fuente de navegador.
+    En lugar de imágenes envía, por WebSocket, solo los cambios de posición
+    de cada icono y la página cliente se encarga de dibujarlos.
+    """
+    def __init__(self, host="127.0.0.1", port=8765, icon_path='assets/icons/', canonical_size=320):
+        self.host = host
+        self.port = port
+        self.icon_path = icon_path
+        self.canonical_size = canonical_size
+        self.running = False
+        self.httpd = None
+        self.thread = None
+        self.stream_thread = None
+        self.clients = []
+        self.clients_lock = threading.Lock()
+        self.state = {}
+        self.motion_gate = MotionGate()
+        self.update_interval = 1.0 / 30
+
+    def start(self):
+        """Inicia el servidor HTTP en segundo plano"""
+        self.httpd = ThreadingHTTPServer((self.host, self.port), _OverlayRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.overlay = self
+        self.running = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="OverlayServer")
+        self.thread.daemon = True
+        self.thread.start()
+        logger.info("Overlay disponible en http://%s:%s/", self.host, self.port)
+
+    def stop(self):
+        """Detiene la transmisión y el servidor"""
+        self.running = False
+        if self.stream_thread and self.stream_thread.is_alive():
+            self.stream_thread.join(timeout=2.0)
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+
+    def add_client(self, wfile):
+        client = {'wfile': wfile, 'lock': threading.Lock()}
+        # Un cliente nuevo recibe el estado completo; con clients_lock tomado ningún
+        # publish puede cambiar el estado entre la instantánea y el alta del cliente
+        with self.clients_lock:
+            self._send(client, self._full_message())
+            self.clients.append(client)
+        return client
+
+    def remove_client(self, client):
+        with self.clients_lock:
+            if client in self.clients:
+                self.clients.remove(client)
+
+    def _full_message(self):
+        return json.dumps({
+            'type': 'full',
+            'size': self.canonical_size,
+            'set': [[eid, e.name, e.team, e.x, e.y] for eid, e in self.state.items()]
+        }, separators=(',', ':'))
+
+    def _send(self, client, message, opcode=ws_protocol.OPCODE_TEXT):
+        return self._write_frame(client, ws_protocol.encode_frame(message, opcode))
+
+    def _write_frame(self, client, frame):
+        try:
+            with client['lock']:
+                client['wfile'].write(frame)
+                client['wfile'].flush()
+            return True
+        except OSError:
+            return False
+
+    def publish(self, entities):
+        """
+        Envía a los clientes solo lo que cambió desde el último frame
+        :param entities: Lista de entidades de FakeMapGenerator.generate_fake_entities
+        """
+        new_state = {e.id: e for e in entities}
+        set_entries, move_entries = [], []
+        # El cambio de estado y el envío van juntos bajo clients_lock (ver add_client)
+        with self.clients_lock:
+            for eid, e in new_state.items():
+                old = self.state.get(eid)
+                if old is None or old.name != e.name or old.team != e.team:
+                    set_entries.append([eid, e.name, e.team, e.x, e.y])
+                elif old.x != e.x or old.y != e.y:
+                    move_entries.append([eid, e.x, e.y])
+            removed = [eid for eid in self.state if eid not in new_state]
+            self.state = new_state
+
+            if not (set_entries or move_entries or removed):
+                return
+
+            delta = {'type': 'delta'}
+            if set_entries:
+                delta['set'] = set_entries
+            if move_entries:
+                delta['move'] = move_entries
+            if removed:
+                delta['remove'] = removed
+            # Se codifica una sola vez para todos los clientes
+            frame = ws_protocol.encode_frame(json.dumps(delta, separators=(',', ':')))
+            self.clients = [client for client in self.clients if self._write_frame(client, frame)]
+
+    def start_streaming_fake_minimap(self, capture, generator, fps=30):
+        """Inicia el servidor y el hilo que publica las posiciones falsas"""
+        self.start()
+        self.set_fps(fps)
+        self.stream_thread = threading.Thread(
+            target=self._update_loop,
+            args=(capture, generator),
+            name="OverlayStream"
+        )
+        self.stream_thread.daemon = True
+        self.stream_thread.start()
+        return True
+
+    def set_fps(self, fps):
+        """Cambia la frecuencia de publicación (se aplica en el siguiente frame)"""
+        self.update_interval = 1.0 / max(1, fps)
+
+    def _update_loop(self, capture, generator):
+        """Bucle de captura, detección y publicación de posiciones"""
+        while self.running:
+            started = time.monotonic()
+            update_interval = self.update_interval
+            try:
+                minimap_frame = capture.capture_minimap()
+                if minimap_frame is not None and self.motion_gate.should_process(minimap_frame):
+                    real_allies, real_enemies = capture.detect_icons(minimap_frame)
+                    self.publish(generator.generate_fake_entities(minimap_frame, real_allies, real_enemies))
+            except Exception:
+                logger.exception("Error en bucle del overlay")
+
+            time.sleep(max(0.0, update_interval - (time.monotonic() - started)))
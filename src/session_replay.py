@@ -0,0 +1,288 @@
+import argparse
+import bisect
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import numpy as np
+from .minimap_capture import detect_icons
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.json"
+FORMAT_VERSION = 1
+
+def _flatten_positions(positions_per_frame):
+    """Convierte una lista de listas de (x, y) en un array plano int16 y sus offsets"""
+    counts = [len(positions) for positions in positions_per_frame]
+    offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int32)
+    flat = [c for positions in positions_per_frame for pos in positions for c in pos]
+    return np.array(flat, dtype=np.int16).reshape(-1, 2), offsets
+
+def _unflatten_positions(flat, offsets, index):
+    return [tuple(int(c) for c in pos) for pos in flat[offsets[index]:offsets[index + 1]]]
+
+class SessionRecorder:
+    """
+    Graba una sesión en disco: frames del minimapa comprimidos en bloques (chunks),
+    posiciones detectadas y semilla del generador. El índice permite buscar por tiempo.
+    La compresión y escritura se hacen en un hilo aparte.
+    """
+    def __init__(self, output_dir, seed=None, chunk_frames=120):
+        self.output_dir = output_dir
+        self.chunk_frames = chunk_frames
+        self.index = {"version": FORMAT_VERSION, "seed": seed, "chunks": []}
+        self.start_time = None
+        self._pending = []
+        self._queue = queue.Queue(maxsize=4)
+        os.makedirs(output_dir, exist_ok=True)
+
+        self._writer = threading.Thread(target=self._write_loop, name="SessionRecorder")
+        self._writer.daemon = True
+        self._writer.start()
+
+    def record(self, minimap_frame, allies, enemies, timestamp=None):
+        """Añade un frame con sus posiciones detectadas"""
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        if self.start_time is None:
+            self.start_time = timestamp
+
+        # Un bloque lleno o un cambio de tamaño de frame cierra el bloque actual. Se cierra
+        # antes de añadir, así el último frame sigue pendiente para update_positions
+        if self._pending and (len(self._pending) >= self.chunk_frames
+                              or self._pending[-1][0].shape != minimap_frame.shape):
+            self._flush()
+
+        self._pending.append((minimap_frame.copy(), timestamp - self.start_time, allies, enemies))
+
+    def update_positions(self, allies, enemies):
+        """Sustituye las posiciones del último frame grabado (la detección llega después de la captura)"""
+        if self._pending:
+            frame, timestamp, _, _ = self._pending[-1]
+            self._pending[-1] = (frame, timestamp, allies, enemies)
+
+    def _flush(self):
+        if self._pending:
+            self._queue.put(self._pending)
+            self._pending = []
+
+    def _write_loop(self):
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                break
+            try:
+                self._write_chunk(chunk)
+            except Exception:
+                logger.exception("Error grabando bloque de sesión")
+
+    def _write_chunk(self, chunk):
+        frames, timestamps, allies, enemies = zip(*chunk)
+        ally_flat, ally_offsets = _flatten_positions(allies)
+        enemy_flat, enemy_offsets = _flatten_positions(enemies)
+
+        file_name = f"chunk_{len(self.index['chunks']):05d}.npz"
+        np.savez_compressed(
+            os.path.join(self.output_dir, file_name),
+            frames=np.stack(frames),
+            timestamps=np.array(timestamps, dtype=np.float64),
+            allies=ally_flat, ally_offsets=ally_offsets,
+            enemies=enemy_flat, enemy_offsets=enemy_offsets
+        )
+        self.index["chunks"].append({
+            "file": file_name,
+            "start": timestamps[0],
+            "end": timestamps[-1],
+            "frames": len(frames)
+        })
+        self._write_index()
+
+    def _write_index(self):
+        temp_path = os.path.join(self.output_dir, INDEX_FILE + ".tmp")
+        with open(temp_path, 'w') as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(temp_path, os.path.join(self.output_dir, INDEX_FILE))
+
+    def close(self):
+        """Escribe el último bloque y el índice"""
+        self._flush()
+        self._queue.put(None)
+        self._writer.join()
+        self._write_index()
+
+class RecordingCapture:
+    """
+    Envuelve un capturador y graba cada frame capturado junto con sus posiciones.
+    Se graba al capturar, no al detectar: los frames que el MotionGate deja sin
+    detectar (muerte, tienda, base) también se graban, con las últimas posiciones.
+    """
+    def __init__(self, capture, recorder):
+        self.capture = capture
+        self.recorder = recorder
+        self._positions = ([], [])
+
+    def __getattr__(self, name):
+        return getattr(self.capture, name)
+
+    def capture_minimap(self):
+        minimap_frame = self.capture.capture_minimap()
+        if minimap_frame is not None:
+            self.recorder.record(minimap_frame, *self._positions)
+        return minimap_frame
+
+    def detect_icons(self, minimap_frame):
+        allies, enemies = self.capture.detect_icons(minimap_frame)
+        self._positions = (allies, enemies)
+        self.recorder.update_positions(allies, enemies)
+        return allies, enemies
+
+class ReplayCapture:
+    """
+    Backend de MinimapCapture que reproduce una sesión grabada.
+    :param speed: 1.0 = tiempo real, 2.0 = doble velocidad, 0 = máxima velocidad
+    :param use_recorded_positions: Si es False, detect_icons ejecuta el detector real
+    """
+    def __init__(self, recording_dir, speed=1.0, loop=False, use_recorded_positions=True):
+        self.recording_dir = recording_dir
+        self.speed = speed
+        self.loop = loop
+        self.use_recorded_positions = use_recorded_positions
+        self.auto_detect = False
+        self.detection_pool = None
+
+        with open(os.path.join(recording_dir, INDEX_FILE), 'r') as f:
+            self.index = json.load(f)
+        self.seed = self.index.get("seed")
+        self.chunks = self.index["chunks"]
+        self._chunk_starts = [chunk["start"] for chunk in self.chunks]
+
+        self._chunk_number = -1
+        self._chunk = None
+        self._position = 0
+        self._last_positions = ([], [])
+        self._clock_start = None
+        self._time_offset = 0.0
+        self.finished = not self.chunks
+
+    # Interfaz de MinimapCapture sin efecto en una reproducción
+    def set_auto_detect(self, enabled):
+        pass
+
+    def set_custom_size(self, width, height):
+        pass
+
+    def set_detection_pool(self, pool):
+        self.detection_pool = pool
+
+    def capture_full_screen(self):
+        return None
+
+    def screen_thumbnail(self, size, max_age=1.0):
+        return None
+
+    def _load_chunk(self, chunk_number):
+        with np.load(os.path.join(self.recording_dir, self.chunks[chunk_number]["file"])) as data:
+            self._chunk = {key: data[key] for key in data.files}
+        self._chunk_number = chunk_number
+
+    def seek(self, seconds):
+        """Salta al primer frame con marca de tiempo >= seconds"""
+        chunk_number = max(0, bisect.bisect_right(self._chunk_starts, seconds) - 1)
+        self._load_chunk(chunk_number)
+        self._position = int(np.searchsorted(self._chunk["timestamps"], seconds))
+        self._clock_start = None
+        self._time_offset = seconds
+        self.finished = False
+
+    def _next_frame(self):
+        if self._chunk is None or self._position >= len(self._chunk["timestamps"]):
+            next_chunk = self._chunk_number + 1
+            if next_chunk >= len(self.chunks):
+                if not self.loop:
+                    self.finished = True
+                    return None
+                self.seek(0)
+            else:
+                self._load_chunk(next_chunk)
+                self._position = 0
+
+        i = self._position
+        self._position += 1
+        chunk = self._chunk
+        self._last_positions = (
+            _unflatten_positions(chunk["allies"], chunk["ally_offsets"], i),
+            _unflatten_positions(chunk["enemies"], chunk["enemy_offsets"], i)
+        )
+        return chunk["timestamps"][i], chunk["frames"][i]
+
+    def capture_minimap(self):
+        """Devuelve el siguiente frame grabado respetando la velocidad de reproducción"""
+        if self.finished:
+            return None
+        entry = self._next_frame()
+        if entry is None:
+            return None
+        timestamp, frame = entry
+
+        if self.speed > 0:
+            now = time.monotonic()
+            if self._clock_start is None:
+                self._clock_start = now
+            delay = (timestamp - self._time_offset) / self.speed - (now - self._clock_start)
+            if delay > 0:
+                time.sleep(delay)
+        return frame
+
+    def detect_icons(self, minimap_frame):
+        if self.use_recorded_positions:
+            return self._last_positions
+        if self.detection_pool is not None:
+            return self.detection_pool.detect(minimap_frame)
+        return detect_icons(minimap_frame)
+
+def replay_session(recording_dir, generator=None, speed=0):
+    """
+    Reproduce una grabación completa con el detector y el generador reales
+    :return: Diccionario con tiempos medios y diferencias frente a lo grabado
+    """
+    replay = ReplayCapture(recording_dir, speed=speed, use_recorded_positions=False)
+    if generator is not None and replay.seed is not None:
+        generator.set_seed(replay.seed)
+
+    stats = {"frames": 0, "detect_ms": 0.0, "generate_ms": 0.0, "mismatched_frames": 0}
+    while True:
+        frame = replay.capture_minimap()
+        if frame is None:
+            break
+        recorded = replay._last_positions
+
+        start = time.perf_counter()
+        allies, enemies = replay.detect_icons(frame)
+        stats["detect_ms"] += (time.perf_counter() - start) * 1000
+        if (sorted(allies), sorted(enemies)) != (sorted(recorded[0]), sorted(recorded[1])):
+            stats["mismatched_frames"] += 1
+
+        if generator is not None:
+            start = time.perf_counter()
+            generator.generate_fake_map(frame, allies, enemies)
+            stats["generate_ms"] += (time.perf_counter() - start) * 1000
+        stats["frames"] += 1
+
+    if stats["frames"]:
+        stats["detect_ms"] /= stats["frames"]
+        stats["generate_ms"] /= stats["frames"]
+    return stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Reproduce una sesión grabada sin interfaz')
+    parser.add_argument('recording', help='Directorio de la grabación')
+    parser.add_argument('--no-generator', action='store_true', help='Solo medir el detector')
+    args = parser.parse_args()
+
+    generator = None
+    if not args.no_generator:
+        from .fake_map_generator import FakeMapGenerator
+        generator = FakeMapGenerator()
+    print(json.dumps(replay_session(args.recording, generator), indent=2))
@@ -0,0 +1,144 @@
+import json
+import logging
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .champion_db import ChampionDatabase
+from .fake_map_generator import FakeMapGenerator
+from .icon_cache import IconCache
+from .motion_gate import MotionGate
+
+logger = logging.getLogger(__name__)
+
+class SharedAssets:
+    """Recursos compartidos por todas las sesiones"""
+    def __init__(self, icon_path='assets/icons/', icon_size=12, icon_cache_bytes=4 * 1024 * 1024):
+        self.icon_path = icon_path
+        self.icon_size = icon_size
+        self.champion_db = ChampionDatabase()
+        # Una sola caché (segura entre hilos y con límite de memoria) para todas las sesiones
+        self.icon_atlas = IconCache(icon_path, icon_size, icon_cache_bytes)
+        self.icon_atlas.preload()
+
+    def create_generator(self, seed=None):
+        """Crea un generador que usa el atlas y la base de datos compartidos"""
+        generator = FakeMapGenerator(
+            champion_db=self.champion_db,
+            icon_cache=self.icon_atlas,
+            seed=seed
+        )
+        generator.config['icon_size'] = self.icon_size
+        generator.config['icon_path'] = self.icon_path
+        return generator
+
+class MinimapSession:
+    """Sesión independiente de un streamer: composición, semilla y salida propias"""
+    def __init__(self, name, capture, generator, output_path, update_interval=2):
+        self.name = name
+        self.capture = capture
+        self.generator = generator
+        self.output_path = os.path.abspath(output_path)
+        self.update_interval = update_interval
+        self.motion_gate = MotionGate()
+        self.next_update = 0.0
+        self.busy = False
+        self.frames = 0
+        self.errors = 0
+
+    def tick(self):
+        """Genera y guarda un frame del overlay falso de la sesión"""
+        minimap_frame = self.capture.capture_minimap()
+        if minimap_frame is None or not self.motion_gate.should_process(minimap_frame):
+            return
+
+        real_allies, real_enemies = self.capture.detect_icons(minimap_frame)
+        fake_overlay = self.generator.generate_fake_map(minimap_frame, real_allies, real_enemies)
+
+        # Escribir en un temporal y renombrar para que OBS nunca lea un PNG a medias
+        temp_path = self.output_path + ".tmp"
+        fake_overlay.save(temp_path, format="PNG")
+        os.replace(temp_path, self.output_path)
+        self.frames += 1
+
+class SessionServer:
+    """
+    Aloja varias sesiones de minimapa falso en un solo proceso.
+    Las sesiones comparten un único SharedAssets y se reparten sobre un pool de workers.
+    """
+    def __init__(self, shared_assets=None, max_workers=None):
+        self.assets = shared_assets or SharedAssets()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or min(8, (os.cpu_count() or 2)))
+        self.sessions = {}
+        self.lock = threading.Lock()
+        self.running = False
+        self.thread = None
+
+    def add_session(self, name, capture, output_path, composition=None, seed=None, update_interval=2):
+        """Registra una nueva sesión y devuelve su MinimapSession"""
+        generator = self.assets.create_generator(seed=seed)
+        if composition:
+            generator.set_team_composition(composition)
+
+        session = MinimapSession(name, capture, generator, output_path, update_interval)
+        with self.lock:
+            self.sessions[name] = session
+        return session
+
+    def remove_session(self, name):
+        """Elimina una sesión (el frame en curso, si lo hay, termina normalmente)"""
+        with self.lock:
+            return self.sessions.pop(name, None)
+
+    def start(self):
+        """Inicia el planificador de sesiones"""
+        self.running = True
+        self.thread = threading.Thread(target=self._schedule_loop, name="SessionServer")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """Detiene el planificador y espera a los frames en curso"""
+        self.running = False
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=2.0)
+        self.executor.shutdown(wait=True)
+
+    def _schedule_loop(self):
+        """Envía al pool las sesiones cuyo próximo frame ya toca"""
+        while self.running:
+            now = time.monotonic()
+            with self.lock:
+                due = [s for s in self.sessions.values() if not s.busy and s.next_update <= now]
+                for session in due:
+                    session.busy = True
+                    session.next_update = now + session.update_interval
+
+            for session in due:
+                self.executor.submit(self._run_session, session)
+
+            with self.lock:
+                pending = [s.next_update for s in self.sessions.values()]
+            wait = min(pending) - time.monotonic() if pending else 0.1
+            time.sleep(min(max(wait, 0.005), 0.1))
+
+    def _run_session(self, session):
+        """Ejecuta un frame de una sesión en un worker del pool"""
+        try:
+            session.tick()
+        except Exception:
+            session.errors += 1
+            logger.exception("Error en sesión '%s'", session.name, extra={'session': session.name})
+        finally:
+            session.busy = False
+
+def load_sessions_config(path):
+    """
+    Lee la definición de sesiones del modo servidor
+    :param path: Archivo JSON con una lista de sesiones
+        [{"name": ..., "output": ..., "seed": ..., "update_interval": ...,
+          "composition": {"aliados": [...], "enemigos": [...]}}, ...]
+    :return: Lista de diccionarios de sesión
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
@@ -0,0 +1,107 @@
+import math
+import random
+
+class SpatialHash:
+    """Rejilla uniforme para consultar vecinos cercanos en tiempo constante"""
+    def __init__(self, cell_size):
+        self.cell_size = max(1, cell_size)
+        self.cells = {}
+
+    def clear(self):
+        self.cells.clear()
+
+    def _cell(self, x, y):
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def insert(self, position, team=None):
+        """Registra una posición ocupada (con su equipo opcional)"""
+        self.cells.setdefault(self._cell(*position), []).append((position, team))
+
+    def neighbors(self, position, radius):
+        """Devuelve las entradas (posición, equipo) a menos de radius de position"""
+        x, y = position
+        cx, cy = self._cell(x, y)
+        reach = int(math.ceil(radius / self.cell_size))
+        radius_sq = radius * radius
+        found = []
+        for i in range(cx - reach, cx + reach + 1):
+            for j in range(cy - reach, cy + reach + 1):
+                for entry in self.cells.get((i, j), ()):
+                    (px, py), _ = entry
+                    if (px - x) ** 2 + (py - y) ** 2 < radius_sq:
+                        found.append(entry)
+        return found
+
+class PlacementEngine:
+    """
+    Coloca entidades en zonas del mapa respetando una separación mínima
+    (muestreo tipo Poisson-disk con rejilla) y reglas de agrupación por equipo.
+    Cada colocación cuesta O(1) consultas a la rejilla, así que un frame es O(n).
+    """
+    def __init__(self, min_separation, cluster_probability=0.3, cluster_radius=None,
+                 max_attempts=12, rng=None):
+        self.min_separation = min_separation
+        self.cluster_probability = cluster_probability
+        self.cluster_radius = cluster_radius or min_separation * 3
+        self.max_attempts = max_attempts
+        self.rng = rng or random.Random()
+        self.grid = SpatialHash(min_separation)
+        self.placed_by_team = {}
+
+    def set_min_separation(self, min_separation):
+        """Cambia la separación mínima (p. ej. al cambiar el tamaño de icono)"""
+        self.min_separation = min_separation
+        self.cluster_radius = min_separation * 3
+        self.grid = SpatialHash(min_separation)
+        self.placed_by_team = {}
+
+    def begin_frame(self):
+        """Vacía las posiciones ocupadas; llamar una vez al inicio de cada frame"""
+        self.grid.clear()
+        self.placed_by_team = {}
+
+    def _candidate(self, zone, team):
+        """Propone una posición: junto a un compañero (agrupación) o uniforme en la zona"""
+        x_min, y_min, x_max, y_max = zone
+        teammates = self.placed_by_team.get(team)
+        if teammates and self.rng.random() < self.cluster_probability:
+            anchor_x, anchor_y = self.rng.choice(teammates)
+            angle = self.rng.uniform(0, 2 * math.pi)
+            distance = self.rng.uniform(self.min_separation, self.cluster_radius)
+            x = int(anchor_x + distance * math.cos(angle))
+            y = int(anchor_y + distance * math.sin(angle))
+            # La agrupación no puede sacar a la entidad de su zona
+            if x_min <= x <= x_max and y_min <= y <= y_max:
+                return (x, y)
+        return (self.rng.randint(x_min, x_max), self.rng.randint(y_min, y_max))
+
+    def place(self, zone, team=None, is_allowed=None):
+        """
+        Coloca una entidad dentro de zone
+        :param zone: Rectángulo (x_min, y_min, x_max, y_max)
+        :param team: Equipo de la entidad (para las reglas de agrupación)
+        :param is_allowed: Filtro opcional (x, y) -> bool sobre las posiciones candidatas
+        :return: Posición (x, y), o None si ningún candidato cumple is_allowed
+        """
+        best, best_clearance = None, -1
+        for _ in range(self.max_attempts):
+            candidate = self._candidate(zone, team)
+            if is_allowed is not None and not is_allowed(candidate):
+                continue
+            neighbors = self.grid.neighbors(candidate, self.min_separation)
+            if not neighbors:
+                best = candidate
+                break
+
+            # Zona saturada: quedarse con el candidato más alejado de sus vecinos
+            clearance = min((px - candidate[0]) ** 2 + (py - candidate[1]) ** 2 for (px, py), _ in neighbors)
+            if clearance > best_clearance:
+                best, best_clearance = candidate, clearance
+
+        if best is None:
+            # Nada permitido (p. ej. zona entera en niebla): que decida quien llama
+            return None
+
+        self.grid.insert(best, team)
+        self.placed_by_team.setdefault(team, []).append(best)
+        return best
@@ -0,0 +1,304 @@
+import argparse
+import json
+import os
+import time
+import cv2
+import numpy as np
+from PIL import Image
+from .color_lut import CLASS_TERRAIN, CLASS_ALLY, CLASS_ENEMY, CLASS_FOG
+
+# Colores de anillo (RGB) dentro de los rangos HSV de color_lut
+ALLY_RING_RGB = (0, 120, 255)
+ENEMY_RING_RGB = (230, 30, 30)
+PING_COLORS_RGB = [(255, 220, 40), (255, 80, 80), (80, 200, 255)]
+
+TEAM_ALLY = 0
+TEAM_ENEMY = 1
+PLAYERS_PER_TEAM = 5
+
+# Columnas de las etiquetas: [índice de campeón, equipo, x, y]; -1 = ranura vacía
+LABEL_FIELDS = ["champion", "team", "x", "y"]
+
+def _circle_mask(size):
+    yy, xx = np.mgrid[:size, :size]
+    center = (size - 1) / 2
+    return ((xx - center) ** 2 + (yy - center) ** 2) <= (size / 2) ** 2
+
+class SyntheticMinimapRenderer:
+    """
+    Genera minimapas sintéticos en lote con etiquetas de posición exactas.
+    Todo se precalcula una vez (fondo, sprites con anillo de equipo, bancos de niebla)
+    y cada lote se compone con operaciones vectorizadas de NumPy. Los búferes son
+    uint8 y cada sprite se pega solo en su ventana de s x s píxeles.
+    """
+    def __init__(self, size=256, icon_size=None, icon_path='assets/icons/', seed=None, fog_bank_size=32):
+        self.size = size
+        self.icon_size = icon_size or max(8, int(size * 0.06))
+        self.rng = np.random.default_rng(seed)
+        self.champion_names, self.sprites, self.sprite_inverse_alpha = self._build_sprites(icon_path)
+        self.background = self._build_background()
+        self.fog_bank, self.fogged_backgrounds = self._build_fog_bank(fog_bank_size)
+
+    def _build_sprites(self, icon_path):
+        """
+        Prepara los sprites con máscara circular y anillo de equipo, premultiplicados
+        por su alfa (0-256) para componer en enteros
+        :return: (nombres, array (campeones, 2 equipos, s, s, 3) uint16 premultiplicado,
+                  256 - alfa como array (s, s, 1) uint16)
+        """
+        s = self.icon_size
+        names, faces = [], []
+        if os.path.exists(icon_path):
+            for champ_file in sorted(os.listdir(icon_path)):
+                if champ_file.endswith('.png'):
+                    with Image.open(os.path.join(icon_path, champ_file)) as icon:
+                        faces.append(np.asarray(icon.convert('RGB').resize((s, s)), dtype=np.float32))
+                    names.append(os.path.splitext(champ_file)[0])
+
+        # Sin iconos descargados se usan caras de color liso
+        if not faces:
+            for i in range(20):
+                names.append(f"synthetic_{i}")
+                faces.append(np.full((s, s, 3), self.rng.integers(40, 200, 3), dtype=np.float32))
+
+        inner = _circle_mask(s)
+        ring_width = max(1, s // 8)
+        yy, xx = np.mgrid[:s, :s]
+        center = (s - 1) / 2
+        distance = np.sqrt((xx - center) ** 2 + (yy - center) ** 2)
+        ring = inner & (distance >= s / 2 - ring_width)
+
+        alpha = inner.astype(np.uint16)[..., None] * 256
+        sprites = np.zeros((len(faces), 2, s, s, 3), dtype=np.uint16)
+        for team, ring_color in ((TEAM_ALLY, ALLY_RING_RGB), (TEAM_ENEMY, ENEMY_RING_RGB)):
+            sprites[:, team] = np.stack(faces)
+            sprites[:, team, ring] = ring_color
+        return names, sprites * alpha, 256 - alpha
+
+    def _build_background(self):
+        """Textura base del mapa: terreno con ruido, carriles y río"""
+        size = self.size
+        noise = cv2.resize(self.rng.random((16, 16)).astype(np.float32), (size, size), interpolation=cv2.INTER_CUBIC)
+        background = np.empty((size, size, 3), dtype=np.float32)
+        background[..., 0] = 30 + 25 * noise
+        background[..., 1] = 55 + 40 * noise
+        background[..., 2] = 35 + 20 * noise
+
+        lane_color = (110, 100, 80)
+        lane = max(2, size // 40)
+        margin = size // 12
+        cv2.line(background, (margin, size - margin), (margin, margin), lane_color, lane)
+        cv2.line(background, (margin, margin), (size - margin, margin), lane_color, lane)
+        cv2.line(background, (margin, size - margin), (size - margin, size - margin), lane_color, lane)
+        cv2.line(background, (size - margin, size - margin), (size - margin, margin), lane_color, lane)
+        cv2.line(background, (margin, size - margin), (size - margin, margin), lane_color, lane)
+        cv2.line(background, (margin * 2, margin * 2), (size - margin * 2, size - margin * 2), (40, 70, 110), lane * 2)
+        return background.astype(np.uint8)
+
+    def _build_fog_bank(self, count):
+        """
+        Máscaras de niebla de guerra a partir de ruido suave y el fondo ya oscurecido
+        con cada una (la niebla deja un 35 % del brillo)
+        :return: (máscaras bool (count, H, W) con True = visible, fondos uint8 (count, H, W, 3))
+        """
+        size = self.size
+        bank = np.empty((count, size, size), dtype=bool)
+        for i in range(count):
+            noise = cv2.resize(self.rng.random((6, 6)).astype(np.float32), (size, size), interpolation=cv2.INTER_CUBIC)
+            bank[i] = noise > self.rng.uniform(0.3, 0.7)
+        fogged = self.background * np.where(bank, 1.0, 0.35)[..., None]
+        return bank, fogged.astype(np.uint8)
+
+    def _composite(self, images, indices, sprites, xs, ys):
+        """
+        Pega un sprite en cada imagen images[indices] en (xs, ys) (esquina superior
+        izquierda); solo se leen y escriben las ventanas de s x s píxeles
+        """
+        s = self.icon_size
+        batch = indices[:, None, None]
+        offsets = np.arange(s)
+        rows = ys[:, None, None] + offsets[None, :, None]
+        cols = xs[:, None, None] + offsets[None, None, :]
+
+        region = images[batch, rows, cols].astype(np.uint16)
+        images[batch, rows, cols] = (region * self.sprite_inverse_alpha + sprites) >> 8
+
+    def render_batch(self, batch_size, fog=True, pings=True, max_champions=PLAYERS_PER_TEAM):
+        """
+        Renderiza un lote de minimapas
+        :return: (imágenes uint8 (B, H, W, 3) RGB, etiquetas int16 (B, 10, 4))
+        """
+        size, s = self.size, self.icon_size
+        labels = np.full((batch_size, 2 * PLAYERS_PER_TEAM, 4), -1, dtype=np.int16)
+        if fog:
+            fog_indices = self.rng.integers(0, len(self.fog_bank), batch_size)
+            images = self.fogged_backgrounds[fog_indices]
+        else:
+            images = np.broadcast_to(self.background, (batch_size, size, size, 3)).copy()
+
+        if pings:
+            for i in np.flatnonzero(self.rng.random(batch_size) < 0.3):
+                center = tuple(int(c) for c in self.rng.integers(s, size - s, 2))
+                color = PING_COLORS_RGB[self.rng.integers(len(PING_COLORS_RGB))]
+                cv2.circle(images[i], center, s, color, max(1, s // 6))
+
+        counts = self.rng.integers(1, max_champions + 1, (batch_size, 2))
+        champion_ids = self.rng.integers(0, len(self.sprites), (batch_size, 2 * PLAYERS_PER_TEAM))
+
+        # Una pasada vectorizada por ranura de jugador; los solapes se resuelven por orden
+        for slot in range(2 * PLAYERS_PER_TEAM):
+            team = slot // PLAYERS_PER_TEAM
+            active = np.flatnonzero(counts[:, team] > slot % PLAYERS_PER_TEAM)
+            if not len(active):
+                continue
+
+            # Los enemigos en niebla no aparecen en el minimapa real
+            xs = self.rng.integers(0, size - s, len(active))
+            ys = self.rng.integers(0, size - s, len(active))
+            if fog and team == TEAM_ENEMY:
+                visible = self.fog_bank[fog_indices[active], ys + s // 2, xs + s // 2]
+                active, xs, ys = active[visible], xs[visible], ys[visible]
+                if not len(active):
+                    continue
+
+            self._composite(images, active, self.sprites[champion_ids[active, slot], team], xs, ys)
+
+            labels[active, slot] = np.stack([
+                champion_ids[active, slot], np.full(len(active), team), xs + s // 2, ys + s // 2
+            ], axis=1)
+
+        return images, labels
+
+    def render_class_maps(self, batch_size):
+        """
+        Renderiza un lote con un mapa de clases por píxel (sin pings) para ajustar ColorLUT
+        :return: Lista de (imagen RGB, mapa de clases)
+        """
+        images, labels = self.render_batch(batch_size, pings=False)
+        s = self.icon_size
+        yy, xx = np.mgrid[:s, :s]
+        center = (s - 1) / 2
+        distance = np.sqrt((xx - center) ** 2 + (yy - center) ** 2)
+        ring = (distance <= s / 2) & (distance >= s / 2 - max(1, s // 8))
+        face = distance < s / 2 - max(1, s // 8)
+
+        samples = []
+        for image, image_labels in zip(images, labels):
+            # Los píxeles oscuros del fondo vienen de la niebla
+            class_map = np.where(image.max(axis=2) < 60, CLASS_FOG, CLASS_TERRAIN).astype(np.uint8)
+            for champion, team, x, y in image_labels:
+                if champion < 0:
+                    continue
+                top, left = y - s // 2, x - s // 2
+                region = class_map[top:top + s, left:left + s]
+                region[ring] = CLASS_ALLY if team == TEAM_ALLY else CLASS_ENEMY
+                # La cara del campeón no es anillo aunque tenga colores parecidos
+                region[face] = CLASS_TERRAIN
+            samples.append((image, class_map))
+        return samples
+
+    def write_dataset(self, output_dir, count, shard_size=1024, **render_options):
+        """
+        Escribe un dataset fragmentado (shard_XXXXX.npz) con imágenes y etiquetas
+        :return: Número de imágenes por segundo
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        start = time.perf_counter()
+        shard = 0
+        for offset in range(0, count, shard_size):
+            images, labels = self.render_batch(min(shard_size, count - offset), **render_options)
+            np.savez(os.path.join(output_dir, f"shard_{shard:05d}.npz"), images=images, labels=labels)
+            shard += 1
+        elapsed = time.perf_counter() - start
+
+        with open(os.path.join(output_dir, "metadata.json"), 'w') as f:
+            json.dump({
+                "count": count,
+                "shards": shard,
+                "size": self.size,
+                "icon_size": self.icon_size,
+                "label_fields": LABEL_FIELDS,
+                "champions": self.champion_names
+            }, f, indent=2)
+        return count / elapsed if elapsed else 0.0
+
+def benchmark_detector(dataset_dir, tolerance=None, limit=None):
+    """
+    Evalúa detect_icons sobre un dataset sintético
+    :return: Diccionario con precisión, exhaustividad y tiempo medio por frame
+    """
+    from .minimap_capture import detect_icons
+
+    with open(os.path.join(dataset_dir, "metadata.json"), 'r') as f:
+        metadata = json.load(f)
+    tolerance = tolerance or metadata["icon_size"] / 2
+
+    true_positives = false_positives = false_negatives = frames = 0
+    elapsed = 0.0
+    for shard in range(metadata["shards"]):
+        with np.load(os.path.join(dataset_dir, f"shard_{shard:05d}.npz")) as data:
+            images, labels = data["images"], data["labels"]
+
+        for image, image_labels in zip(images, labels):
+            start = time.perf_counter()
+            detections = detect_icons(image)
+            elapsed += time.perf_counter() - start
+
+            for team in (TEAM_ALLY, TEAM_ENEMY):
+                truth = image_labels[(image_labels[:, 1] == team) & (image_labels[:, 0] >= 0)][:, 2:4]
+                unmatched = list(map(tuple, truth))
+                for x, y in detections[team]:
+                    match = next((t for t in unmatched if abs(t[0] - x) <= tolerance and abs(t[1] - y) <= tolerance), None)
+                    if match is None:
+                        false_positives += 1
+                    else:
+                        unmatched.remove(match)
+                        true_positives += 1
+                false_negatives += len(unmatched)
+
+            frames += 1
+            if limit and frames >= limit:
+                break
+        if limit and frames >= limit:
+            break
+
+    return {
+        "frames": frames,
+        "precision": true_positives / max(1, true_positives + false_positives),
+        "recall": true_positives / max(1, true_positives + false_negatives),
+        "ms_per_frame": elapsed * 1000 / max(1, frames)
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Generador de minimapas sintéticos')
+    parser.add_argument('--out', help='Directorio de salida (por defecto synthetic_dataset)')
+    parser.add_argument('--count', type=int, help='Número de minimapas (por defecto 10000)')
+    parser.add_argument('--size', type=int, default=256, help='Lado del minimapa en píxeles')
+    parser.add_argument('--shard-size', type=int, default=1024, help='Minimapas por fragmento')
+    parser.add_argument('--seed', type=int, default=None, help='Semilla aleatoria')
+    parser.add_argument('--no-fog', action='store_true', help='Sin niebla de guerra')
+    parser.add_argument('--bench', action='store_true', help='Evaluar detect_icons sobre el dataset generado')
+    parser.add_argument('--build-lut', action='store_true', help='Reconstruir la tabla de colores ajustada con iconos y minimapas sintéticos')
+    args = parser.parse_args()
+
+    if args.build_lut:
+        from .color_lut import ColorLUT, current_game_version
+        lut_renderer = SyntheticMinimapRenderer(size=args.size, seed=args.seed)
+        lut = ColorLUT.from_rules().refine(lut_renderer.render_class_maps(256))
+        lut_path = os.path.join('cache', f"color_lut_{current_game_version()}.npy")
+        lut.save(lut_path)
+        print(f"Tabla de colores guardada en {lut_path}")
+        # Solo la tabla, salvo que también se pida un dataset de forma explícita
+        if args.out is None and args.count is None and not args.bench:
+            raise SystemExit(0)
+
+    if args.out is None:
+        args.out = 'synthetic_dataset'
+    if args.count is None:
+        args.count = 10000
+    renderer = SyntheticMinimapRenderer(size=args.size, seed=args.seed)
+    rate = renderer.write_dataset(args.out, args.count, args.shard_size, fog=not args.no_fog)
+    print(f"{args.count} minimapas generados en {args.out} ({rate:.0f}/s)")
+
+    if args.bench:
+        print(json.dumps(benchmark_detector(args.out), indent=2))
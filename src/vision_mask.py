@@ -0,0 +1,66 @@
+import cv2
+import numpy as np
+from .color_lut import CLASS_FOG, get_default_lut
+
+class VisionMask:
+    """
+    Máscara de zonas con visión (iluminadas) frente a niebla de guerra del minimapa real.
+    Trabaja sobre una rejilla reducida y solo reclasifica los bloques que cambiaron
+    respecto a su brillo cuando se clasificaron por última vez (así los cambios
+    lentos, por debajo del umbral en cada frame, también acaban reclasificándose).
+    """
+    def __init__(self, grid_size=64, tile_size=8, change_threshold=12, lut=None):
+        """
+        :param grid_size: Lado de la rejilla reducida sobre la que se calcula la máscara
+        :param tile_size: Lado de los bloques que se reclasifican cuando cambian
+        :param change_threshold: Diferencia de brillo que marca un bloque como cambiado
+        :param lut: ColorLUT que decide qué colores son niebla (por defecto la cacheada)
+        """
+        self.grid_size = grid_size
+        self.tile_size = tile_size
+        self.change_threshold = change_threshold
+        self.lut = lut
+        self.lit = None
+        self._reference = None
+
+    def reset(self):
+        self.lit = None
+        self._reference = None
+
+    def update(self, minimap_frame):
+        """Actualiza la máscara con un nuevo frame del minimapa (RGB)"""
+        if self.lut is None:
+            self.lut = get_default_lut()
+        small = cv2.resize(minimap_frame, (self.grid_size, self.grid_size), interpolation=cv2.INTER_AREA)
+        # El brillo (máximo de canal) solo se usa para detectar qué bloques cambiaron
+        brightness = small.max(axis=2)
+
+        if self._reference is None:
+            self.lit = self.lut.classify(small) != CLASS_FOG
+            self._reference = brightness
+        else:
+            diff = cv2.absdiff(brightness, self._reference)
+            tiles = self.grid_size // self.tile_size
+            tile_change = diff.reshape(tiles, self.tile_size, tiles, self.tile_size).max(axis=(1, 3))
+            changed = tile_change > self.change_threshold
+            if changed.any():
+                changed_pixels = np.repeat(np.repeat(changed, self.tile_size, axis=0), self.tile_size, axis=1)
+                self.lit[changed_pixels] = self.lut.classify(small[changed_pixels]) != CLASS_FOG
+                self._reference[changed_pixels] = brightness[changed_pixels]
+
+    def is_visible(self, position, space_size):
+        """
+        Indica si una posición tiene visión
+        :param position: (x, y) en un espacio de space_size x space_size píxeles
+        :return: True si está iluminada (o si todavía no hay máscara)
+        """
+        if self.lit is None:
+            return True
+        x, y = position
+        gx = min(self.grid_size - 1, max(0, int(x * self.grid_size / space_size)))
+        gy = min(self.grid_size - 1, max(0, int(y * self.grid_size / space_size)))
+        return bool(self.lit[gy, gx])
+
+    def visible_fraction(self):
+        """Fracción del minimapa con visión"""
+        return float(self.lit.mean()) if self.lit is not None else 1.0
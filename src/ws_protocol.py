@@ -0,0 +1,109 @@
+import base64
+import hashlib
+import struct
+
+# Implementación mínima de WebSocket (RFC 6455) sobre sockets de la biblioteca estándar,
+# suficiente para el servidor de overlay local y el simulador de obs-websocket
+
+GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+OPCODE_CONTINUATION = 0x0
+OPCODE_TEXT = 0x1
+OPCODE_BINARY = 0x2
+OPCODE_CLOSE = 0x8
+OPCODE_PING = 0x9
+OPCODE_PONG = 0xA
+
+class ConnectionClosed(Exception):
+    """El otro extremo cerró la conexión"""
+
+def accept_key(client_key):
+    """Calcula Sec-WebSocket-Accept a partir de Sec-WebSocket-Key"""
+    digest = hashlib.sha1((client_key + GUID).encode('ascii')).digest()
+    return base64.b64encode(digest).decode('ascii')
+
+def handshake_response(client_key, protocol=None):
+    """Respuesta HTTP 101 para aceptar la conexión"""
+    lines = [
+        "HTTP/1.1 101 Switching Protocols",
+        "Upgrade: websocket",
+        "Connection: Upgrade",
+        f"Sec-WebSocket-Accept: {accept_key(client_key)}"
+    ]
+    if protocol:
+        lines.append(f"Sec-WebSocket-Protocol: {protocol}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode('ascii')
+
+def encode_frame(payload, opcode=OPCODE_TEXT, mask=None):
+    """
+    Codifica un frame completo (FIN=1)
+    :param payload: bytes o str
+    :param mask: Clave de 4 bytes (obligatoria en frames de cliente, None en servidor)
+    """
+    if isinstance(payload, str):
+        payload = payload.encode('utf-8')
+    length = len(payload)
+    mask_bit = 0x80 if mask else 0
+
+    header = bytes([0x80 | opcode])
+    if length < 126:
+        header += bytes([mask_bit | length])
+    elif length < 1 << 16:
+        header += bytes([mask_bit | 126]) + struct.pack(">H", length)
+    else:
+        header += bytes([mask_bit | 127]) + struct.pack(">Q", length)
+
+    if mask:
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        header += mask
+    return header + payload
+
+def _read_exact(rfile, count):
+    data = rfile.read(count)
+    if len(data) < count:
+        raise ConnectionClosed()
+    return data
+
+def read_frame(rfile):
+    """
+    Lee un frame de un fichero de socket (socket.makefile('rb'))
+    :return: (opcode, payload en bytes, fin)
+    """
+    first, second = _read_exact(rfile, 2)
+    fin = bool(first & 0x80)
+    opcode = first & 0x0F
+    length = second & 0x7F
+    if length == 126:
+        length = struct.unpack(">H", _read_exact(rfile, 2))[0]
+    elif length == 127:
+        length = struct.unpack(">Q", _read_exact(rfile, 8))[0]
+
+    mask = _read_exact(rfile, 4) if second & 0x80 else None
+    payload = _read_exact(rfile, length)
+    if mask:
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return opcode, payload, fin
+
+def read_message(rfile, send_pong=None):
+    """
+    Lee un mensaje completo uniendo fragmentos y respondiendo a pings
+    :param send_pong: Función send_pong(payload) que envía el PONG; debe serializar
+        con los demás envíos de esa conexión (p. ej. tomando su bloqueo)
+    :return: (opcode, payload); lanza ConnectionClosed al recibir un cierre
+    """
+    message_opcode, parts = None, []
+    while True:
+        opcode, payload, fin = read_frame(rfile)
+        if opcode == OPCODE_CLOSE:
+            raise ConnectionClosed()
+        if opcode == OPCODE_PING:
+            if send_pong is not None:
+                send_pong(payload)
+            continue
+        if opcode == OPCODE_PONG:
+            continue
+        if opcode != OPCODE_CONTINUATION:
+            message_opcode = opcode
+        parts.append(payload)
+        if fin:
+            return message_opcode, b"".join(parts)